@@ -0,0 +1,89 @@
+import numpy as np
+
+DEFAULT_SIMULATIONS = 100_000
+# ADPs at or above this are placeholders (Sleeper gives kickers and defenses 999)
+MISSING_ADP = 999
+
+
+def effective_adp(board, teams=12, rounds=14):
+    """
+    ADP for every row of the board, with placeholders filled in.
+
+    Kickers and defenses have no real ADP; they are spread over the last two
+    rounds, one per team at a time, best total_proj first. Other players
+    without an ADP go after everyone who has one, again by total_proj.
+    """
+    adp = board.values['adp'].copy()
+    proj = np.nan_to_num(board.values['total_proj'], nan=-np.inf)
+    missing = ~(adp < MISSING_ADP)
+    last_real = np.nanmax(np.where(missing, np.nan, adp)) if (~missing).any() else 0.0
+    late_start = teams * (rounds - 2) + 1
+    for pos in np.unique(board.positions[missing]):
+        rows = np.flatnonzero(missing & (board.positions == pos))
+        rows = rows[np.argsort(-proj[rows], kind='stable')]
+        if pos in ('K', 'DEF'):
+            adp[rows] = late_start + np.arange(len(rows)) * teams
+        else:
+            adp[rows] = last_real + 1 + np.arange(len(rows))
+    return adp
+
+
+class AvailabilitySimulator:
+    """
+    Monte Carlo estimate of which players will still be on the board at later picks.
+
+    Every simulated draft gives each available player a noisy ADP (normal,
+    with a standard deviation that grows with the ADP) and drafts players in
+    that order, so the k picks before a target pick take the k lowest noisy
+    ADPs. Simulations run in vectorized chunks: one normal draw, one
+    argpartition and one bincount per chunk, no Python loop per draft.
+
+    :param board: DraftBoard; only its currently available players are simulated
+    :param teams: teams in the league
+    :param rounds: rounds in the draft, used to place kickers and defenses
+    :param noise: ADP standard deviation as a fraction of the ADP
+    :param min_sd: floor on the standard deviation, in picks
+    :param n_sims: simulated drafts per estimate
+    :param seed: seed for the random draws; the same board gives the same estimate
+    :param chunk: drafts simulated per vectorized batch (bounds memory use)
+    """
+
+    def __init__(self, board, teams=12, rounds=14, noise=0.2, min_sd=1.0, n_sims=DEFAULT_SIMULATIONS, seed=0, chunk=10_000):
+        self.board = board
+        self.adp = effective_adp(board, teams, rounds)
+        self.sd = np.maximum(min_sd, noise * self.adp)
+        self.n_sims = n_sims
+        self.seed = seed
+        self.chunk = chunk
+
+    def availability(self, picks_before):
+        """
+        Chance each available player is still there after a number of further picks.
+
+        :param picks_before: opponent picks made before each target pick
+        :return: (rows, probabilities) where probabilities[i, j] is the chance that
+                 board row rows[j] is available after picks_before[i] picks
+        """
+        rows = np.flatnonzero(~self.board.drafted)
+        picks_before = np.asarray(picks_before, dtype=int)
+        depth = int(min(picks_before.max(initial=0), len(rows)))
+        if depth == 0:
+            return rows, np.ones((len(picks_before), len(rows)))
+
+        adp = self.adp[rows].astype(np.float32)
+        sd = self.sd[rows].astype(np.float32)
+        rng = np.random.default_rng(self.seed)
+        # taken[k, j]: drafts in which row j went exactly k picks from now
+        taken = np.zeros(depth * len(rows), dtype=np.int64)
+        for start in range(0, self.n_sims, self.chunk):
+            size = min(self.chunk, self.n_sims - start)
+            noisy = adp + sd * rng.standard_normal((size, len(rows)), dtype=np.float32)
+            if depth < len(rows):
+                first = np.argpartition(noisy, depth - 1, axis=1)[:, :depth]
+            else:
+                first = np.broadcast_to(np.arange(len(rows)), (size, len(rows)))
+            order = np.take_along_axis(first, np.argsort(np.take_along_axis(noisy, first, axis=1), axis=1), axis=1)
+            taken += np.bincount((np.arange(depth) * len(rows) + order).ravel(), minlength=depth * len(rows))
+
+        gone = np.vstack([np.zeros(len(rows)), np.cumsum(taken.reshape(depth, len(rows)), axis=0)]) / self.n_sims
+        return rows, 1.0 - gone[np.minimum(picks_before, depth)]
@@ -0,0 +1,236 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import draft_script_aci
+import llm_client
+import roster_actions
+from bench_ingest import DEFAULT_FIXTURE, load_fixture
+from draft_script_aci import DraftSession, ROSTER_SIZE, default_table_path, load_config
+from draft_table import load_player_table
+from player_store import PlayerStore
+from sleeper_ingest import flatten_stats_payload
+
+DEFAULT_OUTPUT_DIR = 'out/bench'
+# metrics printed side by side by --compare
+COMPARE_KEYS = [
+    ('draft', 'pick_latency_ms', 'p50'),
+    ('draft', 'pick_latency_ms', 'p99'),
+    ('draft', 'seconds_per_draft'),
+    ('draft', 'llm_calls_per_pick'),
+    ('draft', 'tool_calls_per_pick'),
+    ('draft', 'rows_scanned_per_pick'),
+    ('draft', 'prompt_tokens_per_pick'),
+    ('draft', 'peak_mb'),
+    ('roster', 'seconds'),
+    ('roster', 'llm_calls'),
+    ('roster', 'peak_mb'),
+]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def latency_percentiles(seconds):
+    ms = np.asarray(seconds, dtype=float) * 1000
+    return {
+        'p50': round(float(np.percentile(ms, 50)), 3),
+        'p90': round(float(np.percentile(ms, 90)), 3),
+        'p99': round(float(np.percentile(ms, 99)), 3),
+        'max': round(float(ms.max()), 3),
+        'mean': round(float(ms.mean()), 3),
+    }
+
+
+@contextlib.contextmanager
+def counting(module, name, counts, label=None):
+    # wrap a module-level function so every call through the module is counted
+    original = getattr(module, name)
+
+    def counted(*args, **kwargs):
+        counts[label(*args) if label else name] += 1
+        return original(*args, **kwargs)
+
+    setattr(module, name, counted)
+    try:
+        yield counts
+    finally:
+        setattr(module, name, original)
+
+
+def peak_memory(fn, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        return round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+    finally:
+        tracemalloc.stop()
+
+
+def run_draft(df, outlooks, models, seed, output_root, speculative=0):
+    """
+    One full draft against the stub backend.
+
+    :return: (session, seconds between consecutive picks being recorded)
+    """
+    session = DraftSession(df, models, key=None, draft_id=f'bench_{seed}', output_root=output_root, seed=seed,
+                           outlooks=outlooks, speculative=speculative, debug_level=-1)
+    latencies = []
+    make_pick = session.make_pick
+    last = [time.perf_counter()]
+
+    def timed_pick(pick_number, decision=None):
+        player_id = make_pick(pick_number, decision)
+        now = time.perf_counter()
+        latencies.append(now - last[0])
+        last[0] = now
+        return player_id
+
+    session.make_pick = timed_pick
+    session.run()
+    return session, latencies
+
+
+def bench_drafts(table, models, n_drafts=3, seed=0, speculative=0):
+    df, outlooks = load_player_table(table)
+    tool_calls = Counter()
+    latencies = []
+    sessions = []
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as output_root:
+        with counting(draft_script_aci, 'execute_command', tool_calls, label=lambda command, *args: command):
+            for i in range(n_drafts):
+                session, pick_latencies = run_draft(df, outlooks, models, seed + i, output_root, speculative)
+                sessions.append(session)
+                latencies.extend(pick_latencies)
+        elapsed = time.perf_counter() - start
+        # traced in a separate run, as in bench_ingest.measure
+        peak = peak_memory(run_draft, df, outlooks, models, seed, output_root, speculative)
+
+    picks = sum(len(s.drafted_pids) + len(s.skipped_picks) for s in sessions)
+    llm_calls = sum(len(s.token_usage) for s in sessions)
+    return {
+        'drafts': n_drafts,
+        'picks': picks,
+        'skipped_picks': sum(len(s.skipped_picks) for s in sessions),
+        'seconds_per_draft': round(elapsed / n_drafts, 4),
+        'pick_latency_ms': latency_percentiles(latencies),
+        'llm_calls_per_pick': round(llm_calls / picks, 3),
+        'tool_calls_per_pick': round(sum(tool_calls.values()) / picks, 3),
+        'tool_calls': dict(tool_calls),
+        # speculative runs scan forked boards too; only the real board is counted here
+        'rows_scanned_per_pick': round(sum(s.board.rows_scanned for s in sessions) / picks, 2),
+        'prompt_tokens_per_pick': round(sum(u['prompt_tokens'] for s in sessions for u in s.token_usage) / picks, 1),
+        'peak_mb': peak,
+    }
+
+
+def build_league(fixture, teams=12):
+    """
+    Roster the top projected players snake-style across the league; everyone else is a free agent.
+    """
+    projs = flatten_stats_payload(fixture['projections'])
+    stats = flatten_stats_payload(fixture['stats'])
+    ranked = projs.sort_values('pts_ppr', ascending=False, kind='stable')['player_id'].drop_duplicates().tolist()
+    agents = roster_actions.agents[:teams]
+    agent_rosters = {agent: [] for agent in agents}
+    snake = agents + agents[::-1]
+    for i, pid in enumerate(ranked[:teams * ROSTER_SIZE]):
+        agent_rosters[snake[i % len(snake)]].append(pid)
+    active_ids = list(set(projs['player_id']) | set(stats['player_id']))
+    return projs, stats, agent_rosters, active_ids
+
+
+def run_roster_pass(fixture):
+    projs, stats, agent_rosters, active_ids = build_league(fixture)
+    store = PlayerStore(projs, stats)
+    rostered = [pid for roster in agent_rosters.values() for pid in roster]
+    fa_stats, fa_proj = roster_actions.get_free_agents(rostered, stats, projs, active_ids)
+    fa_pos_proj, fa_pos_stats = roster_actions.get_position_data(fa_stats, fa_proj)
+    return roster_actions.run_weekly_pipeline(agent_rosters, fa_pos_stats, fa_pos_proj, store)
+
+
+def bench_roster(fixture):
+    llm_calls = Counter()
+    with counting(roster_actions, 'openrouter_req', llm_calls):
+        start = time.perf_counter()
+        results = run_roster_pass(fixture)
+        elapsed = time.perf_counter() - start
+    peak = peak_memory(run_roster_pass, fixture)
+    return {
+        'agents': len(results),
+        'seconds': round(elapsed, 4),
+        'llm_calls': sum(llm_calls.values()),
+        'peak_mb': peak,
+    }
+
+
+def lookup(results, path):
+    for key in path:
+        results = results.get(key) if isinstance(results, dict) else None
+    return results
+
+
+def compare(baseline, current):
+    print(f"{'metric':<40}{'baseline':>14}{'current':>14}{'ratio':>8}")
+    for path in COMPARE_KEYS:
+        before, after = lookup(baseline, path), lookup(current, path)
+        ratio = f'{after / before:.2f}' if before and after is not None else '-'
+        print(f"{'.'.join(path):<40}{before if before is not None else '-':>14}{after if after is not None else '-':>14}{ratio:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full drafts and a weekly roster pass against the offline stub LLM.')
+    parser.add_argument('-n', '--n-drafts', type=int, default=3)
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--table', default=default_table_path(), help='binary draft table directory or CSV')
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE, help='Sleeper projections/stats fixture for the roster pass (see bench_ingest.py --save); a synthetic week if missing')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated seconds per LLM call (0 measures only our own overhead)')
+    parser.add_argument('--speculative', type=int, default=0, metavar='LOOKAHEAD')
+    parser.add_argument('--output', default=None, help=f'results file (default {DEFAULT_OUTPUT_DIR}/<commit>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    llm_client.set_backend('stub')
+    llm_client.get_client(None, latency=args.latency)
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'settings': {'n_drafts': args.n_drafts, 'config': args.config, 'table': args.table, 'seed': args.seed,
+                     'latency': args.latency, 'speculative': args.speculative},
+        'draft': bench_drafts(args.table, load_config(args.config)['models'], args.n_drafts, args.seed, args.speculative),
+    }
+    results['settings']['fixture'] = args.fixture if os.path.exists(args.fixture) else 'synthetic'
+    results['roster'] = bench_roster(load_fixture(args.fixture))
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"{commit or 'working'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
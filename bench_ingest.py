@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+import requests
+
+from name_resolver import NFL_TEAMS
+from roster_actions import get_free_agents, get_position_data, POSITIONS
+from sleeper_ingest import flatten_stats_payload
+
+PROJ_URL = 'https://api.sleeper.com/projections/nfl/2024/2?season_type=regular&position[]=DEF&position[]=K&position[]=QB&position[]=RB&position[]=TE&position[]=WR&order_by=pts_ppr'
+STATS_URL = 'https://api.sleeper.com/stats/nfl/2024/1?season_type=regular&position[]=DEF&position[]=K&position[]=QB&position[]=RB&position[]=TE&position[]=WR&order_by=pts_ppr'
+DEFAULT_FIXTURE = 'fixtures/sleeper_week.json'
+# players per payload in the synthetic fixture; projections plus stats make 5000 records
+SYNTHETIC_PLAYERS = 2500
+# a long tail of rarely filled stats, like the real payloads carry, plus the ones the scripts read
+SYNTHETIC_STATS = [f'stat_{i}' for i in range(140)] + [
+    'pts_ppr', 'pass_yd', 'pass_td', 'rush_yd', 'rush_td', 'rec_yd', 'rec', 'rec_td', 'rec_tgt', 'rush_att',
+    'fgm', 'fga', 'fgm_40_49', 'fgm_50p', 'sack', 'int', 'cmp_pct', 'fum', 'safe', 'pts_allow', 'yds_allow',
+    'off_snp', 'tm_off_snp',
+]
+
+
+def save_fixture(path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fixture = {'projections': requests.get(PROJ_URL).json(), 'stats': requests.get(STATS_URL).json()}
+    with open(path, 'w') as f:
+        json.dump(fixture, f)
+
+
+def synthetic_payload(n_players, seed, category):
+    rng = random.Random(seed)
+    teams = sorted(NFL_TEAMS)
+    payload = []
+    for i in range(n_players):
+        stats = {stat: rng.randint(0, 40) if rng.random() < 0.5 else round(rng.random() * 30, 2)
+                 for stat in SYNTHETIC_STATS if rng.random() < 0.5}
+        team = teams[i % len(teams)]
+        payload.append({
+            'player_id': str(1000 + i),
+            'player': {'fantasy_positions': [POSITIONS[i % len(POSITIONS)]], 'first_name': f'First{i}',
+                       'last_name': f'Last{i}', 'team': team, 'injury_status': None, 'years_exp': i % 15},
+            'stats': stats,
+            'team': team, 'week': 1, 'season': '2024', 'category': category, 'company': 'rotowire', 'date': '2024-09-08',
+        })
+    return payload
+
+
+def synthetic_fixture(n_players=SYNTHETIC_PLAYERS, seed=0):
+    """
+    Deterministic stand-in for a week of Sleeper projections and stats, shaped like the live payloads.
+    """
+    return {
+        'projections': synthetic_payload(n_players, seed, 'proj'),
+        'stats': synthetic_payload(n_players, seed + 1, 'stat'),
+    }
+
+
+def load_fixture(path):
+    """
+    The saved fixture at path, or the synthetic one when none was saved.
+    """
+    if not os.path.exists(path):
+        print(f'no fixture at {path}, using the synthetic one ({SYNTHETIC_PLAYERS} players per payload)')
+        return synthetic_fixture()
+    with open(path) as f:
+        return json.load(f)
+
+
+def legacy_ingest(prjs, srjs, rostered_ids, active_ids):
+    # the pre-columnar path: nested dicts in object columns, .apply per field, json_normalize per position
+    tables = []
+    for payload in (prjs, srjs):
+        table = pd.DataFrame(payload)
+        table['fantasy_position'] = table['player'].apply(lambda x: x['fantasy_positions'][0] if 'fantasy_positions' in x else None)
+        table['first_name'] = table['player'].apply(lambda x: x['first_name'] if 'first_name' in x else None)
+        table['last_name'] = table['player'].apply(lambda x: x['last_name'] if 'last_name' in x else None)
+        table['full_name'] = table['first_name'] + ' ' + table['last_name']
+        fa = table[table['player_id'].isin(active_ids)]
+        fa = fa[~fa['player_id'].isin(rostered_ids)]
+        fa['fantasy_position'] = fa['player'].apply(lambda x: x['fantasy_positions'][0] if 'fantasy_positions' in x else None)
+        fa['first_name'] = fa['player'].apply(lambda x: x['first_name'] if 'first_name' in x else None)
+        fa['last_name'] = fa['player'].apply(lambda x: x['last_name'] if 'last_name' in x else None)
+        fa['full_name'] = fa['first_name'] + ' ' + fa['last_name']
+        by_pos = {}
+        for pos in POSITIONS:
+            pos_table = fa[fa['fantasy_position'] == pos]
+            by_pos[pos] = pd.concat([pos_table.drop('stats', axis=1).reset_index(drop=True), pd.json_normalize(pos_table['stats'])], axis=1)
+        tables.append((table, by_pos))
+    return tables
+
+
+def columnar_ingest(prjs, srjs, rostered_ids, active_ids):
+    projs = flatten_stats_payload(prjs)
+    stats = flatten_stats_payload(srjs)
+    fa_stats, fa_proj = get_free_agents(rostered_ids, stats, projs, active_ids)
+    return projs, stats, get_position_data(fa_stats, fa_proj)
+
+
+def measure(fn, *args):
+    # timed and memory-traced in separate runs, since tracemalloc slows down allocation-heavy code
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': round(elapsed, 4), 'peak_mb': round(peak / 2**20, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare legacy and columnar ingestion of Sleeper projections/stats.')
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE, help='saved payloads; a synthetic fixture is used if the file does not exist')
+    parser.add_argument('--save', action='store_true', help='download the live payloads into the fixture first')
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixture(args.fixture)
+    source = args.fixture if os.path.exists(args.fixture) else 'synthetic'
+    fixture = load_fixture(args.fixture)
+    prjs, srjs = fixture['projections'], fixture['stats']
+
+    # every player is active and none are rostered so both paths do the full amount of work
+    active_ids = list({str(record['player_id']) for record in prjs + srjs})
+    results = {}
+    for name, fn in [('legacy', legacy_ingest), ('columnar', columnar_ingest)]:
+        results[name] = measure(fn, prjs, srjs, [], active_ids)
+    print(json.dumps({'fixture': source, 'records': len(prjs) + len(srjs), **results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
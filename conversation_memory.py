@@ -0,0 +1,131 @@
+import json
+
+DEFAULT_MAX_PROMPT_TOKENS = 3000
+# fields of a player kept when an old command result is compressed
+SUMMARY_FIELDS = ['player_id', 'fullName', 'position', 'adp', 'pos_adp', 'total_proj']
+RESULT_PREFIX = 'Command result: '
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English/JSON; close enough to budget prompts without a tokenizer
+    return len(text) // 4 + 1
+
+
+def message_tokens(message):
+    # a few tokens of per-message overhead for the role and separators
+    return estimate_tokens(str(message.get('content') or '')) + 4
+
+
+def usage_totals(usage):
+    return {
+        'calls': len(usage),
+        'prompt_tokens': sum(u['prompt_tokens'] for u in usage),
+        'completion_tokens': sum(u['completion_tokens'] for u in usage),
+        'max_prompt_tokens': max((u['estimated_prompt_tokens'] for u in usage), default=0),
+    }
+
+
+def _round(value):
+    return round(value, 1) if isinstance(value, float) else value
+
+
+def summarize_result(result):
+    """
+    Compact form of a command result: player ids plus their key metrics only.
+    """
+    if isinstance(result, list) and result and all(isinstance(r, dict) for r in result):
+        return ' | '.join(summarize_result(r) for r in result)
+    if isinstance(result, dict) and 'player_id' in result:
+        return ', '.join(f'{field}={_round(result[field])}' for field in SUMMARY_FIELDS if field in result)
+    text = result if isinstance(result, str) else json.dumps(result, default=str)
+    return text if len(text) <= 200 else text[:200] + '...'
+
+
+class ConversationMemory:
+    """
+    Conversation history for the ACI loop kept under a prompt token budget.
+
+    The system prompt is pinned, and so is anything added with pin() (the
+    pick context the turn starts from). Command results are stored in full
+    and in a compressed form (player ids and key metrics). Only the most
+    recent keep_full_results of them are sent in full. If the prompt is still
+    over max_tokens, the oldest messages are dropped behind a single
+    placeholder, but never a pinned message or the latest message.
+
+    :param system_message: pinned system prompt message
+    :param max_tokens: ceiling on the estimated prompt size sent per call
+    :param keep_full_results: number of most recent command results sent uncompressed
+    """
+
+    def __init__(self, system_message, max_tokens=DEFAULT_MAX_PROMPT_TOKENS, keep_full_results=1):
+        self.system_message = system_message
+        self.pinned = [system_message]
+        self.max_tokens = max_tokens
+        self.keep_full_results = keep_full_results
+        self.history = []
+        self.compressed = {}
+        self.usage = []
+
+    def append(self, message):
+        self.history.append(message)
+
+    def pin(self, message):
+        """
+        Add a message that is always sent, right after the system prompt.
+        """
+        self.pinned.append(message)
+
+    def add_results(self, results):
+        """
+        Add the observations of one turn as a single message.
+
+        :param results: list of (command text, result) pairs
+        """
+        self.compressed[len(self.history)] = {"role": "system", "content": '\n'.join(f'{RESULT_PREFIX}{command} -> {summarize_result(result)}' for command, result in results)}
+        self.append({"role": "system", "content": '\n'.join(f'{RESULT_PREFIX}{command} -> {result}' for command, result in results)})
+
+    def messages(self):
+        """
+        The prompt to send: pinned messages plus as much recent history as fits the budget.
+        """
+        full_results = sorted(self.compressed)[-self.keep_full_results:] if self.keep_full_results else []
+        history = [
+            self.compressed[i] if i in self.compressed and i not in full_results else message
+            for i, message in enumerate(self.history)
+        ]
+        # a single oversized result can break the budget on its own; fall back to its compressed form
+        for i in full_results:
+            if message_tokens(history[i]) > self.max_tokens // 2:
+                history[i] = self.compressed[i]
+
+        budget = self.max_tokens - sum(message_tokens(message) for message in self.pinned)
+        kept = []
+        for message in reversed(history):
+            cost = message_tokens(message)
+            if kept and cost > budget:
+                break
+            kept.append(message)
+            budget -= cost
+        kept.reverse()
+
+        omitted = len(history) - len(kept)
+        if omitted:
+            placeholder = {"role": "system", "content": f"[{omitted} earlier messages omitted]"}
+            if message_tokens(placeholder) > budget and len(kept) > 1:
+                kept = kept[1:]
+                omitted += 1
+                placeholder = {"role": "system", "content": f"[{omitted} earlier messages omitted]"}
+            kept = [placeholder] + kept
+        return self.pinned + kept
+
+    def record_usage(self, prompt, response):
+        """
+        Log token usage for one call, from the API's usage field when present, else estimated.
+        """
+        usage = response.get('usage') or {}
+        prompt_tokens = sum(message_tokens(m) for m in prompt)
+        self.usage.append({
+            'estimated_prompt_tokens': prompt_tokens,
+            'prompt_tokens': usage.get('prompt_tokens', prompt_tokens),
+            'completion_tokens': usage.get('completion_tokens', estimate_tokens(response['choices'][0]['message'].get('content') or '')),
+        })
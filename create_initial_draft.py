@@ -1,114 +1,151 @@
+import argparse
 import json
-import junkdrawer as jd
+import os
 import requests
-import numpy as np
 import pandas as pd
+from draft_table import write_draft_table
+from http_cache import HTTPCache
+from league_snapshot import DEFAULT_SNAPSHOT_DIR, SnapshotStore
+from name_resolver import NAME_MARGIN, NameIndex, PLAYER_ALIASES
+from projection_fetcher import ProjectionFetcher
 
-players_req = requests.get('https://api.sleeper.com/players/nfl/')
-psj = players_req.json()
-
-df = pd.DataFrame(psj).T
-valid_pos = [['WR'], ['RB'], ['TE'], ['K'], ['QB'], ['QB', 'TE']]
-draftable_df = df[(df['active']) & (df['fantasy_positions'].isin(valid_pos))]
-ddf = draftable_df
-ddf['fullName'] = ddf['first_name'] + ' ' + ddf['last_name']
-ddf['player_id'] = ddf['player_id'].str.strip()
-
-
-offset = 0
-espn_url = 'https://lm-api-reads.fantasy.espn.com/apis/v3/games/ffl/seasons/2024/segments/0/leaguedefaults/3?view=kona_player_info'
-js_responses = []
-while offset < 700:
-    print('offset: ', offset)
-    espn_filter = jd.create_filter_json(offset)
-    espn_headers = {
-    'x-fantasy-filter': espn_filter
-    }
-    print('requesting espn ...')
-    espn_req = requests.get(espn_url, headers=espn_headers)
-    espnjs = espn_req.json()
-    js_responses.append(espnjs)
-    offset += 50
-
-player_dicts = [
-    pd.DataFrame(js_responses[r]['players'][x])['player'].T[['active', 'id', 'firstName', 'fullName', 'seasonOutlook']].to_dict()
-    for r in range(14)
-    for x in range(50)
-    if 'seasonOutlook' in pd.DataFrame(js_responses[r]['players'][x])['player'].T
-]
-
-epdf = pd.DataFrame(player_dicts)
-
-np.setdiff1d(epdf['fullName'].values, ddf['fullName'].values)
-name_mapping = {
-    'Brian Robinson Jr.': 'Brian Robinson',
-    'Brian Thomas Jr.': 'Brian Thomas',
-    'Browns D/ST': 'Cleveland Browns',
-    'Chiefs D/ST': 'Kansas City Chiefs',
-    'Colts D/ST': 'Indianapolis Colts',
-    'Cowboys D/ST': 'Dallas Cowboys',
-    'DJ Chark Jr.': 'DJ Chark',
-    'Deebo Samuel Sr.': 'Deebo Samuel',
-    'Dolphins D/ST': 'Miami Dolphins',
-    'Jaguars D/ST': 'Jacksonville Jaguars',
-    'Jeff Wilson Jr.': 'Jeff Wilson',
-    'Jets D/ST': 'New York Jets',
-    'Kenneth Walker III': 'Kenneth Walker',
-    'Lions D/ST': 'Detroit Lions',
-    'Marquise Brown': 'Hollywood Brown',
-    'Marvin Harrison Jr.': 'Marvin Harrison',
-    'Marvin Mims Jr.': 'Marvin Mims',
-    'Michael Penix Jr.': 'Michael Penix',
-    'Michael Pittman Jr.': 'Michael Pittman',
-    'Odell Beckham Jr.': 'Odell Beckham',
-    'Ravens D/ST': 'Baltimore Ravens',
-    'Saints D/ST': 'New Orleans Saints',
-    'Steelers D/ST': 'Pittsburgh Steelers',
-    'Texans D/ST': 'Houston Texans',
-    'Travis Etienne Jr.': 'Travis Etienne',
-    'Tyrone Tracy Jr.': 'Tyrone Tracy',
-    '49ers D/ST': 'San Francisco 49ers',
-    'Bears D/ST': 'Chicago Bears', 
-    'Bengals D/ST': 'Cincinnati Bengals', 
-    'Bills D/ST': 'Buffalo Bills',
-}
-epdf['fullName_original'] = epdf['fullName']
-epdf['fullName'] = epdf['fullName'].replace(name_mapping)
-
-mdf = epdf.merge(ddf, on='fullName', how='left')
-
-# under 1000 API calls per minute
-# 1000/60 per second
-# wait 
-rate_limit_wait_raw = 6/100
-rate_limit_wait = rate_limit_wait_raw * 1.01
-
-pid_js_map = {}
-for pid in mdf.index.values:
-    print(pid)
-    rtime = time.time()
-    proj_request = requests.get(f'https://api.sleeper.com/projections/nfl/player/{pid}?season_type=regular&season=2024&grouping=week')
-    prjs = proj_request.json()
-    pid_js_map[pid] = prjs
-    used_time = time.time()-rtime
-    sleep_time = max(0, rate_limit_wait-used_time)
-    time.sleep(sleep_time)
-    
-pid_data = {}
-for pid in pid_js_map.keys():
-    this_data = pid_js_map[pid]
-    if this_data['1'] is not None:
-        adp = this_data['1']['stats']['adp_dd_ppr']
-        pos_adp = this_data['1']['stats']['pos_adp_dd_ppr']
-        # print(this_data[x])
-        total_proj = sum([this_data[x]['stats']['pts_ppr']for x in this_data.keys() if this_data[x] is not None and 'pts_ppr' in this_data[x]['stats'].keys()])
-        pid_data[pid] = {'adp': adp, 'pos_adp': pos_adp, 'total_proj': total_proj}
-        
-draft_data = pd.DataFrame(pid_data).T.reset_index().rename(columns={'index': 'player_id'})
-draft_data['player_id'] = draft_data['player_id'].astype(str)
-
-m2df = mdf.merge(draft_data, on='player_id', how='left')
-
-draft_df = m2df[['fullName', 'seasonOutlook', 'position', 'player_id', 'team', 'injury_status', 'adp', 'pos_adp', 'total_proj']]
-
-draft_df.to_csv('initialdraftdf2.csv')
+def fetch_json(url, headers=None, cache=None, max_age=None):
+    if cache is None:
+        return requests.get(url, headers=headers).json()
+    payload, changed = cache.get(url, headers=headers, max_age=max_age)
+    print(f"{'refetched' if changed else 'unchanged'}: {url}")
+    return payload
+
+def get_sleeper_players(snapshots):
+    """
+    Active draftable Sleeper players, from the shared players snapshot.
+    """
+    df = snapshots.players()
+    valid_pos = ['WR', 'RB', 'TE', 'K', 'QB', 'QB,TE']
+    ddf = df[df['active'] & df['fantasy_positions'].isin(valid_pos)].rename(columns={'full_name': 'fullName'})
+    ddf['player_id'] = ddf['player_id'].str.strip()
+    return ddf
+
+def get_espn_players(cache=None, max_age=None):
+    import junkdrawer as jd
+
+    offset = 0
+    espn_url = 'https://lm-api-reads.fantasy.espn.com/apis/v3/games/ffl/seasons/2024/segments/0/leaguedefaults/3?view=kona_player_info'
+    js_responses = []
+    while offset < 700:
+        print('offset: ', offset)
+        espn_filter = jd.create_filter_json(offset)
+        espn_headers = {
+        'x-fantasy-filter': espn_filter
+        }
+        print('requesting espn ...')
+        espnjs = fetch_json(espn_url, headers=espn_headers, cache=cache, max_age=max_age)
+        js_responses.append(espnjs)
+        offset += 50
+
+    player_dicts = [
+        pd.DataFrame(js_responses[r]['players'][x])['player'].T[['active', 'id', 'firstName', 'fullName', 'seasonOutlook']].to_dict()
+        for r in range(14)
+        for x in range(50)
+        if 'seasonOutlook' in pd.DataFrame(js_responses[r]['players'][x])['player'].T
+    ]
+
+    return pd.DataFrame(player_dicts)
+
+def merge_players(epdf, ddf, min_score=0.9, margin=NAME_MARGIN):
+    """
+    Join ESPN players to Sleeper players by name.
+
+    Names are matched through a NameIndex over the Sleeper names. Jr./III
+    suffixes, "<team> D/ST" and known aliases resolve exactly; other spelling
+    differences fall back to a fuzzy match of at least min_score. A name
+    shared by two Sleeper players, or one whose two best fuzzy matches are
+    within margin, is left unmatched. ESPN players without a match keep their
+    own name and get no Sleeper columns.
+    """
+    sleeper = ddf[ddf['fullName'].notna()].reset_index(drop=True)
+    index = NameIndex(sleeper['fullName'].astype(str), aliases=PLAYER_ALIASES)
+    rows = index.find_many(epdf['fullName'].tolist(), min_score=min_score, margin=margin)
+    epdf['fullName_original'] = epdf['fullName']
+    epdf['fullName'] = [index.choices[row] if row >= 0 else espn for row, espn in zip(rows, epdf['fullName'])]
+    print(f"matched {int((rows >= 0).sum())} of {len(epdf)} ESPN players to Sleeper names")
+
+    # joined on the matched row rather than the name, so unmatched players never pick up a namesake
+    epdf['sleeper_row'] = rows
+    sleeper = sleeper.drop(columns='fullName').rename_axis('sleeper_row').reset_index()
+    return epdf.merge(sleeper, on='sleeper_row', how='left').drop(columns='sleeper_row')
+
+def summarize_projection(this_data):
+    adp = this_data['1']['stats']['adp_dd_ppr']
+    pos_adp = this_data['1']['stats']['pos_adp_dd_ppr']
+    total_proj = sum([this_data[x]['stats']['pts_ppr']for x in this_data.keys() if this_data[x] is not None and 'pts_ppr' in this_data[x]['stats'].keys()])
+    return {'adp': adp, 'pos_adp': pos_adp, 'total_proj': total_proj}
+
+def summarize_projections(pid_js_map, previous=None, changed=None):
+    """
+    Reduce each player's weekly projections to adp, pos_adp and total_proj.
+
+    With a previous draft table and the set of changed player ids, only the
+    changed (or newly seen) players are recomputed; every other row is reused.
+    """
+    to_compute = set(pid_js_map.keys())
+    pid_data = {}
+    if previous is not None and changed is not None:
+        reusable = previous.dropna(subset=['adp']).drop_duplicates('player_id').set_index('player_id')
+        to_compute = {pid for pid in pid_js_map if pid in changed or pid not in reusable.index}
+        for pid in pid_js_map.keys() - to_compute:
+            pid_data[pid] = reusable.loc[pid, ['adp', 'pos_adp', 'total_proj']].to_dict()
+        print(f'recomputing {len(to_compute)} of {len(pid_js_map)} draft rows')
+
+    for pid in to_compute:
+        this_data = pid_js_map[pid]
+        if this_data['1'] is not None:
+            pid_data[pid] = summarize_projection(this_data)
+
+    draft_data = pd.DataFrame(pid_data).T.reset_index().rename(columns={'index': 'player_id'})
+    draft_data['player_id'] = draft_data['player_id'].astype(str)
+    return draft_data
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the draft player table from Sleeper and ESPN data.')
+    parser.add_argument('--incremental', action='store_true', help='reuse cached payloads and only refetch stale or missing ones')
+    parser.add_argument('--max-age-hours', type=float, default=24, help='age after which a cached payload is revalidated')
+    parser.add_argument('--cache-dir', default='.http_cache')
+    parser.add_argument('--snapshot-dir', default=DEFAULT_SNAPSHOT_DIR, help='shared Sleeper players snapshot (also used by roster_actions.py)')
+    parser.add_argument('--output', default='initialdraftdf2.csv')
+    parser.add_argument('--binary-output', default='initialdraft2', help='directory for the memory-mappable copy of the table')
+    args = parser.parse_args()
+
+    cache = HTTPCache(args.cache_dir) if args.incremental else None
+    max_age = args.max_age_hours * 3600
+
+    # without --incremental the players snapshot is still revalidated, but only downloaded again if it changed
+    snapshots = SnapshotStore(args.snapshot_dir, max_age={'players': max_age if args.incremental else 0})
+    ddf = get_sleeper_players(snapshots)
+    epdf = get_espn_players(cache, max_age)
+    mdf = merge_players(epdf, ddf)
+
+    # ESPN players without a Sleeper match have no player_id to fetch
+    pids = mdf['player_id'].dropna().values
+    if args.incremental:
+        # the HTTP cache already remembers finished players, so no separate checkpoint
+        fetcher = ProjectionFetcher(checkpoint_path=None, cache=cache, max_age=max_age)
+    else:
+        fetcher = ProjectionFetcher()
+    pid_js_map, failed, changed = fetcher.fetch_all(pids)
+    if failed:
+        print(f'failed to fetch projections for {len(failed)} players: {json.dumps(failed)}')
+
+    previous = None
+    if args.incremental and os.path.exists(args.output):
+        previous = pd.read_csv(args.output, index_col=0, dtype={'player_id': str})
+    draft_data = summarize_projections(pid_js_map, previous, changed)
+    m2df = mdf.merge(draft_data, on='player_id', how='left')
+
+    draft_df = m2df[['fullName', 'seasonOutlook', 'position', 'player_id', 'team', 'injury_status', 'adp', 'pos_adp', 'total_proj']]
+
+    draft_df.to_csv(args.output)
+    write_draft_table(draft_df, args.binary_output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import numpy as np
+
+from name_resolver import NAME_MARGIN, NameIndex
+
+POSITIONS = ['RB', 'WR', 'QB', 'TE', 'K', 'DEF']
+METRICS = ['adp', 'pos_adp', 'total_proj']
+
+
+class DraftBoard:
+    """
+    Availability index over the draft player table.
+
+    Orderings by every metric (overall and per position) are computed once when
+    the board is built. Drafting a player only flips its bit in the drafted
+    bitmap, so top-n queries read off the precomputed order instead of
+    filtering and re-sorting the whole DataFrame.
+
+    :param df: draft player table
+    :param outlooks: optional lazily decoded seasonOutlook column (see
+                     draft_table.TextColumn) for tables loaded without it
+    """
+
+    def __init__(self, df, outlooks=None):
+        self.df = df.reset_index(drop=True)
+        self.outlooks = outlooks
+        self.player_ids = self.df['player_id'].astype(str).to_numpy(dtype=object)
+        self.names = self.df['fullName'].to_numpy(dtype=object)
+        self.positions = self.df['position'].to_numpy(dtype=object)
+        self.row_of = {pid: row for row, pid in enumerate(self.player_ids)}
+        # lets commands name a player instead of giving its id
+        self.name_index = NameIndex(str(name) for name in self.names)
+        self.drafted = np.zeros(len(self.df), dtype=bool)
+        self.values = {metric: self.df[metric].to_numpy(dtype=float) for metric in METRICS}
+
+        self.orders = {}
+        for metric in METRICS:
+            values = self.values[metric]
+            # projections rank high-to-low, adp ranks low-to-high; NaN sorts last either way
+            order = np.argsort(-values if metric == 'total_proj' else values, kind='stable')
+            self.orders[(metric, None)] = order
+            for pos in POSITIONS:
+                self.orders[(metric, pos)] = order[self.positions[order] == pos]
+        # first position in each ordering that might still be available
+        self.heads = {key: 0 for key in self.orders}
+        # entries of the orderings visited by top_rows, for benchmarking
+        self.rows_scanned = 0
+
+    def fork(self):
+        """
+        Copy of the board with its own drafted bitmap; the table and orderings are shared read-only.
+        """
+        board = object.__new__(DraftBoard)
+        board.__dict__.update(self.__dict__)
+        board.drafted = self.drafted.copy()
+        board.heads = dict(self.heads)
+        return board
+
+    def resolve(self, text):
+        """
+        player_id for a player_id or a player's name, or None.
+
+        Names must match exactly after normalization (case, punctuation,
+        Jr./III suffixes) or be a near-certain fuzzy match, and must point at
+        a single player: a name shared by two players, or one that scores
+        about as well against a second player, resolves to None.
+        """
+        text = str(text).strip()
+        if text in self.row_of:
+            return text
+        row = self.name_index.find(text, min_score=0.9, margin=NAME_MARGIN)
+        return None if row is None else self.player_ids[row]
+
+    def is_available(self, player_id):
+        row = self.row_of.get(str(player_id))
+        return row is not None and not self.drafted[row]
+
+    def mark_drafted(self, player_id):
+        row = self.row_of.get(str(player_id))
+        if row is not None:
+            self.drafted[row] = True
+
+    def top_rows(self, n, metric, position=None):
+        key = (metric, position)
+        order = self.orders[key]
+        head = self.heads[key]
+        # drafted players cluster at the front of each ordering, so skip them once
+        start = head
+        while head < len(order) and self.drafted[order[head]]:
+            head += 1
+        self.heads[key] = head
+
+        rows = []
+        scanned = head - start
+        for row in order[head:]:
+            if len(rows) >= n:
+                break
+            scanned += 1
+            if not self.drafted[row]:
+                rows.append(row)
+        self.rows_scanned += scanned
+        return rows
+
+    def top(self, n, metric, position=None):
+        values = self.values[metric]
+        return [
+            {
+                'player_id': self.player_ids[row],
+                'fullName': self.names[row],
+                'position': self.positions[row],
+                metric: values[row].item(),
+            }
+            for row in self.top_rows(n, metric, position)
+        ]
+
+    def player_info(self, player_id):
+        row = self.row_of[str(player_id)]
+        info = self.df.iloc[row].to_dict()
+        if self.outlooks is not None:
+            info['seasonOutlook'] = self.outlooks[row]
+        return info
+
+    def roster(self, player_ids):
+        return [
+            {'player_id': self.player_ids[row], 'fullName': self.names[row], 'position': self.positions[row]}
+            for row in (self.row_of[str(pid)] for pid in player_ids if str(pid) in self.row_of)
+        ]
+
+    def total(self, player_ids, metric):
+        rows = [self.row_of[str(pid)] for pid in player_ids if str(pid) in self.row_of]
+        return float(np.nansum(self.values[metric][rows]))
+
+    def available_position_counts(self):
+        positions, counts = np.unique(self.positions[~self.drafted], return_counts=True)
+        return {pos: int(count) for pos, count in sorted(zip(positions, counts), key=lambda x: -x[1])}
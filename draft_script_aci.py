@@ -1,14 +1,29 @@
 
-import pandas as pd
+import numpy as np
+import argparse
+import contextlib
 import json
 import os
 import time
 import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from fuzzywuzzy import process
+from adp_simulator import AvailabilitySimulator
+from draft_board import DraftBoard, POSITIONS, METRICS
+from draft_state import DraftState
+from draft_log import DraftLog, read_events
+from draft_sync import DraftSync, SLEEPER_APP_API
+from llm_client import get_client
+from llm_cache import LLMCache, DEFAULT_CACHE_PATH
+from conversation_memory import ConversationMemory, DEFAULT_MAX_PROMPT_TOKENS, usage_totals
+from draft_table import load_player_table
+from name_resolver import NameIndex, normalize_text
+from tracing import Tracer, span, use_tracer
 load_dotenv()
 
+ROSTER_SIZE = 14
+
 def sleeper_send_chat(text, agent, draft_id, parent_id=os.getenv('PARENT_ID'), client_id=os.getenv('CLIENT_ID'), sleeper_auth=os.getenv('SLEEPER_AUTH')):
     headers = {"authority": 'sleeper.com',
 "accept": 'application/json',
@@ -27,7 +42,9 @@ def sleeper_send_chat(text, agent, draft_id, parent_id=os.getenv('PARENT_ID'), c
       }
     }
     
-    resp = requests.post('https://sleeper.com/graphql', headers=headers, json=payload)
+    with span('sleeper.send_chat', draft_id=draft_id) as attrs:
+        resp = requests.post('https://sleeper.com/graphql', headers=headers, json=payload)
+        attrs.update(status=resp.status_code, response_bytes=len(resp.content))
     resp_js = resp.json()
     if 'errors' in resp_js:
         print(resp_js['errors'])
@@ -65,7 +82,9 @@ def sleeper_draft_player(pid, pick_no, draft_id, sleeper_auth=os.getenv('SLEEPER
         """,
         "variables": {}
     }
-    resp = requests.post('https://sleeper.com/graphql', headers=headers, json=payload)
+    with span('sleeper.draft_player', draft_id=draft_id, pick_no=pick_no) as attrs:
+        resp = requests.post('https://sleeper.com/graphql', headers=headers, json=payload)
+        attrs.update(status=resp.status_code, response_bytes=len(resp.content))
     resp_js = resp.json()
     if 'errors' in resp_js:
         print(resp_js['errors'])
@@ -76,78 +95,126 @@ def sleeper_draft_player(pid, pick_no, draft_id, sleeper_auth=os.getenv('SLEEPER
         return 0
     
 
+def sleeper_submit_pick(draft_id):
+    """
+    A DraftSync submit function that drafts the player on Sleeper and posts the agent's thoughts to the draft chat.
+    """
+    def submit(player_id, pick_number, agent, thoughts):
+        if sleeper_draft_player(player_id, pick_number, draft_id):
+            sleeper_send_chat(thoughts, agent, draft_id)
+    return submit
+
 def debug_print(message, level, current_debug_level):
     if current_debug_level >= level:
         print(message)
         
-def openrouter_req(model, messages, key):
-    response = requests.post(
-        url="https://openrouter.ai/api/v1/chat/completions",
-        headers={
-            "Authorization": f"Bearer {key}",
-        },
-        json={
-            "model": model,
-            "messages": messages
-        }
-    )
-    return response.json()
+def openrouter_req(model, messages, key, seed=None, cache=None):
+    with span('llm.request', model=model, messages=len(messages), prompt_chars=sum(len(str(m.get('content') or '')) for m in messages)) as attrs:
+        response = get_client(key).request(model, messages, seed=seed, cache=cache, trace=attrs)
+        attrs.update(response.get('usage') or {})
+        return response
 
-def manage_conversation_history(history, new_message, max_messages=10):
-    if len(history) >= max_messages:
-        # Summarize older messages
-        summary = {"role": "system", "content": f"[{len(history) - max_messages + 1} earlier messages omitted]"}
-        history = [summary] + history[-(max_messages-1):]
-    
-    history.append(new_message)
-    return history
+POSITION_INDEX = NameIndex(POSITIONS, aliases={
+    'quarterback': 'QB', 'running back': 'RB', 'wide receiver': 'WR', 'tight end': 'TE',
+    'kicker': 'K', 'defense': 'DEF', 'd/st': 'DEF', 'dst': 'DEF',
+}, normalize=normalize_text)
+METRIC_INDEX = NameIndex(METRICS, aliases={
+    'position adp': 'pos_adp', 'positional adp': 'pos_adp',
+    'projection': 'total_proj', 'projected points': 'total_proj', 'points': 'total_proj',
+}, normalize=normalize_text)
 
-def get_top_players(df, drafted_pids, n=10, original_metric='adp', position=None):
-    original_metric = original_metric.strip("'").strip('"')
-    df = df[~df['player_id'].isin(drafted_pids)]
-    
+def resolve_choice(index, text, kind):
+    choice = index.match(str(text).strip("'").strip('"'))
+    if choice is None:
+        raise ValueError(f"Unknown {kind}: {text}; expected one of {', '.join(index.choices)}")
+    return choice
+
+def get_top_players(board, n=10, original_metric='adp', position=None):
     if type(n) != int:
         n = int(n)
-        
+
+    pos = None
     if position is not None:
-        best_match_pos = process.extractOne(position, choices=['RB', 'WR', 'QB', 'TE', 'K', 'DEF'])
-        pos = best_match_pos[0]
-        df = df[df['position']==pos]
-    
-    best_match_metric = process.extractOne(original_metric, choices=["adp", "pos_adp", "total_proj"])
-    metric = best_match_metric[0]
-    
-    if metric == 'total_proj':
-        return df.sort_values(metric, ascending=False).head(int(n))[['player_id', 'fullName', 'position', metric]].to_dict('records')
-    else:
-        return df.sort_values(metric).head(int(n))[['player_id', 'fullName', 'position', metric]].to_dict('records')
+        pos = resolve_choice(POSITION_INDEX, position, 'position')
+    metric = resolve_choice(METRIC_INDEX, original_metric, 'metric')
 
-def get_player_info(df, player_id):
-    return df[df['player_id'] == player_id].to_dict('records')[0]
+    return board.top(n, metric, pos)
 
-def get_team_roster(df, drafted_pids):
-    return df[df['player_id'].isin(drafted_pids)][['player_id', 'fullName', 'position']].to_dict('records')
+def get_player_info(board, player_id):
+    return board.player_info(board.resolve(player_id) or player_id)
 
-def get_draft_status(pick_number):
-    round_number = (pick_number - 1) // 12 + 1
-    pick_in_round = (pick_number - 1) % 12 + 1
-    return {"round": round_number, "pick_in_round": pick_in_round, "overall_pick": pick_number}
+def get_team_roster(board, roster_pids):
+    return board.roster(roster_pids)
 
-def parse_command(command_string):
-    # - A command name (letters, numbers, underscores)
-    # - An opening parenthesis
-    # - Optional parameters which can be numbers or quoted strings
-    # - A closing parenthesis
-    pattern = r'(\w+)\(([^)]*)\)'
-    
-    match = re.match(pattern, command_string)
-    if match:
-        command = match.group(1)
-        params = re.findall(r'\s*(?:(\'[^\']*\')|([^\s,]+))\s*', match.group(2))
-        params = [(param[0].strip("'") if param[0] else int(param[1]) if param[1].isdigit() else param[1].strip()) for param in params]
-        return command, params
+def get_draft_status(state, pick_number):
+    return state.draft_status(pick_number)
+
+def get_value_board(state, n=8, position=None):
+    """
+    Top available players by value over replacement, plus the scarcity table behind it.
+    """
+    if position is not None:
+        position = resolve_choice(POSITION_INDEX, position, 'position')
+    return {
+        'top_by_vorp': state.value_table.top(state.board, state.open_slots, int(n), position),
+        'scarcity': state.value_table.scarcity(state.board, state.open_slots),
+    }
+
+# enough for ~1% precision; a call costs roughly 0.1-0.15s when the next pick is a full snake round away
+AVAILABILITY_SIMULATIONS = 10_000
+
+def get_availability(state, agent, pick_number, player=None, n=8):
+    """
+    Chance players are still on the board at the agent's next two picks, from simulated ADP drafts.
+
+    :param player: a player_id or name; without one, the top n available by ADP are reported
+    """
+    if isinstance(player, int):
+        player, n = None, player
+    upcoming = state.next_picks(agent, pick_number)
+    if not upcoming:
+        return "This is your last pick"
+    board = state.board
+    simulator = AvailabilitySimulator(board, teams=state.teams, rounds=state.rounds or ROSTER_SIZE, n_sims=AVAILABILITY_SIMULATIONS)
+    # only opponents take players away: leave out the agent's own pick on the clock and
+    # its earlier upcoming picks (upcoming[:i]) from the picks before each target pick
+    rows, chances = simulator.availability([pick - pick_number - 1 - i for i, pick in enumerate(upcoming)])
+    if player is not None:
+        player_id = board.resolve(player)
+        if player_id is None or not board.is_available(player_id):
+            raise ValueError(f"{player} is not an available player")
+        selected = [board.row_of[player_id]]
     else:
-        return None, None
+        selected = [board.row_of[p['player_id']] for p in board.top(int(n), 'adp')]
+    return [
+        {
+            'player_id': board.player_ids[row],
+            'fullName': board.names[row],
+            'position': board.positions[row],
+            'chance_available': {f'pick {pick}': round(float(chances[i, j]), 2) for i, pick in enumerate(upcoming)},
+        }
+        for row, j in zip(selected, np.searchsorted(rows, selected))
+    ]
+
+# - A command name (letters, numbers, underscores)
+# - An opening parenthesis
+# - Optional parameters which can be numbers or quoted strings
+# - A closing parenthesis
+COMMAND_PATTERN = r'(\w+)\(([^)]*)\)'
+MAX_COMMANDS_PER_TURN = 8
+
+def parse_params(param_string):
+    params = re.findall(r'\s*(?:(\'[^\']*\')|([^\s,]+))\s*', param_string)
+    return [(param[0].strip("'") if param[0] else int(param[1]) if param[1].isdigit() else param[1].strip()) for param in params]
+
+def parse_commands(action):
+    """
+    Every command in an action block, as (command, params, text) in the order given.
+    """
+    return [
+        (match.group(1), parse_params(match.group(2)), match.group(0))
+        for match in re.finditer(COMMAND_PATTERN, action)
+    ][:MAX_COMMANDS_PER_TURN]
     
 def parse_lm_response(response):
     parts = response.split('Action:', 1)
@@ -155,41 +222,30 @@ def parse_lm_response(response):
     action = parts[1].strip() if len(parts) > 1 else ''
     return thought, action
 
-def execute_command(command, params, df, drafted_pids, agent_rosters, agent, pick_number):
+def execute_command(command, params, state, agent, pick_number):
     if command == "get_top_players":
-        return get_top_players(df, drafted_pids,  *params)
+        return get_top_players(state.board, *params)
     elif command == "get_player_info":
-        return get_player_info(df, *params)
+        return get_player_info(state.board, *params)
     elif command == "get_team_roster":
-        return get_team_roster(df, agent_rosters[agent])
+        return get_team_roster(state.board, state.agent_rosters[agent])
     elif command == "get_draft_status":
-        return get_draft_status(pick_number)
+        return get_draft_status(state, pick_number)
+    elif command == "get_value_board":
+        return get_value_board(state, *params)
+    elif command == "get_availability":
+        return get_availability(state, agent, pick_number, *params)
     else:
         return f"Unknown command: {command}"
 
-def get_current_context(agent, df, drafted_pids, pick_number):
-    context = {
-        "draft_status": get_draft_status(pick_number),
-        "drafted_players": drafted_pids,
-        "team_roster": get_team_roster(df, agent_rosters[agent]),
-        "available_positions": df[~df['player_id'].isin(drafted_pids)]['position'].value_counts().to_dict()
-    }
-    return json.dumps(context)
+def get_current_context(agent, state, pick_number):
+    return json.dumps(state.context(agent, pick_number))
 
-def manage_history(history, new_observation, max_observations=5):
+def draft_player_aci(agent, model, key, state, pick_number, seed=None, llm_cache=None, max_turns=10, max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS, usage=None, debug_level=0):
     """
-    Manage the history of observations.
-    Keep the most recent observations and collapse older ones.
+    :param usage: optional list that receives one token usage record per LLM call
     """
-    if len(history) >= max_observations:
-        collapsed = f"[{len(history) - max_observations + 1} earlier observations]"
-        history = [collapsed] + history[-(max_observations-1):]
-    
-    history.append(new_observation)
-    return history
-
-def draft_player_aci(agent, model, key, df, drafted_pids, pick_number, debug_level=0):
-    context = get_current_context(agent, df, drafted_pids, pick_number)
+    context = get_current_context(agent, state, pick_number)
     
     debug_print(f"Debug Level: {debug_level}", 1, debug_level)
     debug_print(f"Current Context: {context}", 2, debug_level)
@@ -205,28 +261,38 @@ def draft_player_aci(agent, model, key, df, drafted_pids, pick_number, debug_lev
         - get_player_info(player_id): Returns detailed info for a specific player
         - get_team_roster(): Returns the current roster of your team
         - get_draft_status(): Returns current draft round, pick, etc.
+        - get_value_board(n=8, position=None): Top n available players by value over replacement (VORP) with their tiers, plus per-position replacement levels and how many players are left in the current tier
+        - get_availability(player=None, n=8): Chance a player (id or name), or each of the top n by adp, is still available at your next two picks
+        - ex1: get_availability('Puka Nacua')
         - draft_player(player_id): Attempts to draft player
 
-        Respond with your thought process and then an action using one of these commands.
+        Respond with your thought process and then one or more actions, one command per line.
+        All information commands in a response are run together and their results come back in one message,
+        so ask for everything you need at once. draft_player ends your turn.
         Format your response as:
         Thought: [Your reasoning here]
         Action: [command_name(parameters)]
+        [command_name(parameters)]
         """
     }
     
-    conversation_history = [system_message]
-    
+    memory = ConversationMemory(system_message, max_tokens=max_prompt_tokens)
+    memory.usage = usage if usage is not None else []
+
     user_message = {
         "role": "user",
         "content": f"It's your turn to draft. Here's the current context:\n{context}\n\nWhat would you like to do?"
     }
-    conversation_history = manage_conversation_history(conversation_history, user_message)
+    # the pick context (roster, needs, board) is never dropped from the prompt
+    memory.pin(user_message)
 
     debug_print("Initial conversation history created", 2, debug_level)
 
-    while True:
+    for turn in range(max_turns):
         debug_print("Sending request to OpenRouter API", 1, debug_level)
-        response = openrouter_req(model, conversation_history, key)
+        prompt = memory.messages()
+        response = openrouter_req(model, prompt, key, seed=seed, cache=llm_cache)
+        memory.record_usage(prompt, response)
         assistant_message = response['choices'][0]['message']
         thought, action = parse_lm_response(assistant_message['content'])
         
@@ -235,110 +301,347 @@ def draft_player_aci(agent, model, key, df, drafted_pids, pick_number, debug_lev
         
         debug_print(f"Full assistant message: {assistant_message}", 2, debug_level)
         
-        conversation_history = manage_conversation_history(conversation_history, assistant_message)
+        memory.append(assistant_message)
         
         if not action:
             debug_print("No action provided, skipping pick", 1, debug_level)
-            return None
+            return None, memory.history
 
-        command, params = parse_command(action)
-        
-        debug_print(f"Executing command: {command} with params: {params}", 1, debug_level)
-        result = execute_command(command, params, df, drafted_pids, agent_rosters, agent, pick_number)
-        debug_print(f"Result: {result}", 1, debug_level)
-        
-        system_message = {
-            "role": "system",
-            "content": f"Command result: {result}"
-        }
-        conversation_history = manage_conversation_history(conversation_history, system_message)
-        
-        debug_print("Updated conversation history", 2, debug_level)
-        
-        user_message = {
-            "role": "user",
-            "content": "Based on this information, would you like to draft a player or get more information? If drafting, specify the player_id."
-        }
-        conversation_history = manage_conversation_history(conversation_history, user_message)
-        
-        debug_print("Sending follow-up request to OpenRouter API", 1, debug_level)
-        response = openrouter_req(model, conversation_history, key)
-        assistant_message = response['choices'][0]['message']
-        thought, action = parse_lm_response(assistant_message['content'])
-        
-        debug_print(f"Follow-up response - Thought: {thought}, Action: {action}", 1, debug_level)
-        
-        conversation_history = manage_conversation_history(conversation_history, assistant_message)
-        
-        if 'draft_player' in action:
-            player_id = action.split('(')[1].rstrip(')').strip().strip("'").strip('"')
-            # print('pid', player_id)
-            # print('valid', player_id in df['player_id'].values)
-            # print('not drafted', player_id not in drafted_pids)
-            if player_id in df['player_id'].values and player_id not in drafted_pids:
-                debug_print(f"Valid draft attempt for player_id: {player_id}", 1, debug_level)
-                return player_id, conversation_history
-            else:
+        commands = parse_commands(action)
+        results = []
+        for command, params, text in commands:
+            if command == 'draft_player':
+                player_id = str(params[0]).strip().strip("'").strip('"') if params else ''
+                # a full player name works too, as long as it matches one unambiguously
+                player_id = state.board.resolve(player_id) or player_id
+                if state.board.is_available(player_id):
+                    debug_print(f"Valid draft attempt for player_id: {player_id}", 1, debug_level)
+                    return player_id, memory.history
                 debug_print(f"Invalid draft attempt for player_id: {player_id}", 1, debug_level)
-                system_message = {
-                    "role": "system",
-                    "content": f"Invalid player_id: {player_id}"
-                }
-                conversation_history = manage_conversation_history(conversation_history, system_message)
+                results.append((text, f"Invalid player_id: {player_id}; names must match exactly one available player, otherwise use the player_id"))
+                continue
+            debug_print(f"Executing command: {command} with params: {params}", 1, debug_level)
+            with span('tool', command=command) as attrs:
+                try:
+                    result = execute_command(command, params, state, agent, pick_number)
+                except (KeyError, ValueError, TypeError) as e:
+                    # one bad lookup should not cost the results of the others in the batch
+                    result = f"Error: {e!r}"
+                attrs['result_bytes'] = len(str(result))
+            debug_print(f"Result: {result}", 1, debug_level)
+            results.append((text, result))
+        if not commands:
+            results.append((action, "Could not parse a command; use the format command_name(parameters)"))
+
+        memory.add_results(results)
         
         user_message = {
             "role": "user",
-            "content": "You decided to get more information. What would you like to do next?"
+            "content": "Based on this information, draft a player with draft_player(player_id) or run more commands."
         }
-        conversation_history = manage_conversation_history(conversation_history, user_message)
+        memory.append(user_message)
         debug_print("Continuing to next iteration", 1, debug_level)
-        
-# Main script
-debug_level = 0
-df = pd.read_csv('initialdraftdf.csv')
-key = os.getenv('OPENROUTER_API_KEY')
-sleeper_auth = os.getenv('SLEEPER_AUTH')
 
+    debug_print(f"No valid pick after {max_turns} turns, skipping pick", 1, debug_level)
+    return None, memory.history
 
-draft_id = int(time.time()) # change this
+class DraftSession:
+    """
+    One snake draft: the board, rosters and pick history for a single draft_id.
 
-agents_models = config["models"]
-draft_id = config["draft_id"]
+    All draft state lives on the session, so several sessions can run side by
+    side (see simulate_drafts.py) without sharing module-level globals.
+    """
 
-output_dir = f'out/{draft_id}/'
-os.makedirs(output_dir, exist_ok=True)
+    def __init__(self, df, agents_models, key, draft_id, output_root='out', seed=None, llm_cache=None, outlooks=None, sync_sleeper=False, max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS, speculative=0, trace=True, debug_level=0):
+        self.df = df
+        self.board = DraftBoard(df, outlooks=outlooks)
+        self.agents_models = agents_models
+        self.agents = list(agents_models.keys())
+        self.snake_agents = self.agents + self.agents[::-1]
+        self.key = key
+        self.draft_id = draft_id
+        self.seed = seed
+        self.llm_cache = llm_cache
+        self.sync_sleeper = sync_sleeper
+        self.max_prompt_tokens = max_prompt_tokens
+        self.token_usage = []
+        self.speculative = speculative
+        # spans are exported to trace.jsonl / trace.chrome.json next to summary.json
+        self.tracer = Tracer() if trace else None
+        self.speculation = {'attempts': 0, 'exact_hits': 0, 'revalidated_hits': 0, 'misses': 0}
+        # LLM time of the runs that produced each pick, i.e. what a sequential draft would wait for
+        self.decision_seconds = 0.0
+        self.debug_level = debug_level
+        self.output_dir = os.path.join(output_root, str(draft_id))
+        os.makedirs(self.output_dir, exist_ok=True)
+        # one event per pick; draft_results.json is only written once the draft finishes
+        self.log_path = os.path.join(self.output_dir, 'events.jsonl')
+        self.log = None
+        self.logged_usage = 0
 
-drafted_pids = []
-agent_rosters = {agent: [] for agent in agents_models.keys()}
-agents = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l']
-snake_agents = agents + agents[::-1]
+        self.state = DraftState(self.board, self.agents, rounds=ROSTER_SIZE)
+        # shared with the state, which updates them as picks are recorded
+        self.drafted_pids = self.state.drafted_pids
+        self.agent_rosters = self.state.agent_rosters
+        self.skipped_picks = []
 
-for pick_number in range(1, 169):
-    idx = ((pick_number - 1) % (len(agents_models))) if pick_number > 24 else pick_number-1
-    agent = list(snake_agents)[idx]
-    model = agents_models[agent]
-    
-    print(f"\nPick {pick_number}: Agent {agent}'s turn")
-    player_id, conversation_history = draft_player_aci(agent, model, key, df, drafted_pids, pick_number, debug_level = debug_level)
-    
-    if player_id:
-        agent_rosters[agent].append(player_id)
-        drafted_pids.append(player_id)
-        player_name = df[df['player_id'] == player_id]['fullName'].values[0]
-        agent_thoughts = 'AGENT ' + str(agent).upper() + ': ' + '\n\n'.join([x['content'] for x in conversation_history if x['role']=='assistant'])
-        debug_print(agent_thoughts, 0, debug_level)
-        debug_print(f"Agent {agent} drafted player {player_name} (ID: {player_id})\n", 0, debug_level)
-        # sleeper_draft_player(player_id, pick_number, draft_id)
-        # sleeper_send_chat(agent_thoughts, agent, draft_id)
-    else:
-        print(f"Agent {agent} skipped their pick")
-    
-    with open(os.path.join(output_dir, 'draft_results.json'), 'w') as f:
-        json.dump(drafted_pids, f)
-
-print("\nFinal Draft Results:")
-for agent, roster in zip(agents_models.keys(), [drafted_pids[i::12] for i in range(12)]):
-    print(f"\nAgent {agent}'s Team:")
-    for pid in roster:
-        player = df[df['player_id'] == pid].iloc[0]
-        print(f"{player['fullName']} ({player['position']})")
+    @property
+    def total_picks(self):
+        return len(self.agents) * ROSTER_SIZE
+
+    def agent_for_pick(self, pick_number):
+        return self.snake_agents[(pick_number - 1) % len(self.snake_agents)]
+
+    def decide(self, pick_number, state):
+        """
+        Run the agent on the clock against state without recording anything.
+
+        :return: (player_id or None, conversation_history, seconds)
+        """
+        agent = self.agent_for_pick(pick_number)
+        start = time.time()
+        with span('draft.decide', pick=pick_number, agent=agent, speculative=state is not self.state):
+            player_id, conversation_history = draft_player_aci(agent, self.agents_models[agent], self.key, state, pick_number, seed=self.seed, llm_cache=self.llm_cache, max_prompt_tokens=self.max_prompt_tokens, usage=self.token_usage, debug_level=self.debug_level)
+        return player_id, conversation_history, time.time() - start
+
+    def predict_pick(self, board):
+        # agents mostly follow ADP, so the best available ADP is the likeliest next pick
+        top = board.top(1, 'adp')
+        return top[0]['player_id'] if top else None
+
+    def make_pick(self, pick_number, decision=None, external=False):
+        """
+        :param external: the pick was made outside this session (a human in a live Sleeper draft, see draft_sync.py)
+        """
+        with span('draft.pick', pick=pick_number, agent=self.agent_for_pick(pick_number), speculative_hit=decision is not None and not external, external=external):
+            return self._make_pick(pick_number, decision, external)
+
+    def _make_pick(self, pick_number, decision=None, external=False):
+        agent = self.agent_for_pick(pick_number)
+
+        debug_print(f"\nPick {pick_number}: Agent {agent}'s turn", 0, self.debug_level)
+        if decision is None:
+            decision = self.decide(pick_number, self.state)
+        player_id, conversation_history, seconds = decision
+        self.decision_seconds += seconds
+
+        self.state.record_pick(pick_number, agent, player_id or None)
+        if player_id:
+            player_name = self.board.player_info(player_id)['fullName']
+            agent_thoughts = 'AGENT ' + str(agent).upper() + ': ' + '\n\n'.join([x['content'] for x in conversation_history if x['role']=='assistant'])
+            debug_print(agent_thoughts, 0, self.debug_level)
+            debug_print(f"Agent {agent} drafted player {player_name} (ID: {player_id})\n", 0, self.debug_level)
+            if self.sync_sleeper:
+                sleeper_draft_player(player_id, pick_number, self.draft_id)
+                sleeper_send_chat(agent_thoughts, agent, self.draft_id)
+        else:
+            debug_print(f"Agent {agent} skipped their pick", 0, self.debug_level)
+            self.skipped_picks.append(pick_number)
+
+        if self.log is not None:
+            self.log.append({
+                'event': 'pick',
+                'pick': pick_number,
+                'agent': agent,
+                'player_id': player_id or None,
+                'thoughts': [x['content'] for x in conversation_history if x['role'] == 'assistant'],
+                'seconds': seconds,
+                # usage recorded since the previous pick, speculative runs included
+                'usage': self.token_usage[self.logged_usage:],
+                'external': external,
+                'time': time.time(),
+            })
+            self.logged_usage = len(self.token_usage)
+        return player_id
+
+    def open_log(self, resume=False):
+        """
+        Open the event log, replaying it into the session first when resuming.
+
+        :return: the first pick still to be made
+        """
+        events = read_events(self.log_path) if resume else []
+        if events:
+            header = events[0]
+            if header.get('event') != 'start' or header['agents_models'] != self.agents_models:
+                raise ValueError(f'{self.log_path} was written for a different draft configuration')
+        else:
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            events = []
+
+        next_pick = 1
+        for event in events[1:]:
+            self.state.record_pick(event['pick'], event['agent'], event['player_id'])
+            if not event['player_id']:
+                self.skipped_picks.append(event['pick'])
+            self.decision_seconds += event['seconds']
+            self.token_usage.extend(event['usage'])
+            next_pick = event['pick'] + 1
+        self.logged_usage = len(self.token_usage)
+        if events:
+            debug_print(f"Resumed draft {self.draft_id} from {self.log_path} at pick {next_pick}", 0, self.debug_level)
+
+        self.log = DraftLog(self.log_path)
+        if not events:
+            self.log.append({'event': 'start', 'draft_id': self.draft_id, 'agents_models': self.agents_models, 'seed': self.seed, 'time': time.time()})
+        return next_pick
+
+    def resolve_speculation(self, pick_number, assumed, future):
+        """
+        Use the speculative decision for pick_number if it still holds on the real board, else None.
+
+        An exact hit means every pick it assumed was predicted correctly, so the
+        agent saw the true board. Otherwise the speculative pick is kept only
+        if that player is still available and every pick it assumed for this
+        agent itself (at a snake turn, its previous pick) was right, since its
+        roster and needs were built on those.
+
+        :param assumed: (pick_number, player_id) pairs the speculative board was built on
+        """
+        player_id, conversation_history, seconds = future.result()
+        self.speculation['attempts'] += 1
+        agent = self.agent_for_pick(pick_number)
+        actual = {pick['pick']: pick['player_id'] for pick in self.state.picks if pick['pick'] >= assumed[0][0]}
+        own_picks_held = all(actual.get(pick) == pid for pick, pid in assumed if self.agent_for_pick(pick) == agent)
+        if player_id and all(actual.get(pick) == pid for pick, pid in assumed):
+            self.speculation['exact_hits'] += 1
+        elif player_id and own_picks_held and self.board.is_available(player_id):
+            self.speculation['revalidated_hits'] += 1
+        else:
+            self.speculation['misses'] += 1
+            return None
+        return player_id, conversation_history, seconds
+
+    def run_speculative(self, first_pick=1):
+        """
+        Pipelined draft: while one agent decides, the next `speculative` agents
+        already run against the board as it would look after the predicted
+        picks, and their decisions are revalidated when their turn comes.
+        """
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self.speculative) as pool:
+            for pick_number in range(first_pick, self.total_picks + 1):
+                predicted = self.state.fork()
+                assumed = []
+                for ahead in range(pick_number, min(pick_number + self.speculative, self.total_picks) + 1):
+                    if ahead > pick_number and ahead not in pending:
+                        pending[ahead] = (list(assumed), pool.submit(self.decide, ahead, predicted.fork()))
+                    predicted_pid = self.predict_pick(predicted.board)
+                    predicted.record_pick(ahead, self.agent_for_pick(ahead), predicted_pid)
+                    assumed.append((ahead, predicted_pid))
+
+                decision = None
+                if pick_number in pending:
+                    decision = self.resolve_speculation(pick_number, *pending.pop(pick_number))
+                self.make_pick(pick_number, decision)
+
+    def run(self, resume=False, sync=None):
+        """
+        Run the draft to completion.
+
+        :param resume: replay events.jsonl from an interrupted run and continue after its last pick
+        :param sync: a draft_sync.DraftSync following a live Sleeper draft; picks then come from
+                     Sleeper and only its agents are run
+        """
+        start = time.time()
+        first_pick = self.open_log(resume)
+        try:
+            with use_tracer(self.tracer) if self.tracer is not None else contextlib.nullcontext():
+                if sync is not None:
+                    sync.follow(first_pick)
+                elif self.speculative:
+                    self.run_speculative(first_pick)
+                else:
+                    for pick_number in range(first_pick, self.total_picks + 1):
+                        self.make_pick(pick_number)
+        finally:
+            self.log.close()
+        with open(os.path.join(self.output_dir, 'draft_results.json'), 'w') as f:
+            json.dump(self.drafted_pids, f)
+        summary = self.summary(time.time() - start)
+        if self.tracer is not None:
+            self.tracer.export(self.output_dir)
+            summary['trace'] = self.tracer.summary()
+        if self.llm_cache is not None:
+            summary['llm_cache'] = self.llm_cache.stats()
+        if self.speculative:
+            attempts = self.speculation['attempts']
+            hits = self.speculation['exact_hits'] + self.speculation['revalidated_hits']
+            summary['speculation'] = {
+                **self.speculation,
+                'hit_rate': hits / attempts if attempts else 0.0,
+                # wall-clock saved versus waiting for every accepted decision in turn
+                'saved_seconds': self.decision_seconds - summary['duration'],
+            }
+        with open(os.path.join(self.output_dir, 'summary.json'), 'w') as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+    def summary(self, duration=None):
+        teams = {}
+        for agent, roster in self.agent_rosters.items():
+            players = self.board.roster(roster)
+            teams[agent] = {
+                'model': self.agents_models[agent],
+                'players': players,
+                'total_proj': self.board.total(roster, 'total_proj'),
+            }
+        return {
+            'draft_id': self.draft_id,
+            'seed': self.seed,
+            'duration': duration,
+            'picks_made': len(self.drafted_pids),
+            'skipped_picks': self.skipped_picks,
+            'token_usage': usage_totals(self.token_usage),
+            'decision_seconds': self.decision_seconds,
+            'teams': teams,
+        }
+
+    def print_results(self):
+        print("\nFinal Draft Results:")
+        for agent, roster in self.agent_rosters.items():
+            print(f"\nAgent {agent}'s Team:")
+            for player in self.board.roster(roster):
+                print(f"{player['fullName']} ({player['position']})")
+
+def default_table_path():
+    # prefer the binary table written by create_initial_draft.py / draft_table.py when present
+    return 'initialdraft' if os.path.isdir('initialdraft') else 'initialdraftdf.csv'
+
+def load_config(path='config.json'):
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a 12-team snake draft with LLM agents.')
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--table', default=default_table_path(), help='binary draft table directory or CSV')
+    parser.add_argument('--speculative', type=int, nargs='?', const=3, default=0, metavar='LOOKAHEAD', help='let the next LOOKAHEAD agents start deciding on predicted boards while the current pick is made')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None, help='reuse LLM responses from an on-disk cache')
+    parser.add_argument('--resume', action='store_true', help="continue an interrupted draft from out/<draft_id>/events.jsonl")
+    parser.add_argument('--live', nargs='+', metavar='AGENT', help='follow the live Sleeper draft; only these agents are run, every other slot is picked by a human')
+    parser.add_argument('--sleeper-api', default=SLEEPER_APP_API, help='Sleeper API root polled by --live')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    df, outlooks = load_player_table(args.table)
+    session = DraftSession(
+        df,
+        agents_models=config["models"],
+        key=os.getenv('OPENROUTER_API_KEY'),
+        draft_id=config["draft_id"],
+        llm_cache=LLMCache(args.cache) if args.cache else None,
+        outlooks=outlooks,
+        speculative=args.speculative,
+        debug_level=0,
+    )
+    sync = None
+    if args.live:
+        sync = DraftSync(session, args.live, sleeper_submit_pick(config["draft_id"]), base_url=args.sleeper_api)
+    session.run(resume=args.resume, sync=sync)
+    session.print_results()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+from draft_board import POSITIONS
+from value_table import ValueTable
+
+# 12 team PPR league: 1QB, 2RB, 2WR, 1FLEX (RB/WR/TE), 1TE, 1K, 1D
+STARTER_SLOTS = {'QB': 1, 'RB': 2, 'WR': 2, 'TE': 1, 'K': 1, 'DEF': 1}
+FLEX_POSITIONS = ['RB', 'WR', 'TE']
+FLEX_SLOTS = 1
+
+
+class DraftState:
+    """
+    Incrementally maintained draft state used to build each pick's prompt context.
+
+    Availability counts, rosters and per-position roster counts are updated in
+    O(1) as picks are recorded, and every agent keeps a cursor into the pick
+    log so its context only carries the picks made since its previous turn.
+    The context therefore stays roughly the same size from the first round to
+    the last instead of growing with the full list of drafted ids.
+
+    :param board: DraftBoard over the player table
+    :param agents: agent names in first-round draft order
+    :param teams: number of teams, used for round/pick numbering (defaults to len(agents))
+    :param rounds: rounds in the draft, if known; bounds next_picks
+    """
+
+    def __init__(self, board, agents, teams=None, rounds=None):
+        self.board = board
+        self.agents = list(agents)
+        self.teams = teams or len(self.agents)
+        self.rounds = rounds
+        self.drafted_pids = []
+        self.picks = []
+        self.agent_rosters = {agent: [] for agent in self.agents}
+        self.roster_counts = {agent: dict.fromkeys(POSITIONS, 0) for agent in self.agents}
+        self.available_counts = board.available_position_counts()
+        self.cursors = {agent: 0 for agent in self.agents}
+        # starter slots still unfilled across the league, kept in step with roster_counts
+        self.open_slots = {pos: slots * self.teams for pos, slots in STARTER_SLOTS.items()}
+        self.open_slots['FLEX'] = FLEX_SLOTS * self.teams
+        self.value_table = ValueTable(board, STARTER_SLOTS, FLEX_POSITIONS, self.teams)
+
+    def fork(self):
+        """
+        Independent copy of the state (and its board), e.g. to plan ahead on a predicted pick.
+        """
+        state = object.__new__(DraftState)
+        state.board = self.board.fork()
+        state.agents = self.agents
+        state.teams = self.teams
+        state.rounds = self.rounds
+        state.drafted_pids = list(self.drafted_pids)
+        state.picks = list(self.picks)
+        state.agent_rosters = {agent: list(roster) for agent, roster in self.agent_rosters.items()}
+        state.roster_counts = {agent: dict(counts) for agent, counts in self.roster_counts.items()}
+        state.available_counts = dict(self.available_counts)
+        state.cursors = dict(self.cursors)
+        state.open_slots = dict(self.open_slots)
+        state.value_table = self.value_table
+        return state
+
+    def record_pick(self, pick_number, agent, player_id):
+        """
+        Record the outcome of agent's turn; player_id is None for a skipped pick.
+        """
+        if player_id is not None:
+            row = self.board.row_of[str(player_id)]
+            position = self.board.positions[row]
+            self.board.mark_drafted(player_id)
+            self.drafted_pids.append(player_id)
+            self.agent_rosters[agent].append(player_id)
+            self.roster_counts[agent][position] = self.roster_counts[agent].get(position, 0) + 1
+            self.fill_slot(agent, position)
+            self.available_counts[position] -= 1
+            self.picks.append({
+                'pick': pick_number,
+                'agent': agent,
+                'player_id': player_id,
+                'fullName': self.board.names[row],
+                'position': position,
+            })
+        self.cursors[agent] = len(self.picks)
+
+    def fill_slot(self, agent, position):
+        # called after roster_counts is updated for the new player
+        counts = self.roster_counts[agent]
+        if counts[position] <= STARTER_SLOTS.get(position, 0):
+            self.open_slots[position] -= 1
+        elif position in FLEX_POSITIONS:
+            flex_surplus = sum(max(0, counts.get(pos, 0) - STARTER_SLOTS[pos]) for pos in FLEX_POSITIONS)
+            if flex_surplus <= FLEX_SLOTS:
+                self.open_slots['FLEX'] -= 1
+
+    def draft_status(self, pick_number):
+        round_number = (pick_number - 1) // self.teams + 1
+        pick_in_round = (pick_number - 1) % self.teams + 1
+        return {"round": round_number, "pick_in_round": pick_in_round, "overall_pick": pick_number}
+
+    def next_picks(self, agent, pick_number, count=2):
+        """
+        The agent's next count pick numbers after pick_number in snake order.
+        """
+        slot = self.agents.index(agent)
+        picks = []
+        round_index = (pick_number - 1) // self.teams
+        while len(picks) < count and (self.rounds is None or round_index < self.rounds):
+            pick = round_index * self.teams + (slot if round_index % 2 == 0 else self.teams - 1 - slot) + 1
+            if pick > pick_number:
+                picks.append(pick)
+            round_index += 1
+        return picks
+
+    def roster_needs(self, agent):
+        """
+        Starter slots the agent has not filled yet, with the flex filled by RB/WR/TE surplus.
+        """
+        counts = self.roster_counts[agent]
+        needs = {pos: max(0, slots - counts.get(pos, 0)) for pos, slots in STARTER_SLOTS.items()}
+        flex_surplus = sum(max(0, counts.get(pos, 0) - STARTER_SLOTS[pos]) for pos in FLEX_POSITIONS)
+        needs['FLEX'] = max(0, FLEX_SLOTS - flex_surplus)
+        return {pos: n for pos, n in needs.items() if n}
+
+    def recent_picks(self, agent):
+        return self.picks[self.cursors[agent]:]
+
+    def context(self, agent, pick_number):
+        return {
+            "draft_status": self.draft_status(pick_number),
+            # one short string per player keeps the prompt compact; ids come from get_top_players
+            "picks_since_your_last_turn": [f"{pick['pick']}. {pick['fullName']} ({pick['position']})" for pick in self.recent_picks(agent)],
+            "team_roster": [f"{player['fullName']} ({player['position']})" for player in self.board.roster(self.agent_rosters[agent])],
+            "roster_needs": self.roster_needs(agent),
+            "available_positions": {pos: n for pos, n in sorted(self.available_counts.items(), key=lambda x: -x[1])},
+            "positional_scarcity": self.value_table.summary(self.board, self.open_slots),
+        }
@@ -0,0 +1,128 @@
+import time
+
+import requests
+
+from http_cache import conditional_headers, response_validators
+from tracing import span
+
+SLEEPER_APP_API = 'https://api.sleeper.app/v1'
+# seconds between polls of the picks endpoint while someone else is on the clock
+POLL_INTERVAL = 0.25
+
+
+class DraftSync:
+    """
+    Follows a live Sleeper draft and mirrors its picks into a DraftSession.
+
+    The picks endpoint is polled with conditional requests (If-None-Match /
+    If-Modified-Since), so while nobody picks the server answers 304 with no
+    body. When it changes, only picks past the last one applied are
+    recorded, in pick order, through the session, so the board, rosters,
+    open slots and events.jsonl stay in step with Sleeper. The moment one of
+    our agents is on the clock it decides against the synced state and its
+    pick is submitted; it is recorded (with the agent's thoughts) once
+    Sleeper reports it back, so Sleeper stays the single source of truth
+    (an autopick made while the agent was thinking simply wins).
+
+    Sleeper has no public push API for drafts, so polling stands in for a
+    websocket; with the default interval a human pick reaches the agent in
+    well under a second.
+
+    The session assigns picks by its own snake order, so the agents in
+    config.json must be listed in Sleeper's draft slot order (slot 1 first).
+    Every pick's draft_slot is checked against that order and a mismatch
+    stops the sync with a ValueError instead of crediting picks to the
+    wrong teams.
+
+    :param session: DraftSession to apply picks to; built with sync_sleeper=False
+    :param agents: session agents run by the LLM; every other slot is a human
+    :param submit: function(player_id, pick_number, agent, thoughts) sending our
+                   pick to the draft, e.g. draft_script_aci.sleeper_submit_pick
+    :param base_url: Sleeper API root
+    """
+
+    def __init__(self, session, agents, submit, base_url=SLEEPER_APP_API, poll_interval=POLL_INTERVAL, session_http=None, timeout=10):
+        self.session = session
+        self.agents = set(agents)
+        self.submit = submit
+        self.url = f"{base_url.rstrip('/')}/draft/{session.draft_id}/picks"
+        self.poll_interval = poll_interval
+        self.http = session_http or requests.Session()
+        self.timeout = timeout
+        self.validators = {}
+        # our decisions submitted to Sleeper and not yet seen in the picks feed
+        self.pending = {}
+        self.stats = {'polls': 0, 'not_modified': 0, 'picks_applied': 0, 'reaction_seconds': []}
+
+    def poll(self):
+        """
+        :return: the draft's picks, or None if they have not changed since the last poll
+        """
+        self.stats['polls'] += 1
+        with span('sleeper.draft_picks', draft_id=self.session.draft_id) as attrs:
+            resp = self.http.get(self.url, headers=conditional_headers(self.validators), timeout=self.timeout)
+            attrs.update(status=resp.status_code, response_bytes=len(resp.content))
+        if resp.status_code == 304:
+            self.stats['not_modified'] += 1
+            return None
+        resp.raise_for_status()
+        self.validators = response_validators(resp)
+        return resp.json()
+
+    def apply(self, picks, next_pick):
+        """
+        Record the picks from next_pick on, stopping at the first one not made yet.
+
+        :return: the next pick still to be made
+        """
+        by_number = {pick['pick_no']: pick for pick in picks}
+        while next_pick in by_number:
+            pick = by_number[next_pick]
+            agent = self.session.agent_for_pick(next_pick)
+            slot = self.session.agents.index(agent) + 1
+            if pick.get('draft_slot') is not None and pick['draft_slot'] != slot:
+                raise ValueError(f"pick {next_pick} was made from draft slot {pick['draft_slot']}, but agent {agent} "
+                                 f"holds slot {slot}; list the agents in config.json in Sleeper's draft order")
+            player_id = pick.get('player_id') or None
+            if player_id is not None and player_id not in self.session.board.row_of:
+                print(f'pick {next_pick}: player {player_id} is not on the draft board, recorded as skipped')
+                player_id = None
+            decision = self.pending.pop(next_pick, None)
+            if decision is not None and decision[0] == player_id:
+                self.session.make_pick(next_pick, decision)
+            else:
+                self.session.make_pick(next_pick, (player_id, [], 0.0), external=True)
+            self.stats['picks_applied'] += 1
+            next_pick += 1
+        return next_pick
+
+    def take_turn(self, pick_number):
+        """
+        Run the agent on the clock and submit its pick.
+        """
+        agent = self.session.agent_for_pick(pick_number)
+        player_id, conversation_history, seconds = decision = self.session.decide(pick_number, self.session.state)
+        self.pending[pick_number] = decision
+        if player_id:
+            thoughts = 'AGENT ' + str(agent).upper() + ': ' + '\n\n'.join([x['content'] for x in conversation_history if x['role'] == 'assistant'])
+            self.submit(player_id, pick_number, agent, thoughts)
+
+    def follow(self, first_pick=1):
+        """
+        Apply picks as they are made until the draft is complete.
+        """
+        next_pick = first_pick
+        seen_at = None
+        while next_pick <= self.session.total_picks:
+            picks = self.poll()
+            if picks is not None:
+                seen_at = time.perf_counter()
+                next_pick = self.apply(picks, next_pick)
+            if next_pick <= self.session.total_picks and next_pick not in self.pending and self.session.agent_for_pick(next_pick) in self.agents:
+                if seen_at is not None:
+                    self.stats['reaction_seconds'].append(time.perf_counter() - seen_at)
+                self.take_turn(next_pick)
+                # our own pick should be in the feed right away
+                continue
+            time.sleep(self.poll_interval)
+        return next_pick
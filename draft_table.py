@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# 2: column files named by position, one layout for the draft table and the league snapshots
+FORMAT_VERSION = 2
+TEXT_COLUMNS = ['seasonOutlook']
+NUMERIC_COLUMNS = ['adp', 'pos_adp', 'total_proj']
+
+
+class TextColumn:
+    """
+    Lazily decoded free-text column backed by a memory-mapped UTF-8 blob.
+
+    Row i is blob[offsets[i]:offsets[i + 1]]; nothing is decoded until a row is read.
+    """
+
+    def __init__(self, blob, offsets, nulls):
+        self.blob = blob
+        self.offsets = offsets
+        self.nulls = nulls
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        if self.nulls[row]:
+            return None
+        return bytes(self.blob[self.offsets[row]:self.offsets[row + 1]]).decode('utf-8')
+
+
+def write_table(df, path, text_columns=(), float_columns=()):
+    """
+    Write a typed table as a directory of memory-mappable .npy columns.
+
+    Numeric and bool columns keep their dtype (float_columns are stored as
+    float64), categoricals are integer codes with their categories in
+    meta.json, short strings fixed-width unicode arrays plus a null mask, and
+    long free text (text_columns) a UTF-8 blob plus an offsets array so it
+    can be loaded separately and only when needed. Column files are named by
+    position, since stat names are not always safe file names.
+    """
+    os.makedirs(path, exist_ok=True)
+    columns = []
+    for i, column in enumerate(df.columns):
+        values = df[column]
+        spec = {'name': column}
+        if column in text_columns:
+            nulls = values.isna().to_numpy()
+            encoded = [b'' if null else str(v).encode('utf-8') for v, null in zip(values, nulls)]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(b) for b in encoded])
+            with open(os.path.join(path, f'{i}.bin'), 'wb') as f:
+                f.write(b''.join(encoded))
+            np.save(os.path.join(path, f'{i}.offsets.npy'), offsets)
+            np.save(os.path.join(path, f'{i}.nulls.npy'), nulls)
+            spec['kind'] = 'text'
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(path, f'{i}.npy'), values.cat.codes.to_numpy())
+            spec.update(kind='category', categories=[str(c) for c in values.cat.categories])
+        elif column in float_columns or pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            if column in float_columns or not isinstance(values.dtype, np.dtype):
+                # nullable extension dtypes have no plain numpy equivalent; NaN marks the gaps
+                array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                array = values.to_numpy()
+            np.save(os.path.join(path, f'{i}.npy'), array)
+            spec['kind'] = 'numeric'
+        else:
+            nulls = values.isna().to_numpy()
+            np.save(os.path.join(path, f'{i}.npy'), np.array(['' if null else str(v) for v, null in zip(values, nulls)], dtype=str))
+            np.save(os.path.join(path, f'{i}.nulls.npy'), nulls)
+            spec['kind'] = 'str'
+        columns.append(spec)
+
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'version': FORMAT_VERSION, 'rows': len(df), 'columns': columns}, f, indent=2)
+
+
+def _load_meta(path):
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta['version'] != FORMAT_VERSION:
+        raise ValueError(f"unsupported table version {meta['version']} in {path}; rebuild it (python draft_table.py for the draft table)")
+    return meta
+
+
+def read_table(path):
+    """
+    Read every column written by write_table except the free-text ones.
+
+    Numeric columns and categorical codes are memory-mapped read-only, so
+    processes loading the same table share its pages through the OS page
+    cache; only string columns are materialized.
+    """
+    meta = _load_meta(path)
+    data = {}
+    for i, spec in enumerate(meta['columns']):
+        if spec['kind'] == 'text':
+            continue
+        if spec['kind'] == 'str':
+            # strings become Python objects in pandas anyway, so read them in one go
+            values = np.load(os.path.join(path, f'{i}.npy')).astype(object)
+            values[np.load(os.path.join(path, f'{i}.nulls.npy'))] = None
+            data[spec['name']] = pd.array(values, dtype='string')
+        elif spec['kind'] == 'category':
+            codes = np.load(os.path.join(path, f'{i}.npy'), mmap_mode='r')
+            data[spec['name']] = pd.Categorical.from_codes(codes, categories=spec['categories'])
+        else:
+            data[spec['name']] = np.load(os.path.join(path, f'{i}.npy'), mmap_mode='r')
+    return pd.DataFrame(data, index=pd.RangeIndex(meta['rows']), copy=False)
+
+
+def load_text_column(path, column='seasonOutlook'):
+    i = next(i for i, spec in enumerate(_load_meta(path)['columns']) if spec['name'] == column)
+    blob_path = os.path.join(path, f'{i}.bin')
+    # np.memmap cannot map an empty file
+    blob = np.memmap(blob_path, dtype=np.uint8, mode='r') if os.path.getsize(blob_path) else np.zeros(0, dtype=np.uint8)
+    offsets = np.load(os.path.join(path, f'{i}.offsets.npy'), mmap_mode='r')
+    nulls = np.load(os.path.join(path, f'{i}.nulls.npy'), mmap_mode='r')
+    return TextColumn(blob, offsets, nulls)
+
+
+def write_draft_table(df, path):
+    """
+    Write the draft player table with write_table; seasonOutlook is stored as lazily loaded text.
+    """
+    df = df.drop(columns=[c for c in df.columns if c.startswith('Unnamed')]).reset_index(drop=True)
+    write_table(df, path, TEXT_COLUMNS, NUMERIC_COLUMNS)
+
+
+def load_draft_table(path):
+    return read_table(path)
+
+
+def load_player_table(path):
+    """
+    Load the draft player table from a binary table directory or a CSV file.
+
+    :return: (df, outlooks) where outlooks is a lazily decoded TextColumn for a
+             binary table and None for a CSV (which keeps seasonOutlook inline)
+    """
+    if os.path.isdir(path):
+        return load_draft_table(path), load_text_column(path)
+    return pd.read_csv(path), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert a draft table CSV into the memory-mappable binary layout.')
+    parser.add_argument('csv', nargs='?', default='initialdraftdf.csv')
+    parser.add_argument('output', nargs='?', default='initialdraft')
+    args = parser.parse_args()
+    write_draft_table(pd.read_csv(args.csv, dtype={'player_id': str}), args.output)
+    print(f'wrote {args.output}')
+
+
+if __name__ == '__main__':
+    main()
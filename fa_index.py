@@ -0,0 +1,61 @@
+import numpy as np
+
+# metrics free agents are sourced on, per position
+FA_METRICS = {
+    'QB': ['pts_ppr', 'pass_yd', 'pass_td', 'rush_yd'],
+    'RB': ['pts_ppr', 'rush_yd', 'rush_td', 'rec_yd'],
+    'WR': ['pts_ppr', 'rec_yd', 'rec_td', 'rec'],
+    'TE': ['pts_ppr', 'rec_yd', 'rec_td', 'rec'],
+    'K': ['pts_ppr', 'fgm', 'fgm_40_49', 'fgm_50p'],
+    'DEF': ['pts_ppr', 'sack', 'int'],
+}
+
+
+def top_k_rows(frame, metric, n):
+    """
+    Row positions of the n largest values of a column, largest first, without sorting the whole frame.
+
+    Same rows as a stable sort_values(ascending=False).head(n): NaN ranks
+    last and ties keep table order. Metrics the frame does not have give no rows.
+    """
+    if metric not in frame.columns or n <= 0:
+        return np.array([], dtype=int)
+    values = np.nan_to_num(frame[metric].to_numpy(dtype=float), nan=-np.inf)
+    if n < len(values):
+        cutoff = -np.partition(-values, n - 1)[n - 1]
+        # everything above the cutoff, then the first rows tied with it
+        above = np.flatnonzero(values > cutoff)
+        top = np.concatenate([above, np.flatnonzero(values == cutoff)[:n - len(above)]])
+    else:
+        top = np.arange(len(values))
+    return top[np.argsort(-values[top], kind='stable')]
+
+
+class FreeAgentIndex:
+    """
+    Free agent candidates per position, computed once per week and shared by every agent.
+
+    For each (table, position, metric) the top k players are found with
+    top_k_rows (a partial np.partition for the cutoff value) instead of a
+    full sort. Each position's
+    candidate list is the union of those in a fixed order (metrics in
+    FA_METRICS order, stats before projections for each), so the prompts
+    built from it are identical from agent to agent and run to run.
+
+    :param fa_pos_stats: {position: free agent stats table}, from roster_actions.get_position_data
+    :param fa_pos_proj: {position: free agent projections table}
+    :param k: players kept per metric
+    """
+
+    def __init__(self, fa_pos_stats, fa_pos_proj, metrics=FA_METRICS, k=3):
+        self.candidates = {}
+        for position, position_metrics in metrics.items():
+            seen = {}
+            for metric in position_metrics:
+                for tables in (fa_pos_stats, fa_pos_proj):
+                    frame = tables.get(position)
+                    if frame is None:
+                        continue
+                    rows = top_k_rows(frame, metric, k)
+                    seen.update(dict.fromkeys(frame['player_id'].to_numpy()[rows]))
+            self.candidates[position] = [str(pid) for pid in seen]
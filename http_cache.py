@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import time
+
+import requests
+
+
+def response_validators(resp):
+    return {'etag': resp.headers.get('ETag'), 'last_modified': resp.headers.get('Last-Modified')}
+
+
+def conditional_headers(validators, headers=None):
+    """
+    headers plus If-None-Match / If-Modified-Since for the validators saved from an earlier response.
+    """
+    conditional = dict(headers or {})
+    if validators:
+        if validators.get('etag'):
+            conditional['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            conditional['If-Modified-Since'] = validators['last_modified']
+    return conditional
+
+
+class HTTPCache:
+    """
+    On-disk store of raw JSON payloads with their HTTP validators.
+
+    Each entry keeps the payload plus ETag, Last-Modified, a content hash and
+    the time it was fetched. Entries younger than max_age are served without
+    touching the network; older ones are revalidated with a conditional GET,
+    and a 304 (or an identical body) counts as unchanged.
+
+    :param root: directory holding the cached payloads
+    """
+
+    def __init__(self, root='.http_cache'):
+        self.root = root
+
+    def _paths(self, url, headers=None):
+        key = hashlib.sha256(json.dumps([url, sorted((headers or {}).items())]).encode()).hexdigest()
+        directory = os.path.join(self.root, key[:2])
+        return os.path.join(directory, f'{key}.json'), os.path.join(directory, f'{key}.meta.json')
+
+    def _read(self, path):
+        with open(path) as f:
+            return json.load(f)
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def meta(self, url, headers=None):
+        _, meta_path = self._paths(url, headers)
+        return self._read(meta_path) if os.path.exists(meta_path) else None
+
+    def fresh(self, url, max_age, headers=None):
+        """
+        Return the cached payload if it was fetched less than max_age seconds ago, else None.
+        """
+        meta = self.meta(url, headers)
+        if meta is None or max_age is None or time.time() - meta['fetched_at'] > max_age:
+            return None
+        return self._read(self._paths(url, headers)[0])
+
+    def conditional_headers(self, url, headers=None):
+        return conditional_headers(self.meta(url, headers), headers)
+
+    def touch(self, url, headers=None):
+        """
+        Mark a cached entry as revalidated (after a 304) and return its payload.
+        """
+        payload_path, meta_path = self._paths(url, headers)
+        meta = self._read(meta_path)
+        meta['fetched_at'] = time.time()
+        self._write(meta_path, meta)
+        return self._read(payload_path)
+
+    def store(self, url, resp, payload, headers=None):
+        """
+        Save a 200 response; returns True if the payload differs from the cached one.
+        """
+        payload_path, meta_path = self._paths(url, headers)
+        previous = self.meta(url, headers)
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        self._write(payload_path, payload)
+        self._write(meta_path, {
+            'url': url,
+            **response_validators(resp),
+            'sha256': digest,
+            'fetched_at': time.time(),
+        })
+        return previous is None or previous['sha256'] != digest
+
+    def get(self, url, headers=None, max_age=None, session=None, timeout=30):
+        """
+        Fetch url through the cache.
+
+        :return: (payload, changed) where changed is False when the payload
+                 came from a fresh entry, a 304 or an identical response
+        """
+        payload = self.fresh(url, max_age, headers)
+        if payload is not None:
+            return payload, False
+        resp = (session or requests).get(url, headers=self.conditional_headers(url, headers), timeout=timeout)
+        if resp.status_code == 304:
+            return self.touch(url, headers), False
+        resp.raise_for_status()
+        payload = resp.json()
+        return payload, self.store(url, resp, payload, headers)
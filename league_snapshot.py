@@ -0,0 +1,244 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import requests
+
+from draft_table import read_table, write_table
+from http_cache import conditional_headers, response_validators
+from projection_fetcher import SLEEPER_API
+from sleeper_ingest import POSITIONS, flatten_players_payload, flatten_stats_payload
+from tracing import span
+
+# 2: tables in the draft_table.write_table layout
+SNAPSHOT_VERSION = 2
+DEFAULT_SNAPSHOT_DIR = '.snapshots'
+# seconds a snapshot is used without asking Sleeper whether it changed
+DEFAULT_MAX_AGE = {
+    'league': 15 * 60,
+    'players': 24 * 3600,
+    'projections': 6 * 3600,
+    'stats': 6 * 3600,
+}
+# older revisions are deleted once this many newer ones exist
+REVISIONS_KEPT = 2
+
+
+class SnapshotFetchError(requests.RequestException):
+    """
+    A response that arrived but carries errors instead of data (a GraphQL errors list).
+    """
+
+
+class Snapshot:
+    """
+    One stored revision of a league, players, projections or stats payload.
+
+    :param data: a dict for 'league', a DataFrame for the other kinds
+    :param meta: kind, key, revision, source, sha256 of the raw payload, fetched_at and HTTP validators
+    """
+
+    def __init__(self, data, meta):
+        self.data = data
+        self.meta = meta
+
+    @property
+    def revision(self):
+        return self.meta['revision']
+
+    @property
+    def age(self):
+        return time.time() - self.meta['fetched_at']
+
+
+class SnapshotStore:
+    """
+    Local, versioned snapshots of Sleeper data shared by every script and process.
+
+    Each (kind, key) lives in its own directory: every changed payload is
+    written as a new revision directory next to the old ones, then
+    current.json is swapped to point at it, so readers never see a partial
+    write and a reader still mapping an old revision keeps valid pages.
+    Tables use the draft_table.write_table layout and are memory-mapped on load.
+
+    Staleness policy: a snapshot younger than max_age[kind] seconds is used
+    as is. An older one is revalidated with a conditional GET (ETag /
+    Last-Modified, as in HTTPCache); a 304 or an identical body only bumps
+    fetched_at. If Sleeper cannot be reached or answers with errors, a stale
+    snapshot is served rather than failing (an error response is never
+    stored), and offline=True never touches the network. A file
+    lock per snapshot makes concurrent processes wait for one fetch instead
+    of all downloading the same payload.
+
+    :param root: directory holding the snapshots
+    :param max_age: {kind: seconds} overriding DEFAULT_MAX_AGE; 0 revalidates every time
+    :param offline: only read existing snapshots
+    :param base_url: Sleeper API root
+    """
+
+    def __init__(self, root=DEFAULT_SNAPSHOT_DIR, max_age=None, offline=False, base_url=SLEEPER_API, session=None, timeout=30):
+        self.root = root
+        self.max_age = {**DEFAULT_MAX_AGE, **(max_age or {})}
+        self.offline = offline
+        self.base_url = base_url.rstrip('/')
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def _dir(self, kind, key):
+        return os.path.join(self.root, kind, str(key))
+
+    def meta(self, kind, key):
+        path = os.path.join(self._dir(kind, key), 'current.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            meta = json.load(f)
+        # snapshots written by another format version are refetched
+        return meta if meta.get('version') == SNAPSHOT_VERSION else None
+
+    def _write_meta(self, kind, key, meta):
+        path = os.path.join(self._dir(kind, key), 'current.json')
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def load(self, kind, key):
+        """
+        The current snapshot of (kind, key), or None if there is none.
+        """
+        meta = self.meta(kind, key)
+        if meta is None:
+            return None
+        path = os.path.join(self._dir(kind, key), f"r{meta['revision']:06d}")
+        with span('snapshot.load', kind=kind, key=str(key), revision=meta['revision']):
+            if kind == 'league':
+                with open(os.path.join(path, 'payload.json')) as f:
+                    data = json.load(f)
+            else:
+                data = read_table(path)
+        return Snapshot(data, meta)
+
+    def _fresh(self, meta, kind):
+        return meta is not None and (self.offline or time.time() - meta['fetched_at'] <= self.max_age[kind])
+
+    def get(self, kind, key, url=None, fetch=None):
+        """
+        The snapshot of (kind, key), refreshed according to the staleness policy.
+
+        :param url: Sleeper GET endpoint, revalidated with conditional requests
+        :param fetch: for sources that are not a plain GET (the league GraphQL
+                      query): a function returning the JSON payload
+        """
+        meta = self.meta(kind, key)
+        if self._fresh(meta, kind):
+            return self.load(kind, key)
+        if self.offline:
+            raise FileNotFoundError(f'no {kind} snapshot for {key} in {self.root} (offline)')
+
+        directory = self._dir(kind, key)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # another process may have refreshed it while we waited for the lock
+            meta = self.meta(kind, key)
+            if self._fresh(meta, kind):
+                return self.load(kind, key)
+            try:
+                payload, content, validators = self._fetch(kind, key, meta, url, fetch)
+            except requests.RequestException as e:
+                if meta is None:
+                    raise
+                print(f'could not refresh {kind} snapshot {key} ({e}); using revision {meta["revision"]} from {time.ctime(meta["fetched_at"])}')
+                return self.load(kind, key)
+
+            digest = hashlib.sha256(content).hexdigest() if content is not None else None
+            if payload is None or (meta is not None and meta['sha256'] == digest):
+                # 304 or the same body: the stored revision is still current
+                self._write_meta(kind, key, {**meta, **validators, 'fetched_at': time.time()})
+                return self.load(kind, key)
+            return self._store(kind, key, meta, payload, digest, url, validators)
+
+    def _fetch(self, kind, key, meta, url, fetch):
+        """
+        :return: (payload or None if unchanged, raw bytes for the digest, HTTP validators)
+        """
+        if fetch is not None:
+            payload = fetch()
+            if isinstance(payload, dict) and payload.get('errors'):
+                # GraphQL reports failures in the body, often next to a null data field
+                raise SnapshotFetchError(f'{kind} {key}: {json.dumps(payload["errors"])[:500]}')
+            return payload, json.dumps(payload, sort_keys=True).encode(), {}
+
+        with span(f'sleeper.{kind}', url=url) as attrs:
+            resp = self.session.get(url, headers=conditional_headers(meta), timeout=self.timeout)
+            attrs.update(status=resp.status_code, response_bytes=len(resp.content))
+        validators = response_validators(resp)
+        if resp.status_code == 304 and meta is not None:
+            return None, None, validators
+        resp.raise_for_status()
+        return resp.json(), resp.content, validators
+
+    def _store(self, kind, key, meta, payload, digest, url, validators):
+        revision = meta['revision'] + 1 if meta is not None else 1
+        directory = self._dir(kind, key)
+        path = os.path.join(directory, f'r{revision:06d}')
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        with span('snapshot.write', kind=kind, key=str(key), revision=revision):
+            if kind == 'league':
+                os.makedirs(tmp_path)
+                with open(os.path.join(tmp_path, 'payload.json'), 'w') as f:
+                    json.dump(payload, f)
+            elif kind == 'players':
+                write_table(flatten_players_payload(payload), tmp_path)
+            else:
+                write_table(flatten_stats_payload(payload), tmp_path)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        self._write_meta(kind, key, {
+            'version': SNAPSHOT_VERSION,
+            'kind': kind,
+            'key': str(key),
+            'revision': revision,
+            'source': url,
+            'sha256': digest,
+            'fetched_at': time.time(),
+            **validators,
+        })
+        for old in range(1, revision - REVISIONS_KEPT + 1):
+            shutil.rmtree(os.path.join(directory, f'r{old:06d}'), ignore_errors=True)
+        return self.load(kind, key)
+
+    def league(self, league_id, fetch):
+        """
+        League detail (rosters, users, transactions, matchups) as the GraphQL JSON.
+
+        :param fetch: function running the query, e.g. roster_actions.get_league_detail
+        """
+        return self.get('league', league_id, fetch=fetch).data
+
+    def players(self):
+        """
+        Every Sleeper player as a sleeper_ingest.flatten_players_payload table.
+        """
+        return self.get('players', 'nfl', url=f'{self.base_url}/players/nfl/').data
+
+    def projections(self, season, week):
+        """
+        Weekly projections as a sleeper_ingest.flatten_stats_payload table.
+        """
+        return self.get('projections', f'{season}-{week}', url=self.stats_url('projections', season, week)).data
+
+    def stats(self, season, week):
+        """
+        Weekly stats as a sleeper_ingest.flatten_stats_payload table.
+        """
+        return self.get('stats', f'{season}-{week}', url=self.stats_url('stats', season, week)).data
+
+    def stats_url(self, endpoint, season, week):
+        positions = '&'.join(f'position[]={pos}' for pos in sorted(POSITIONS))
+        return f'{self.base_url}/{endpoint}/nfl/{season}/{week}?season_type=regular&{positions}&order_by=pts_ppr'
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from draft_state import STARTER_SLOTS, FLEX_POSITIONS, FLEX_SLOTS
+
+LINEUP_POSITIONS = ['QB', 'RB', 'WR', 'TE', 'K', 'DEF']
+POSITION_INDEX = {pos: i for i, pos in enumerate(LINEUP_POSITIONS)}
+# lineup slots in the order solve_lineups reports them
+SLOTS = [pos for pos in LINEUP_POSITIONS for _ in range(STARTER_SLOTS[pos])] + ['FLEX'] * FLEX_SLOTS
+
+
+def solve_lineups(positions, values):
+    """
+    Optimal lineups for a batch of rosters.
+
+    Each position's slots take its highest projected players, then the flex
+    slots take the best leftover RB/WR/TE. That greedy order is exact here:
+    every flex-eligible player is also eligible for a dedicated slot, so
+    swapping a dedicated starter into the flex never frees a better option.
+    Any leading batch shape works, e.g. (weeks, teams, players) for backtests.
+
+    :param positions: int array (..., players) of LINEUP_POSITIONS indexes, -1 for an empty slot
+    :param values: float array (..., players) of projected points
+    :return: (points (...,), starters (..., len(SLOTS))) where starters holds
+             player indexes per slot of SLOTS, -1 where no player fills it
+    """
+    positions = np.asarray(positions)
+    values = np.asarray(values, dtype=float)
+    shape = values.shape[:-1]
+    batch = int(np.prod(shape))
+    positions = positions.reshape(batch, positions.shape[-1])
+    values = values.reshape(batch, values.shape[-1])
+    # short (even empty) rosters are padded with empty slots so every slot can be ranked
+    pad = max(0, max(STARTER_SLOTS.values()) + FLEX_SLOTS - positions.shape[1])
+    if pad:
+        positions = np.pad(positions, ((0, 0), (0, pad)), constant_values=-1)
+        values = np.pad(values, ((0, 0), (0, pad)))
+    rows = np.arange(len(values))[:, None]
+
+    starters = []
+    leftovers = []
+    leftover_values = []
+    for i, pos in enumerate(LINEUP_POSITIONS):
+        masked = np.where(positions == i, values, -np.inf)
+        # best first; empty or other-position slots sink to the end as -inf
+        ranked = np.argsort(-masked, axis=1, kind='stable')
+        slots = STARTER_SLOTS[pos]
+        starters.append(np.where(np.isfinite(masked[rows, ranked[:, :slots]]), ranked[:, :slots], -1))
+        if pos in FLEX_POSITIONS:
+            leftovers.append(ranked[:, slots:slots + FLEX_SLOTS])
+            leftover_values.append(masked[rows, ranked[:, slots:slots + FLEX_SLOTS]])
+    leftovers = np.concatenate(leftovers, axis=1)
+    leftover_values = np.concatenate(leftover_values, axis=1)
+    best = np.argsort(-leftover_values, axis=1, kind='stable')[:, :FLEX_SLOTS]
+    flex = np.where(np.isfinite(leftover_values[rows, best]), leftovers[rows, best], -1)
+    starters = np.concatenate(starters + [flex], axis=1)
+
+    points = np.where(starters >= 0, values[rows, starters], 0).sum(axis=1)
+    return points.reshape(shape), starters.reshape(shape + (len(SLOTS),))
+
+
+def lineup_points(positions, values):
+    """
+    Projected points of the best legal lineup for a batch of rosters (see solve_lineups).
+    """
+    return solve_lineups(positions, values)[0]
+
+
+def roster_arrays(agent_rosters, projs, metric='pts_ppr'):
+    """
+    Rosters as padded (teams, players) position and projection arrays from a projections table.
+
+    :param agent_rosters: {agent: [player_id, ...]}
+    :param projs: table from sleeper_ingest.flatten_stats_payload
+    :return: (pids, positions, values); players without a projection score 0
+    """
+    table = projs.drop_duplicates('player_id').set_index('player_id')
+    width = max((len(roster) for roster in agent_rosters.values()), default=0)
+    pids = np.full((len(agent_rosters), width), None, dtype=object)
+    filled = np.zeros(pids.shape, dtype=bool)
+    for t, roster in enumerate(agent_rosters.values()):
+        pids[t, :len(roster)] = [str(pid) for pid in roster]
+        filled[t, :len(roster)] = True
+    found = np.where(filled.ravel(), table.index.get_indexer(pd.Index(pids.ravel().astype(str))), -1)
+    position_codes = table['fantasy_position'].map(POSITION_INDEX).fillna(-1).to_numpy(dtype=int)
+    metric_values = np.nan_to_num(table[metric].to_numpy(dtype=float)) if metric in table else np.zeros(len(table))
+    positions = np.where(found >= 0, position_codes[found], -1).reshape(pids.shape)
+    values = np.where(found >= 0, metric_values[found], 0.0).reshape(pids.shape)
+    return pids, positions, values
+
+
+def backtest_lineups(agent_rosters, weekly_projs, metric='pts_ppr'):
+    """
+    Optimal lineup points for every team in every week, solved as one batch.
+
+    Players are placed by position from each week's table, so a player missing
+    from a week (e.g. on bye) simply scores nothing that week.
+
+    :param weekly_projs: list of projections (or stats) tables, one per week
+    :return: float array (weeks, teams)
+    """
+    batches = [roster_arrays(agent_rosters, projs, metric) for projs in weekly_projs]
+    positions = np.stack([positions for _, positions, _ in batches])
+    values = np.stack([values for _, _, values in batches])
+    return solve_lineups(positions, values)[0]
+
+
+def solve_lineup(roster, store, metric='pts_ppr'):
+    """
+    Optimal lineup for one roster, in the JSON shape recommend_lineup asks the LLM for.
+
+    Players the store has no projection for cannot be placed in a slot; they
+    are listed by id under 'unscored' so the output still accounts for the
+    whole roster.
+
+    :param roster: player ids
+    :param store: PlayerStore with projections
+    """
+    pids = [str(pid).strip('"').strip("'") for pid in roster]
+    unscored = [pid for pid in pids if pid not in store]
+    players = [store.get(pid) for pid in pids if pid in store]
+    positions = np.array([[POSITION_INDEX.get(p['position'], -1) for p in players]], dtype=int).reshape(1, -1)
+    values = np.array([[p['proj'].get(metric, 0) for p in players]], dtype=float).reshape(1, -1)
+    points, starters = solve_lineups(positions, values)
+
+    lineup = {pos: [] for pos in LINEUP_POSITIONS + ['FLEX']}
+    started = set()
+    for slot, index in zip(SLOTS, starters[0]):
+        if index >= 0:
+            lineup[slot].append(players[index]['full_name'])
+            started.add(index)
+    bench = sorted((i for i in range(len(players)) if i not in started), key=lambda i: -values[0, i])
+    return {
+        'starters': lineup,
+        'bench': [players[i]['full_name'] for i in bench],
+        'unscored': unscored,
+        'projected_points': round(float(points[0]), 2),
+        'margins': lineup_margins(players, values[0], starters[0], bench),
+    }
+
+
+def lineup_margins(players, values, starters, bench):
+    """
+    The three closest bench/starter calls: each bench player against the
+    weakest starter in a slot they could fill, smallest projected gap first.
+    """
+    margins = []
+    for i in bench:
+        pos = players[i]['position']
+        eligible = [s for slot, s in zip(SLOTS, starters) if s >= 0 and (slot == pos or (slot == 'FLEX' and pos in FLEX_POSITIONS))]
+        if eligible:
+            weakest = min(eligible, key=lambda s: values[s])
+            margins.append({'bench': players[i]['full_name'], 'starter': players[weakest]['full_name'],
+                            'gap': round(float(values[weakest] - values[i]), 2)})
+    return sorted(margins, key=lambda m: m['gap'])[:3]
@@ -0,0 +1,129 @@
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = '.llm_cache/responses.sqlite'
+
+
+def normalize_messages(messages):
+    # only role and content reach the model; whitespace differences in the
+    # indented prompt templates should not produce different keys
+    return [{'role': m['role'], 'content': ' '.join(str(m.get('content') or '').split())} for m in messages]
+
+
+def cache_key(model, messages, params=None):
+    payload = {
+        'model': model,
+        'messages': normalize_messages(messages),
+        'params': {k: v for k, v in (params or {}).items() if v is not None},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+class LLMCache:
+    """
+    Content-addressed cache of chat completion responses.
+
+    Lookups go through an in-memory LRU first and then a SQLite store on disk
+    that several processes can share. Disk entries expire after ttl seconds
+    and the least recently used ones are evicted once the store grows past
+    max_disk_bytes. Responses are copied in and out of the memory layer, so
+    callers may modify what they get back.
+
+    :param path: SQLite file for the disk layer (None for memory only)
+    :param max_memory_entries: size of the in-memory LRU
+    :param max_disk_bytes: size limit of stored responses on disk
+    :param ttl: seconds a response stays valid (None = forever)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_memory_entries=1024, max_disk_bytes=256 * 2**20, ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.memory = OrderedDict()
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, '
+                'created REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+
+    def _remember(self, key, response):
+        self.memory[key] = copy.deepcopy(response)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.counters['memory_hits'] += 1
+                return copy.deepcopy(self.memory[key])
+
+            if self._db is not None:
+                row = self._db.execute('SELECT response, created FROM responses WHERE key = ?', (key,)).fetchone()
+                now = time.time()
+                if row is not None and (self.ttl is None or now - row[1] <= self.ttl):
+                    self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                    response = json.loads(row[0])
+                    self._remember(key, response)
+                    self.counters['disk_hits'] += 1
+                    return response
+
+            self.counters['misses'] += 1
+            return None
+
+    def put(self, key, response):
+        with self._lock:
+            self._remember(key, response)
+            self.counters['writes'] += 1
+            if self._db is not None:
+                blob = json.dumps(response)
+                now = time.time()
+                self._db.execute(
+                    'INSERT OR REPLACE INTO responses (key, response, size, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                    (key, blob, len(blob), now, now),
+                )
+                self._evict(now)
+
+    def _evict(self, now):
+        if self.ttl is not None:
+            self.counters['evictions'] += self._db.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl,)).rowcount
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        # drop least recently used entries until back under the limit
+        freed = 0
+        evicted = []
+        for key, size in self._db.execute('SELECT key, size FROM responses ORDER BY accessed'):
+            if total - freed <= self.max_disk_bytes:
+                break
+            evicted.append((key,))
+            freed += size
+        self._db.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        self.counters['evictions'] += len(evicted)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters['memory_hits'] + self.counters['disk_hits'] + self.counters['misses']
+            hits = lookups - self.counters['misses']
+            return {**self.counters, 'hit_rate': hits / lookups if lookups else 0.0}
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
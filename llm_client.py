@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+import aiohttp
+
+from llm_cache import cache_key
+from llm_stub import StubLLMClient
+
+OPENROUTER_URL = os.getenv("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class LLMRequestError(Exception):
+    pass
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket limiting requests per minute; burst defaults to one second of traffic.
+    """
+
+    def __init__(self, requests_per_minute, burst=None):
+        self.rate = requests_per_minute / 60
+        self.capacity = burst or max(1, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncLLMClient:
+    """
+    asyncio chat-completions client that keeps one pooled aiohttp session alive.
+
+    :param key: OpenRouter API key
+    :param base_url: chat completions endpoint
+    :param max_concurrency: maximum number of requests in flight at once
+    :param rate_limits: requests per minute per model, e.g. {"openai/gpt-4o-mini": 500}
+    :param default_rate_limit: requests per minute for models not in rate_limits (None = unlimited)
+    :param max_retries: attempts per request before giving up
+    :param backoff: base delay in seconds for exponential backoff between retries
+    :param timeout: total timeout in seconds for a single attempt
+    """
+
+    def __init__(self, key, base_url=OPENROUTER_URL, max_concurrency=16, rate_limits=None, default_rate_limit=None,
+                 max_retries=3, backoff=1, max_backoff=30, timeout=60):
+        self.key = key
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.rate_limits = rate_limits or {}
+        self.default_rate_limit = default_rate_limit
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self._session = None
+        self._semaphore = None
+        self._buckets = {}
+
+    def _get_session(self):
+        # created lazily so the session binds to whichever loop first uses the client
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Authorization": f"Bearer {self.key}"},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    def _get_bucket(self, model):
+        rpm = self.rate_limits.get(model, self.default_rate_limit)
+        if rpm is None:
+            return None
+        if model not in self._buckets:
+            self._buckets[model] = AsyncTokenBucket(rpm)
+        return self._buckets[model]
+
+    def _retry_delay(self, attempt, backoff, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return min(backoff * 2 ** attempt, self.max_backoff) * random.uniform(0.5, 1)
+
+    async def chat(self, model, messages, max_retries=None, backoff=None, cache=None, trace=None, **params):
+        """
+        Send one chat completion request, retrying transient failures with backoff.
+
+        Extra keyword arguments (temperature, seed, ...) are passed through in the
+        request body; None values are dropped. Pass an LLMCache as cache to serve
+        identical requests from it instead of the network. Pass a dict as trace
+        to have it filled with cache outcome, attempts, status and response size.
+        """
+        trace = {} if trace is None else trace
+        max_retries = self.max_retries if max_retries is None else max_retries
+        backoff = self.backoff if backoff is None else backoff
+        payload = {"model": model, "messages": messages}
+        payload.update({k: v for k, v in params.items() if v is not None})
+
+        if cache is not None:
+            key = cache_key(model, messages, params)
+            # SQLite lookups and writes block, so they run off the shared event loop
+            response = await asyncio.to_thread(cache.get, key)
+            trace['cache'] = 'miss' if response is None else 'hit'
+            if response is None:
+                response = await self.chat(model, messages, max_retries=max_retries, backoff=backoff, trace=trace, **params)
+                if 'choices' in response:
+                    await asyncio.to_thread(cache.put, key, response)
+            return response
+
+        session = self._get_session()
+        bucket = self._get_bucket(model)
+        last_error = None
+        for attempt in range(max_retries):
+            trace['attempts'] = attempt + 1
+            retry_after = None
+            if bucket is not None:
+                await bucket.acquire()
+            async with self._semaphore:
+                try:
+                    async with session.post(self.base_url, json=payload) as resp:
+                        trace['status'] = resp.status
+                        if resp.status in RETRY_STATUSES:
+                            retry_after = resp.headers.get('Retry-After')
+                            last_error = LLMRequestError(f"HTTP {resp.status}: {await resp.text()}")
+                        elif resp.status >= 400:
+                            raise LLMRequestError(f"HTTP {resp.status}: {await resp.text()}")
+                        else:
+                            body = await resp.read()
+                            trace['response_bytes'] = len(body)
+                            return json.loads(body)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    last_error = e
+            if attempt < max_retries - 1:
+                await asyncio.sleep(self._retry_delay(attempt, backoff, retry_after))
+
+        raise LLMRequestError(f"Max retries reached. Last error: {last_error}")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class LLMClient:
+    """
+    Blocking facade over AsyncLLMClient for the synchronous draft and roster scripts.
+
+    The async client runs on a private event loop thread, so every caller in
+    the process (and every thread) shares its connection pool, concurrency
+    bound and rate limits. submit() returns a concurrent.futures.Future for
+    fanning out several requests from synchronous code.
+    """
+
+    def __init__(self, key, **options):
+        self.aclient = AsyncLLMClient(key, **options)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def submit(self, model, messages, **params):
+        return asyncio.run_coroutine_threadsafe(self.aclient.chat(model, messages, **params), self._loop)
+
+    def request(self, model, messages, **params):
+        return self.submit(model, messages, **params).result()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.aclient.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+# name -> factory(key, **options) of an object with request(model, messages, **params) returning a chat completion
+BACKENDS = {'openrouter': LLMClient, 'stub': StubLLMClient}
+_backend = os.getenv('LLM_BACKEND', 'openrouter')
+
+
+def set_backend(name):
+    """
+    Select the backend get_client creates clients from ('openrouter' or 'stub'; LLM_BACKEND env var by default).
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"unknown LLM backend {name!r}, expected one of {sorted(BACKENDS)}")
+    _backend = name
+
+
+def get_client(key=None, **options):
+    """
+    Return the shared client for this process, backend and API key, creating it on first use.
+
+    Options only apply when the client is created. Clients are keyed by pid as
+    well, so forked simulation workers never reuse their parent's connections.
+    """
+    key = key or os.getenv('OPENROUTER_API_KEY')
+    client_key = (os.getpid(), _backend, key)
+    with _clients_lock:
+        if client_key not in _clients:
+            _clients[client_key] = BACKENDS[_backend](key, **options)
+        return _clients[client_key]
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import re
+import time
+from concurrent.futures import Future
+
+from conversation_memory import estimate_tokens
+
+NAME_PATTERN = re.compile(r'"full_?[nN]ame": "([^"]+)"')
+# names with an apostrophe are repr'd in double quotes
+POSITION_PATTERN = re.compile(r"""'player_id': '([^']+)', 'fullName': (?:'[^']*'|"[^"]*"), 'position': '(\w+)'""")
+
+
+def _digest(*parts):
+    return int(hashlib.sha256('\x1f'.join(str(p) for p in parts).encode()).hexdigest(), 16)
+
+
+class StubLLMClient:
+    """
+    Deterministic offline stand-in for LLMClient.
+
+    Answers the draft ACI and roster_actions prompts with a fixed policy
+    instead of a model, so full drafts and weekly roster passes run without
+    network access. The same model, seed and messages always give the same
+    response. Choices vary by model and seed, so A/B configs still diverge.
+
+    :param key: ignored, accepted for get_client compatibility
+    :param latency: seconds to sleep per request, to mimic a remote model
+    """
+
+    def __init__(self, key=None, latency=0.0, **options):
+        self.latency = latency
+
+    def request(self, model, messages, seed=None, cache=None, **params):
+        if self.latency:
+            time.sleep(self.latency)
+        system = str(messages[0].get('content') or '')
+        if 'fantasy football draft' in system:
+            content = self.draft_response(model, seed, messages)
+        else:
+            content = self.roster_response(model, seed, system)
+        prompt = ''.join(str(m.get('content') or '') for m in messages)
+        return {
+            'id': f'stub-{_digest(model, seed, prompt) % 10**12}',
+            'model': model,
+            'choices': [{'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {
+                'prompt_tokens': estimate_tokens(prompt),
+                'completion_tokens': estimate_tokens(content),
+            },
+        }
+
+    def submit(self, model, messages, **params):
+        future = Future()
+        future.set_result(self.request(model, messages, **params))
+        return future
+
+    def close(self):
+        pass
+
+    def draft_response(self, model, seed, messages):
+        context = next((m['content'] for m in messages if m['role'] == 'user' and 'current context' in str(m['content'])), '')
+        match = re.search(r'context:\n(\{.*\})\n', context, re.S)
+        needs = json.loads(match.group(1)).get('roster_needs', {}) if match else {}
+
+        results = [m['content'] for m in messages if m['role'] == 'system' and str(m['content']).startswith('Command result')]
+        candidates = POSITION_PATTERN.findall(results[-1]) if results else []
+        rejected = set(re.findall(r'Invalid player_id: ([^\s;]+)', '\n'.join(results)))
+        candidates = [(pid, pos) for pid, pos in candidates if pid not in rejected]
+        if not candidates:
+            return ("Thought: Let me look at the best available players and my roster.\n"
+                    "Action: get_top_players(6, 'adp')\nget_team_roster()")
+
+        # prefer an unfilled starter slot (kickers and defenses only once the rest are filled)
+        skill_needs = [pos for pos in needs if pos not in ('K', 'DEF', 'FLEX')]
+        preferred = [c for c in candidates if c[1] in skill_needs or (not skill_needs and c[1] in needs)] or candidates
+        roll = _digest(model, seed, context) % 10
+        player_id, position = preferred[0 if roll < 7 else min(len(preferred) - 1, roll - 6)]
+        return f"Thought: {position} {player_id} is the best fit for my roster.\nAction: draft_player('{player_id}')"
+
+    def roster_response(self, model, seed, system):
+        names = NAME_PATTERN.findall(system) or ['Unknown Player']
+        roll = _digest(model, seed, system)
+        pick = lambda offset=0: names[(roll + offset) % len(names)]
+        if 'generating a trade proposal' in system:
+            agents = re.findall(r'Agent (\w+)', system)
+            own, other = agents[0], next((a for a in agents if a != agents[0]), agents[0])
+            body = {
+                f'Agent {own} offers': [{'name': pick(), 'position': 'RB'}],
+                f'Agent {other} offers': [{'name': pick(1), 'position': 'WR'}],
+                'reasoning_for_self': 'Balances positional depth.',
+                'reasoning_for_other': 'Fills a starting need.',
+                'overall_fairness': str(5 + roll % 5),
+            }
+            return f"Thought: Compare both rosters.\nAction: Propose a one-for-one swap.\n{json.dumps(body, indent=2)}"
+        if 'evaluating a fantasy football trade proposal' in system:
+            body = {'decision': 'accept' if roll % 3 == 0 else 'decline', 'reasoning': 'Stub policy decision.'}
+        elif 'recommending a fantasy football lineup' in system:
+            body = {
+                'starters': {'QB': [pick()], 'RB': [pick(1), pick(2)], 'WR': [pick(3), pick(4)], 'TE': [pick(5)],
+                             'FLEX': [pick(6)], 'K': [pick(7)], 'DEF': [pick(8)]},
+                'bench': [pick(9), pick(10)],
+                'reasoning': {},
+                'key_considerations': ['Stub policy lineup.'],
+            }
+        elif 'evaluating free agent' in system:
+            body = {
+                'top_targets': [{'name': pick(), 'reason': 'Highest projection.'}],
+                'sleepers': [{'name': pick(1), 'potential': 'Volume upside.'}],
+                'overall_quality': str(1 + roll % 10),
+            }
+        elif 'optimizing a fantasy football roster' in system:
+            body = {'add_player': pick(), 'drop_player': pick(1), 'faab_bid': roll % 20, 'reasoning': 'Stub policy move.'}
+        else:
+            body = {
+                'team_strength': str(1 + roll % 10),
+                'key_players': [{'name': pick(), 'position': 'RB', 'role': 'starter'}],
+                'weaknesses': ['TE'],
+                'overall_assessment': 'Stub policy evaluation.',
+            }
+        return json.dumps(body, indent=2)
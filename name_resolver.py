@@ -0,0 +1,157 @@
+import re
+
+import numpy as np
+
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+NFL_TEAMS = {
+    'ARI': 'Arizona Cardinals', 'ATL': 'Atlanta Falcons', 'BAL': 'Baltimore Ravens', 'BUF': 'Buffalo Bills',
+    'CAR': 'Carolina Panthers', 'CHI': 'Chicago Bears', 'CIN': 'Cincinnati Bengals', 'CLE': 'Cleveland Browns',
+    'DAL': 'Dallas Cowboys', 'DEN': 'Denver Broncos', 'DET': 'Detroit Lions', 'GB': 'Green Bay Packers',
+    'HOU': 'Houston Texans', 'IND': 'Indianapolis Colts', 'JAX': 'Jacksonville Jaguars', 'KC': 'Kansas City Chiefs',
+    'LAC': 'Los Angeles Chargers', 'LAR': 'Los Angeles Rams', 'LV': 'Las Vegas Raiders', 'MIA': 'Miami Dolphins',
+    'MIN': 'Minnesota Vikings', 'NE': 'New England Patriots', 'NO': 'New Orleans Saints', 'NYG': 'New York Giants',
+    'NYJ': 'New York Jets', 'PHI': 'Philadelphia Eagles', 'PIT': 'Pittsburgh Steelers', 'SEA': 'Seattle Seahawks',
+    'SF': 'San Francisco 49ers', 'TB': 'Tampa Bay Buccaneers', 'TEN': 'Tennessee Titans', 'WAS': 'Washington Commanders',
+}
+# ESPN writes defenses as "<nickname> D/ST", Sleeper as the full team name
+TEAM_BY_NICKNAME = {name.rsplit(' ', 1)[1].lower(): name for name in NFL_TEAMS.values()}
+DEFENSE_PATTERN = re.compile(r'^(.*?)\s*(?:d/st|dst|defense)$')
+# the same player under a different first name on ESPN and Sleeper
+PLAYER_ALIASES = {'Marquise Brown': 'Hollywood Brown'}
+# a name whose two best fuzzy matches score closer than this is left unresolved
+NAME_MARGIN = 0.05
+
+
+def normalize_text(text):
+    """
+    Lowercase, with punctuation and underscores turned into single spaces.
+    """
+    return ' '.join(re.sub(r"[^a-z0-9/ ]", ' ', str(text).lower().replace("'", '').replace('.', '')).split())
+
+
+def normalize_name(name):
+    """
+    Canonical key for a player or team name: no punctuation, no generational
+    suffix (Jr., III, ...) and "<nickname> D/ST" spelled as the full team name.
+    """
+    text = normalize_text(name)
+    match = DEFENSE_PATTERN.match(text)
+    if match and match.group(1) in TEAM_BY_NICKNAME:
+        return TEAM_BY_NICKNAME[match.group(1)].lower()
+    words = text.split()
+    while len(words) > 2 and words[-1] in NAME_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def _bigrams(key):
+    padded = f' {key} '
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class NameIndex:
+    """
+    Precomputed lookup from free-form text to one of a fixed set of choices.
+
+    Choices (and aliases) are normalized once. A query whose normalized form
+    matches one exactly is a dict lookup. Anything else is scored against
+    every choice at once with the Dice coefficient of character bigrams, read
+    off a precomputed bigram matrix, so a fuzzy lookup is one numpy gather
+    rather than a Python loop over the choices.
+
+    :param choices: the values lookups resolve to
+    :param aliases: alternative spellings, {alias: choice}
+    :param normalize: function mapping text to its comparison key
+    """
+
+    def __init__(self, choices, aliases=None, normalize=normalize_name):
+        self.choices = list(choices)
+        self.normalize = normalize
+        keys = [normalize(choice) for choice in self.choices]
+        self.exact = {}
+        # keys shared by several choices, e.g. two players with the same name
+        self.ambiguous = set()
+        for i, key in enumerate(keys):
+            if key in self.exact:
+                self.ambiguous.add(key)
+            self.exact.setdefault(key, i)
+        position = {choice: i for i, choice in enumerate(self.choices)}
+        for alias, choice in (aliases or {}).items():
+            if choice in position:
+                self.exact.setdefault(normalize(alias), position[choice])
+
+        grams = [_bigrams(key) for key in keys]
+        self.vocab = {gram: col for col, gram in enumerate(sorted(set().union(*grams)))}
+        self.matrix = np.zeros((len(keys), len(self.vocab)), dtype=np.uint8)
+        for row, row_grams in enumerate(grams):
+            self.matrix[row, [self.vocab[g] for g in row_grams]] = 1
+        self.sizes = self.matrix.sum(axis=1)
+
+    def scores(self, query):
+        """
+        Dice similarity of query to every choice, in [0, 1].
+        """
+        grams = _bigrams(self.normalize(query))
+        cols = [self.vocab[g] for g in grams if g in self.vocab]
+        overlap = self.matrix[:, cols].sum(axis=1)
+        return 2 * overlap / (self.sizes + len(grams))
+
+    def find(self, query, min_score=0.0, margin=None):
+        """
+        Position of the best matching choice, or None when nothing scores at least min_score.
+
+        :param margin: if given, also None when the query is ambiguous: its key is
+                       shared by several choices, or the runner-up fuzzy score is
+                       within margin of the best
+        """
+        key = self.normalize(query)
+        exact = self.exact.get(key)
+        if exact is not None:
+            return None if margin is not None and key in self.ambiguous else exact
+        if not self.choices:
+            return None
+        scores = self.scores(query)
+        best = int(np.argmax(scores))
+        if scores[best] <= 0 or scores[best] < min_score:
+            return None
+        if margin is not None and len(scores) > 1 and np.partition(scores, -2)[-2] >= scores[best] - margin:
+            return None
+        return best
+
+    def match(self, query, min_score=0.0, margin=None):
+        found = self.find(query, min_score, margin)
+        return None if found is None else self.choices[found]
+
+    def find_many(self, queries, min_score=0.0, margin=None):
+        """
+        find for a batch of queries; fuzzy ones are scored together with one matrix product.
+
+        :return: int array of choice positions, -1 where nothing (or, with a margin, more than one choice) matched
+        """
+        found = np.full(len(queries), -1, dtype=int)
+        fuzzy = []
+        for i, query in enumerate(queries):
+            key = self.normalize(query)
+            exact = self.exact.get(key)
+            if exact is None:
+                fuzzy.append(i)
+            elif margin is None or key not in self.ambiguous:
+                found[i] = exact
+        if fuzzy and self.choices:
+            query_matrix = np.zeros((len(fuzzy), len(self.vocab)), dtype=np.float32)
+            query_sizes = np.zeros(len(fuzzy), dtype=np.float32)
+            for row, i in enumerate(fuzzy):
+                grams = _bigrams(self.normalize(queries[i]))
+                query_matrix[row, [self.vocab[g] for g in grams if g in self.vocab]] = 1
+                query_sizes[row] = len(grams)
+            scores = 2 * (query_matrix @ self.matrix.T.astype(np.float32)) / (query_sizes[:, None] + self.sizes[None, :])
+            best = scores.argmax(axis=1)
+            best_scores = scores[np.arange(len(fuzzy)), best]
+            ok = (best_scores > 0) & (best_scores >= min_score)
+            if margin is not None and scores.shape[1] > 1:
+                ok &= np.partition(scores, -2, axis=1)[:, -2] < best_scores - margin
+            found[np.asarray(fuzzy)[ok]] = best[ok]
+        return found
+
+    def match_many(self, queries, min_score=0.0, margin=None):
+        return [self.choices[i] if i >= 0 else None for i in self.find_many(queries, min_score, margin)]
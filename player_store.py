@@ -0,0 +1,84 @@
+import numpy as np
+
+POS_PROJ_COLS = {
+    'DEF': ['pts_ppr', 'safe', 'int', 'pts_allow', 'yds_allow', 'tkl_loss'],
+    'QB': ['pts_ppr', 'pass_yd', 'cmp_pct', 'pass_td', 'rush_att', 'rush_td', 'fum'],
+    'K': ['pts_ppr', 'fga', 'fgm', 'fgm_20_29', 'fgm_40_49', 'fgm_50p'],
+    'TE': ['pts_ppr', 'rec_tgt', 'rec', 'rec_yd', 'rec_td'],
+    'RB': ['pts_ppr', 'rush_att', 'rush_yd', 'rush_td', 'rec_tgt', 'rec', 'rec_yd'],
+    'WR': ['pts_ppr', 'rec_tgt', 'rec', 'rec_yd', 'rec_td', 'rush_att', 'rush_yd'],
+}
+
+POS_STATS_COLS = {
+    'DEF': ['pts_ppr', 'qb_hit', 'def_forced_punts', 'def_st_ff', 'safe', 'int', 'pts_allow', 'yds_allow', 'tkl_loss', 'def_st_td'],
+    'QB': ['pts_ppr', 'pass_yd', 'cmp_pct', 'pass_ypc', 'pass_rz_att', 'pass_td', 'rush_att', 'rush_rec_yd', 'rush_rz_att', 'rush_td', 'fum'],
+    'K': ['pts_ppr', 'fga', 'fgm', 'fgm_pct', 'fgm_20_29', 'fgm_40_49', 'fgm_50p'],
+    'TE': ['pts_ppr', 'rec_tgt', 'rec', 'rec_yd', 'rec_rz_tgt', 'rec_td', 'off_snp', 'tm_off_snp'],
+    'RB': ['pts_ppr', 'rush_att', 'rush_yd', 'rush_rz_att', 'rush_td', 'rec_tgt', 'rec', 'rec_yd', 'rec_rz_tgt', 'off_snp', 'tm_off_snp'],
+    'WR': ['pts_ppr', 'rec_tgt', 'rec', 'rec_yd', 'rec_rz_tgt', 'rec_td', 'rush_att', 'rush_yd', 'rush_rz_att', 'off_snp', 'tm_off_snp'],
+}
+
+
+def _py_value(value):
+    # float32 columns -> the plain numbers the prompts used to show
+    value = round(float(value), 3)
+    return int(value) if value.is_integer() else value
+
+
+def _first_rows(table, pos_cols):
+    """
+    player_id -> (position, full_name, {stat: value}) for the first row of each player.
+
+    Only the position-specific columns are kept and missing (NaN) values are
+    skipped, matching what the nested stats dicts used to contain.
+    """
+    table = table.drop_duplicates('player_id')
+    rows = {}
+    for position, cols in pos_cols.items():
+        pos_table = table[table['fantasy_position'] == position]
+        cols = [col for col in cols if col in pos_table.columns]
+        values = pos_table[cols].to_numpy(dtype=float)
+        for pid, full_name, row in zip(pos_table['player_id'], pos_table['full_name'], values):
+            full_name = full_name if isinstance(full_name, str) else None
+            rows[str(pid)] = (position, full_name, {col: _py_value(v) for col, v in zip(cols, row) if not np.isnan(v)})
+    return rows
+
+
+class PlayerStore:
+    """
+    Player info keyed by player_id, built once after stats and projections load.
+
+    Each record holds the position, name and the position-specific stat and
+    projection columns, so every prompt builder reads players in O(1) instead
+    of scanning the stats/projs tables per player.
+
+    :param projs: projections table from sleeper_ingest.flatten_stats_payload
+    :param stats: stats table from sleeper_ingest.flatten_stats_payload
+    """
+
+    def __init__(self, projs, stats):
+        stats_rows = _first_rows(stats, POS_STATS_COLS)
+        proj_rows = _first_rows(projs, POS_PROJ_COLS)
+        self.players = {}
+        for pid in {**stats_rows, **proj_rows}:
+            self.players[pid] = self._build_record(pid, stats_rows.get(pid), proj_rows.get(pid))
+
+    @staticmethod
+    def _build_record(pid, stats_row, proj_row):
+        # position and name come from stats when the player has any, else from projections
+        position, full_name, _ = stats_row or proj_row
+        relevant_stats = stats_row[2] if stats_row is not None else {stat: 0 for stat in POS_STATS_COLS[position]}
+        relevant_proj = proj_row[2] if proj_row is not None else {stat: 0 for stat in POS_PROJ_COLS[position]}
+        return {
+            'player_id': pid,
+            'full_name': full_name,
+            'position': position,
+            'stats': relevant_stats,
+            'proj': relevant_proj,
+        }
+
+    def get(self, player_id, default=-1):
+        return self.players.get(str(player_id), default)
+
+    def __contains__(self, player_id):
+        return str(player_id) in self.players
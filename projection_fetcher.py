@@ -0,0 +1,176 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SLEEPER_API = 'https://api.sleeper.com'
+# the API allows 1000 requests per minute; stay just under it
+REQUESTS_PER_MINUTE = 990
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: acquire() blocks until a request may be sent.
+    """
+
+    def __init__(self, requests_per_minute, burst=1):
+        self.rate = requests_per_minute / 60
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ProjectionFetcher:
+    """
+    Download weekly Sleeper projections for many players concurrently.
+
+    Requests go through a shared token bucket so throughput sits at the API
+    limit, a bounded pool of workers each keeps its own keep-alive session,
+    and failed requests are retried with backoff. Every finished player is
+    appended to a JSONL checkpoint, so an interrupted build resumes where it
+    stopped instead of starting over. The checkpoint is deleted once a run
+    fetches every player, so the next build downloads fresh projections.
+
+    :param base_url: Sleeper API root
+    :param season: season to fetch projections for
+    :param requests_per_minute: shared rate limit across all workers
+    :param workers: number of concurrent requests
+    :param max_retries: attempts per player before giving up
+    :param backoff: base delay in seconds for exponential backoff between retries
+    :param checkpoint_path: JSONL file of finished players (None disables checkpointing)
+    :param cache: optional HTTPCache; players fetched less than max_age seconds ago
+                  are served from it and older ones are revalidated with conditional requests
+    """
+
+    def __init__(self, base_url=SLEEPER_API, season=2024, requests_per_minute=REQUESTS_PER_MINUTE, workers=16,
+                 max_retries=5, backoff=0.5, timeout=10, checkpoint_path='out/projections_checkpoint.jsonl',
+                 cache=None, max_age=None):
+        self.base_url = base_url.rstrip('/')
+        self.season = season
+        self.bucket = TokenBucket(requests_per_minute)
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.checkpoint_path = checkpoint_path
+        self.cache = cache
+        self.max_age = max_age
+        self._local = threading.local()
+        self._checkpoint_lock = threading.Lock()
+
+    def url(self, pid):
+        return f'{self.base_url}/projections/nfl/player/{pid}?season_type=regular&season={self.season}&grouping=week'
+
+    def _session(self):
+        if not hasattr(self._local, 'session'):
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_maxsize=1))
+            session.mount('http://', HTTPAdapter(pool_maxsize=1))
+            self._local.session = session
+        return self._local.session
+
+    def fetch_one(self, pid):
+        """
+        :return: (projections, changed) where changed is False if the cached copy was still current
+        """
+        url = self.url(pid)
+        if self.cache is not None:
+            cached = self.cache.fresh(url, self.max_age)
+            if cached is not None:
+                return cached, False
+
+        last_error = None
+        for attempt in range(self.max_retries):
+            self.bucket.acquire()
+            try:
+                headers = self.cache.conditional_headers(url) if self.cache is not None else None
+                resp = self._session().get(url, headers=headers, timeout=self.timeout)
+                if resp.status_code == 304 and self.cache is not None:
+                    return self.cache.touch(url), False
+                if resp.status_code not in RETRY_STATUSES:
+                    resp.raise_for_status()
+                    payload = resp.json()
+                    changed = self.cache.store(url, resp, payload) if self.cache is not None else True
+                    return payload, changed
+                last_error = requests.HTTPError(f'HTTP {resp.status_code}')
+            except (requests.ConnectionError, requests.Timeout, ValueError) as e:
+                last_error = e
+            if attempt < self.max_retries - 1:
+                time.sleep(self.backoff * 2 ** attempt)
+        raise last_error
+
+    def load_checkpoint(self):
+        done = {}
+        if self.checkpoint_path is None or not os.path.exists(self.checkpoint_path):
+            return done
+        with open(self.checkpoint_path, 'rb+') as f:
+            data = f.read()
+            # a crash mid-write leaves a partial last line; drop it so new records start on a fresh line
+            complete = data[:data.rfind(b'\n') + 1]
+            if len(complete) < len(data):
+                f.truncate(len(complete))
+        for line in complete.decode().splitlines():
+            record = json.loads(line)
+            done[record['player_id']] = record['projections']
+        return done
+
+    def _checkpoint(self, pid, projections):
+        if self.checkpoint_path is None:
+            return
+        with self._checkpoint_lock:
+            with open(self.checkpoint_path, 'a') as f:
+                f.write(json.dumps({'player_id': pid, 'projections': projections}) + '\n')
+
+    def fetch_all(self, pids):
+        """
+        Fetch projections for every player id, skipping ones already in the checkpoint.
+
+        The checkpoint is removed when no player failed; otherwise it is kept for the next run to resume from.
+
+        :return: ({player_id: projections}, {player_id: error message}, {player_ids whose projections changed})
+        """
+        pids = [str(pid) for pid in pids]
+        if self.checkpoint_path is not None:
+            os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        done = self.load_checkpoint()
+        todo = [pid for pid in dict.fromkeys(pids) if pid not in done]
+        print(f'{len(pids) - len(todo)} players already fetched, {len(todo)} to go')
+
+        failed = {}
+        changed = set()
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.fetch_one, pid): pid for pid in todo}
+            for i, future in enumerate(as_completed(futures), 1):
+                pid = futures[future]
+                try:
+                    done[pid], pid_changed = future.result()
+                    if pid_changed:
+                        changed.add(pid)
+                    self._checkpoint(pid, done[pid])
+                except Exception as e:
+                    failed[pid] = str(e)
+                if i % 100 == 0:
+                    print(f'fetched {i}/{len(todo)} ({i / (time.time() - start) * 60:.0f} req/min)')
+
+        if not failed and self.checkpoint_path is not None and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return {pid: done[pid] for pid in pids if pid in done}, failed, changed
@@ -1,13 +1,22 @@
-import pandas as pd
 import requests
 import os
 import re
 import json
 from dotenv import load_dotenv
-from fuzzywuzzy import process, fuzz
 import numpy as np
 import warnings
 import datetime as dt
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from llm_client import get_client, LLMRequestError
+from llm_cache import LLMCache, DEFAULT_CACHE_PATH
+from player_store import PlayerStore
+from league_snapshot import DEFAULT_SNAPSHOT_DIR, SnapshotStore
+from fa_index import FreeAgentIndex
+from lineup import solve_lineup
+from trade_engine import find_trades
+from tracing import Tracer, span, traced, use_tracer
 warnings.filterwarnings('ignore')
 
 # load environment variables
@@ -29,37 +38,38 @@ HEADERS = {
 }
 agents = [x for x in 'abcdefghijkl']
 AGENTS_MODELS = {agent: "openai/gpt-4o-mini" for agent in 'abcdefghijkl'}
+POSITIONS = ['QB', 'RB', 'WR', 'TE', 'K', 'DEF']
+# enough in-flight LLM requests for every independent call of a weekly run
+MAX_CONCURRENT_REQUESTS = 256
+# when recommend_lineup asks the LLM: 'never' (solver only), 'ties' (closest bench/starter gap under LINEUP_TIE_MARGIN) or 'always'
+LINEUP_LLM = 'never'
+LINEUP_TIE_MARGIN = 1.0
+# trades each agent proposes; candidates come from trade_engine.find_trades
+TRADES_PER_AGENT = 1
 
 # helper functions
-def openrouter_req(model, messages, key, max_retries=3, retry_delay=1):
+def openrouter_req(model, messages, key, max_retries=3, retry_delay=1, cache=None):
     """
-    Make a request to OpenRouter API with retry mechanism.
+    Make a request to OpenRouter API through the shared pooled client, with retries.
     
     :param model: The model to use for the request
     :param messages: The messages to send to the model
     :param key: The API key
     :param max_retries: Maximum number of retry attempts (default 3)
-    :param retry_delay: Delay between retries in seconds (default 1)
+    :param retry_delay: Base delay for exponential backoff between retries in seconds (default 1)
+    :param cache: Optional LLMCache; identical requests are answered from it
     :return: JSON response from the API
     """
-    for attempt in range(max_retries):
+    with span('llm.request', model=model, messages=len(messages), prompt_chars=sum(len(str(m.get('content') or '')) for m in messages)) as attrs:
         try:
-            response = requests.post(
-                url="https://openrouter.ai/api/v1/chat/completions",
-                headers={"Authorization": f"Bearer {key}"},
-                json={"model": model, "messages": messages},
-                timeout=10  # Add a timeout to prevent indefinite hanging
-            )
-            response.raise_for_status()  # Raise an exception for bad status codes
-            return response.json()
-        except (requests.RequestException, ValueError) as e:
-            if attempt < max_retries - 1:
-                print(f"Request failed. Retrying in {retry_delay} seconds... (Attempt {attempt + 1}/{max_retries})")
-                time.sleep(retry_delay)
-            else:
-                print(f"Max retries reached. Last error: {str(e)}")
-                return {"error": str(e)}  
-            
+            response = get_client(key).request(model, messages, max_retries=max_retries, backoff=retry_delay, cache=cache, trace=attrs)
+        except LLMRequestError as e:
+            print(str(e))
+            attrs['error'] = str(e)
+            return {"error": str(e)}
+        attrs.update(response.get('usage') or {})
+        return response
+
 def safe_json_loads(json_string):
     try:
         return json.loads(json_string)
@@ -67,13 +77,6 @@ def safe_json_loads(json_string):
         # If JSON is malformed, return the string as is
         return json_string
     
-def manage_conversation_history(history, new_message, max_messages=10):
-    if len(history) >= max_messages:
-        summary = {"role": "system", "content": f"[{len(history) - max_messages + 1} earlier messages omitted]"}
-        history = [summary] + history[-(max_messages-1):]
-    history.append(new_message)
-    return history
-
 def parse_lm_response(response):
     parts = response.split('Action:', 1)
     thought = parts[0].replace('Thought:', '').strip()
@@ -171,87 +174,17 @@ def get_league_detail(league_id, headers):
         """ % (league_id, league_id, league_id, league_id)
     }
 
-    resp = requests.post('https://sleeper.com/graphql', headers=headers, json=payload)
+    with span('sleeper.get_league_detail', league_id=league_id) as attrs:
+        resp = requests.post('https://sleeper.com/graphql', headers=headers, json=payload)
+        attrs.update(status=resp.status_code, response_bytes=len(resp.content))
     return resp.json()
 
-def get_top_players_stats(fa_pos_stats, n, metric, position):
-    print('running stats')
-    position_players = fa_pos_stats[position]
-    top_players = position_players.sort_values(metric, ascending=False).head(int(n))
-    print(f'found {len(top_players)} in {position} by {metric}')
-    return top_players[['full_name', 'player_id', metric]].to_dict('records')
-
-def get_top_players_projections(fa_pos_proj, n, metric, position):
-    print('running projections')
-    position_players = fa_pos_proj[position]
-    top_players = position_players.sort_values(metric, ascending=False).head(int(n))
-    print(f'found {len(top_players)} in {position} by {metric}')
-    return top_players[['full_name', 'player_id', metric]].to_dict('records')
-
-def get_player_info(player_id, projs, stats):
-    player_id = str(player_id)
-    pos_proj_cols = {}
-
-    pos_proj_cols['DEF'] = ['pts_ppr', 'safe', 'int', 'pts_allow', 'yds_allow', 'tkl_loss']
-    pos_proj_cols['QB'] = ['pts_ppr', 'pass_yd', 'cmp_pct', 'pass_td', 'rush_att', 'rush_td', 'fum']
-    pos_proj_cols['K'] = ['pts_ppr','fga', 'fgm', 'fgm_20_29', 'fgm_40_49', 'fgm_50p']
-    pos_proj_cols['TE'] = ['pts_ppr', 'rec_tgt', 'rec', 'rec_yd', 'rec_td',]
-    pos_proj_cols['RB'] = ['pts_ppr', 'rush_att', 'rush_yd',  'rush_td', 'rec_tgt', 'rec', 'rec_yd', ]
-    pos_proj_cols['WR'] = ['pts_ppr', 'rec_tgt', 'rec', 'rec_yd', 'rec_td', 'rush_att', 'rush_yd',]
-
-    pos_stats_cols = {}
+def get_player_info(player_id, store):
+    return store.get(player_id)
     
-    pos_stats_cols['DEF'] = ['pts_ppr', 'qb_hit', 'def_forced_punts', 'def_st_ff', 'safe', 'int', 'pts_allow', 'yds_allow', 'tkl_loss', 'def_st_td']
-    pos_stats_cols['QB'] = ['pts_ppr', 'pass_yd', 'cmp_pct', 'pass_ypc', 'pass_rz_att', 'pass_td', 'rush_att', 'rush_rec_yd', 'rush_rz_att', 'rush_td', 'fum']
-    pos_stats_cols['K'] = ['pts_ppr','fga', 'fgm', 'fgm_pct', 'fgm_20_29', 'fgm_40_49', 'fgm_50p']
-    pos_stats_cols['TE'] = ['pts_ppr', 'rec_tgt', 'rec', 'rec_yd', 'rec_rz_tgt', 'rec_td', 'off_snp', 'tm_off_snp']
-    pos_stats_cols['RB'] = ['pts_ppr', 'rush_att', 'rush_yd', 'rush_rz_att', 'rush_td', 'rec_tgt', 'rec', 'rec_yd', 'rec_rz_tgt', 'off_snp', 'tm_off_snp']
-    pos_stats_cols['WR'] = ['pts_ppr', 'rec_tgt', 'rec', 'rec_yd', 'rec_rz_tgt', 'rec_td', 'rush_att', 'rush_yd', 'rush_rz_att', 'off_snp', 'tm_off_snp']
-
-
-    if player_id in stats['player_id'].unique() and player_id in projs['player_id'].unique():
-        player_data_stats = stats[stats['player_id'] == player_id].iloc[0]['stats']
-        position = stats[stats['player_id'] == player_id]['player'].values[0]['fantasy_positions'][0]
-        player_data_projs = projs[projs['player_id'] == player_id].iloc[0]['stats']
-        relevant_stats = {stat: player_data_stats[stat] for stat in pos_stats_cols[position] if stat in player_data_stats}
-        relevant_proj = {stat: player_data_projs[stat] for stat in pos_proj_cols[position] if stat in player_data_projs}
-        return {
-        'player_id': player_id,
-        'full_name': stats[stats['player_id'] == player_id]['full_name'].values[0],
-        'position': position,
-        'stats': relevant_stats,
-        'proj': relevant_proj
-        }
-    elif player_id in stats['player_id'].unique():
-        player_data_stats = stats[stats['player_id'] == player_id].iloc[0]['stats']
-        position = stats[stats['player_id'] == player_id]['player'].values[0]['fantasy_positions'][0]
-        relevant_stats = {stat: player_data_stats[stat] for stat in pos_stats_cols[position] if stat in player_data_stats}
-        relevant_proj = {stat: 0 for stat in pos_proj_cols[position]}
-        return {
-        'player_id': player_id,
-        'full_name': stats[stats['player_id'] == player_id]['full_name'].values[0],
-        'position': position,
-        'stats': relevant_stats,
-        'proj': relevant_proj
-        }
-    elif player_id in projs['player_id'].unique():
-        player_data_projs = projs[projs['player_id'] == player_id].iloc[0]['stats']
-        position = projs[projs['player_id'] == player_id]['player'].values[0]['fantasy_positions'][0]
-        relevant_stats = {stat: 0 for stat in pos_stats_cols[position]}
-        relevant_proj = {stat: player_data_projs[stat] for stat in pos_proj_cols[position] if stat in player_data_projs}
-        return {
-        'player_id': player_id,
-        'full_name': projs[projs['player_id'] == player_id]['full_name'].values[0],
-        'position': position,
-        'stats': relevant_stats,
-        'proj': relevant_proj
-        }
-    else:
-        return -1
-    
-    
-def get_roster_info(roster_ids, projs, stats):
-    return [get_player_info(pid, projs, stats) for pid in roster_ids]
+@traced('store.get_roster_info')
+def get_roster_info(roster_ids, store):
+    return [get_player_info(pid, store) for pid in roster_ids]
 
 def get_rosters(league_detail):
     rosters = {}
@@ -266,40 +199,32 @@ def get_rosters(league_detail):
         rosters_rid[rid] = players
     return rosters, rosters_rid
 
+@traced('frame.get_free_agents')
 def get_free_agents(all_rostered_ids, stats, projs, active_ids):
     active_stats = stats[stats['player_id'].isin(active_ids)]
     fa_stats = active_stats[~active_stats['player_id'].isin(all_rostered_ids)]
-    fa_stats['fantasy_position'] = fa_stats['player'].apply(lambda x: x['fantasy_positions'][0] if 'fantasy_positions' in x else None)
-    fa_stats['first_name'] = fa_stats['player'].apply(lambda x: x['first_name'] if 'first_name' in x else None)
-    fa_stats['last_name'] = fa_stats['player'].apply(lambda x: x['last_name'] if 'last_name' in x else None)
-    fa_stats['full_name'] = fa_stats['first_name'] + ' ' + fa_stats['last_name']
 
     active_proj = projs[projs['player_id'].isin(active_ids)]
     fa_proj = active_proj[~active_proj['player_id'].isin(all_rostered_ids)]
-    fa_proj['fantasy_position'] = fa_proj['player'].apply(lambda x: x['fantasy_positions'][0] if 'fantasy_positions' in x else None)
-    fa_proj['first_name'] = fa_proj['player'].apply(lambda x: x['first_name'] if 'first_name' in x else None)
-    fa_proj['last_name'] = fa_proj['player'].apply(lambda x: x['last_name'] if 'last_name' in x else None)
-    fa_proj['full_name'] = fa_proj['first_name'] + ' ' + fa_proj['last_name']
 
     return fa_stats, fa_proj
 
+@traced('frame.get_position_data')
 def get_position_data(fa_stats, fa_proj):
     fa_pos_proj = {}
     fa_pos_stats = {}
-    for pos in ['QB', 'RB', 'WR', 'TE', 'K', 'DEF']:
-        fa_pos_proj[pos] = fa_proj[fa_proj['fantasy_position']==pos]
-        fa_pos_proj[pos] = pd.concat([fa_pos_proj[pos].drop('stats', axis=1).reset_index(drop=True), pd.json_normalize(fa_pos_proj[pos]['stats'])], axis=1)
-        
-        fa_pos_stats[pos] = fa_stats[fa_stats['fantasy_position']==pos]
-        fa_pos_stats[pos] = pd.concat([fa_pos_stats[pos].drop('stats', axis=1).reset_index(drop=True), pd.json_normalize(fa_pos_stats[pos]['stats'])], axis=1)    
+    for pos in POSITIONS:
+        # stats no player at this position has are dropped, as json_normalize used to leave them out
+        fa_pos_proj[pos] = fa_proj[fa_proj['fantasy_position']==pos].dropna(axis=1, how='all').reset_index(drop=True)
+        fa_pos_stats[pos] = fa_stats[fa_stats['fantasy_position']==pos].dropna(axis=1, how='all').reset_index(drop=True)
     
     return fa_pos_proj, fa_pos_stats
 
-def evaluate_roster(roster, projs, stats):
+def evaluate_roster(roster, store, cache=None):
     """
     Evaluate the current roster.
     """
-    roster_info = get_roster_info(roster, projs=projs, stats=stats)
+    roster_info = get_roster_info(roster, store)
     
     system_message = {
         "role": "system",
@@ -324,13 +249,25 @@ def evaluate_roster(roster, projs, stats):
     }
     
     messages = [system_message]
-    response = openrouter_req(AGENTS_MODELS['a'], messages, key)
+    response = openrouter_req(AGENTS_MODELS['a'], messages, key, cache=cache)
     evaluation = response['choices'][0]['message']['content']
     
     return evaluation
 
-def recommend_lineup(agent, model, key, agent_roster, projs, stats, week=2):
-    roster_info = get_roster_info(agent_roster, projs=projs, stats=stats)
+def recommend_lineup(agent, model, key, agent_roster, store, week=2, cache=None, llm=LINEUP_LLM):
+    """
+    Lineup for the week from the exact projection-based solver (lineup.solve_lineup).
+
+    :param llm: when to also ask the LLM, for tie-breaks or commentary on the
+                solved lineup: 'never', 'ties' or 'always'
+    :return: JSON string with starters, bench, unscored (ids without projections), projected_points and the closest bench/starter margins
+    """
+    solved = solve_lineup(agent_roster, store)
+    close_call = bool(solved['margins']) and solved['margins'][0]['gap'] < LINEUP_TIE_MARGIN
+    if llm == 'never' or (llm == 'ties' and not close_call):
+        return json.dumps(solved, indent=2)
+
+    roster_info = get_roster_info(agent_roster, store)
     
     system_message = {
         "role": "system",
@@ -339,6 +276,10 @@ def recommend_lineup(agent, model, key, agent_roster, projs, stats, week=2):
         
         {json.dumps(roster_info, indent=2)}
         
+        A solver maximizing projected points recommends this lineup; keep it unless
+        a close call (see margins) should go the other way, and explain your choices:
+        {json.dumps(solved)}
+        
         Consider the scoring system (PPR) and lineup requirements:
         1 QB, 2 RB, 2 WR, 1 FLEX (RB/WR/TE), 1 TE, 1 K, 1 DEF
         
@@ -369,15 +310,18 @@ def recommend_lineup(agent, model, key, agent_roster, projs, stats, week=2):
     }
     
     messages = [system_message]
-    response = openrouter_req(model, messages, key)
+    response = openrouter_req(model, messages, key, cache=cache)
     lineup_recommendation = response['choices'][0]['message']['content']
     
     return lineup_recommendation
 
 
-def generate_trade_proposal(proposing_agent, model, key, own_roster, other_agent, other_roster, projs, stats):
-    own_roster_info = get_roster_info(own_roster, projs, stats)
-    other_roster_info = get_roster_info(other_roster, projs, stats)
+def generate_trade_proposal(proposing_agent, model, key, own_roster, other_agent, other_roster, store, cache=None, candidate=None):
+    """
+    :param candidate: optional swap from trade_engine.find_trades to start the proposal from
+    """
+    own_roster_info = get_roster_info(own_roster, store)
+    other_roster_info = get_roster_info(other_roster, store)
     
     system_message = {
         "role": "system",
@@ -389,7 +333,7 @@ def generate_trade_proposal(proposing_agent, model, key, own_roster, other_agent
         
         Agent {other_agent}'s roster:
         {json.dumps(other_roster_info, indent=2)}
-        
+        {describe_trade_candidate(candidate, store)}
         Consider the scoring system (PPR) and lineup requirements 
         (1 QB, 2 RB, 2 WR, 1 TE, 1 FLEX, 1 K, 1 DST, 5 BENCH).
         
@@ -421,12 +365,20 @@ def generate_trade_proposal(proposing_agent, model, key, own_roster, other_agent
     }
     
     messages = [system_message]
-    response = openrouter_req(model, messages, key)
+    response = openrouter_req(model, messages, key, cache=cache)
     trade_proposal = response['choices'][0]['message']['content']
     
     return trade_proposal
 
-def evaluate_trade_proposal(evaluating_agent, model, key, own_roster, proposing_agent, other_roster, trade_proposal, projs, stats):
+def describe_trade_candidate(candidate, store):
+    if candidate is None:
+        return ''
+    give, get = store.get(candidate['give']), store.get(candidate['get'])
+    return (f"A projection model suggests you give {give['full_name']} ({give['position']}) for {get['full_name']} ({get['position']}): "
+            f"{candidate['proposer_gain']:+.1f} projected lineup points this week for you, {candidate['partner_gain']:+.1f} for them. "
+            "Use it as a starting point.\n")
+
+def evaluate_trade_proposal(evaluating_agent, model, key, own_roster, proposing_agent, other_roster, trade_proposal, store, cache=None):
     """
     Evaluate a trade proposal from the perspective of the receiving team.
     
@@ -437,12 +389,12 @@ def evaluate_trade_proposal(evaluating_agent, model, key, own_roster, proposing_
     :param proposing_agent: The identifier of the agent who proposed the trade
     :param other_roster: List of player IDs in the proposing agent's roster
     :param trade_proposal: JSON string containing the trade proposal
-    :param projs: Projections dataframe
-    :param stats: Stats dataframe
+    :param store: PlayerStore built from the projections and stats
+    :param cache: Optional LLMCache for the request
     :return: JSON string containing trade evaluation and decision
     """
-    own_roster_info = get_roster_info(own_roster, projs, stats)
-    other_roster_info = get_roster_info(other_roster, projs, stats)
+    own_roster_info = get_roster_info(own_roster, store)
+    other_roster_info = get_roster_info(other_roster, store)
     
     system_message = {
         "role": "system",
@@ -470,36 +422,18 @@ def evaluate_trade_proposal(evaluating_agent, model, key, own_roster, proposing_
     }
     
     messages = [system_message]
-    response = openrouter_req(model, messages, key)
+    response = openrouter_req(model, messages, key, cache=cache)
     trade_evaluation = response['choices'][0]['message']['content']
     
     return trade_evaluation
-def source_free_agents(agent, model, key, position, fa_pos_stats, fa_pos_proj):
-    """
-    Source free agents for a given position.
-    """
-    metrics = {
-        'QB': ['pts_ppr', 'pass_yd', 'pass_td', 'rush_yd'],
-        'RB': ['pts_ppr', 'rush_yd', 'rush_td', 'rec_yd'],
-        'WR': ['pts_ppr', 'rec_yd', 'rec_td', 'rec'],
-        'TE': ['pts_ppr', 'rec_yd', 'rec_td', 'rec'],
-        'K': ['pts_ppr', 'fgm', 'fgm_40_49', 'fgm_50p'],
-        'DEF': ['pts_ppr', 'sack', 'int',]
-    }
-    
-    sourced_players = set()
-    for metric in metrics[position]:
-        top_stats = get_top_players_stats(fa_pos_stats, 3, metric, position)
-        top_proj = get_top_players_projections(fa_pos_proj, 3, metric, position)
-        sourced_players.update([player['player_id'] for player in top_stats + top_proj])
-    
-    return list(sourced_players)
-
-def evaluate_free_agents(agent, model, key, free_agents, position, projs, stats):
+def evaluate_free_agents(agent, model, key, free_agents, position, store, cache=None):
     """
     Evaluate sourced free agents for a given position.
+
+    The prompt does not depend on the agent, so run_weekly_pipeline makes one
+    call per (model, position) and shares the result.
     """
-    fa_info = [get_player_info(pid, projs, stats) for pid in free_agents]
+    fa_info = [get_player_info(pid, store) for pid in free_agents]
     
     system_message = {
         "role": "system",
@@ -524,12 +458,12 @@ def evaluate_free_agents(agent, model, key, free_agents, position, projs, stats)
     }
     
     messages = [system_message]
-    response = openrouter_req(model, messages, key)
+    response = openrouter_req(model, messages, key, cache=cache)
     evaluation = response['choices'][0]['message']['content']
     
     return evaluation
 
-def optimize_roster(agent, model, key, roster, roster_evaluation, free_agent_evaluation, total_faab=100, remaining_faab=100):
+def optimize_roster(agent, model, key, roster, roster_evaluation, free_agent_evaluation, total_faab=100, remaining_faab=100, cache=None):
     """
     Optimize the roster based on current roster evaluation and free agent evaluation.
     """
@@ -558,7 +492,7 @@ def optimize_roster(agent, model, key, roster, roster_evaluation, free_agent_eva
     }
     
     messages = [system_message]
-    response = openrouter_req(model, messages, key)
+    response = openrouter_req(model, messages, key, cache=cache)
     recommendation = response['choices'][0]['message']['content']
     
     return recommendation
@@ -600,77 +534,153 @@ def execute_transaction(add_player, drop_player, faab_bid): # does not work lol.
     resp = requests.post('https://sleeper.com/graphql', headers=HEADERS, json=payload)
     return resp.json()
 
-league_detail = get_league_detail(league_id, HEADERS)
-rosters, rosters_rid = get_rosters(league_detail)
-
-agent_rosters = {agents[i]: rosters_rid[i+1] for i in range(len(agents))}
-
-players_req = requests.get('https://api.sleeper.com/players/nfl/')
-psj = players_req.json()
-
-df_raw = pd.DataFrame(psj).T
-valid_pos = [['WR'], ['RB'], ['TE'], ['K'], ['DEF'], ['QB'], ['QB', 'TE']]
-df = df_raw[(df_raw['active']) & (df_raw['fantasy_positions'].isin(valid_pos))]
-df['full_name'] = df['first_name'] + ' ' + df['last_name']
-active_ids = df['player_id'].values
-
-proj_url = 'https://api.sleeper.com/projections/nfl/2024/2?season_type=regular&position[]=DEF&position[]=K&position[]=QB&position[]=RB&position[]=TE&position[]=WR&order_by=pts_ppr'
-proj_resp = requests.get(proj_url)
-prjs = proj_resp.json()
-projs = pd.DataFrame(prjs)
-projs['fantasy_position'] = projs['player'].apply(lambda x: x['fantasy_positions'][0] if 'fantasy_positions' in x else None)
-projs['first_name'] = projs['player'].apply(lambda x: x['first_name'] if 'first_name' in x else None)
-projs['last_name'] = projs['player'].apply(lambda x: x['last_name'] if 'last_name' in x else None)
-projs['full_name'] = projs['first_name'] + ' ' + projs['last_name']
-
-stats_url = 'https://api.sleeper.com/stats/nfl/2024/1?season_type=regular&position[]=DEF&position[]=K&position[]=QB&position[]=RB&position[]=TE&position[]=WR&order_by=pts_ppr'
-stats_resp = requests.get(stats_url)
-srjs = stats_resp.json()
-stats = pd.DataFrame(srjs)
-stats['fantasy_position'] = stats['player'].apply(lambda x: x['fantasy_positions'][0] if 'fantasy_positions' in x else None)
-stats['first_name'] = stats['player'].apply(lambda x: x['first_name'] if 'first_name' in x else None)
-stats['last_name'] = stats['player'].apply(lambda x: x['last_name'] if 'last_name' in x else None)
-stats['full_name'] = stats['first_name'] + ' ' + stats['last_name']
-
-all_rostered_ids = [key.strip('"').strip("'") for roster in agent_rosters for key in agent_rosters[roster]]
-
-fa_stats, fa_proj = get_free_agents(all_rostered_ids, stats, projs, active_ids)
-fa_pos_proj, fa_pos_stats = get_position_data(fa_stats, fa_proj)
-
-timestamp = dt.datetime.now().strftime('%Y%m%d_%H%M%S')
-
-for agent, model in AGENTS_MODELS.items():
-    print(f"Agent {agent}'s turn")
-
-    # 1. general roster evaluation
-    roster_evaluation = evaluate_roster(agent_rosters[agent], projs, stats)
-    print(roster_evaluation)
-    # 2. set lineup
-    lineup_recommendation = recommend_lineup(agent, model, key, agent_rosters[agent], projs, stats, week=2)
-        
-    print(lineup_recommendation)
-    # 3. collect free agents
-    fa_evaluation = {}
-    for position in ['QB', 'RB', 'WR', 'TE', 'K', 'DEF']:
-        sourced_fas = source_free_agents(agent, model, key, position, fa_pos_stats, fa_pos_proj)
-        fa_evaluation[position] = evaluate_free_agents(agent, model, key, sourced_fas, position, projs, stats)
-        print(fa_evaluation[position])
-    # 4. add/drop
-    for position, evaluation in fa_evaluation.items():
-        recommendation = optimize_roster(agent, model, key, agent_rosters[agent], roster_evaluation, evaluation)
-        print(recommendation)
-        # if recommendation['faab_bid'] > 0:
-            # Attempt to execute the transaction
-            # result = execute_transaction(recommendation['add_player'], recommendation['drop_player'], recommendation['faab_bid'])
-            # if result['status'] == 'success':
-            #     update_roster(rosters[agent], recommendation['add_player'], recommendation['drop_player'])
-
-    # trading
-    for other_agent in agents:
-        if other_agent != agent:
-            trade_proposal = generate_trade_proposal(agent, model, key, agent_rosters[agent], other_agent, agent_rosters[other_agent], projs, stats)
-            trade_evaluation = evaluate_trade_proposal(other_agent, AGENTS_MODELS[other_agent], key, agent_rosters[other_agent], agent, agent_rosters[agent], trade_proposal, projs, stats)
-            print(trade_proposal)
-            print(trade_evaluation)
+async def run_agent_pipeline(agent, model, agent_rosters, fa_evaluation, store, week=2, llm_cache=None, trade_candidates=(), lineup_llm=LINEUP_LLM):
+    """
+    Run one agent's weekly roster actions as a dependency graph of LLM calls.
+
+    Roster evaluation, lineup and every trade proposal (one per candidate
+    this agent proposes) start immediately. fa_evaluation maps each position
+    to the shared task evaluating its free agents. Each add/drop
+    recommendation waits only on the roster evaluation and its own
+    position's FA evaluation, and each trade evaluation waits only on its
+    own proposal.
+    """
+    roster = agent_rosters[agent]
+    roster_evaluation = asyncio.create_task(asyncio.to_thread(evaluate_roster, roster, store, cache=llm_cache))
+    lineup_recommendation = asyncio.create_task(asyncio.to_thread(recommend_lineup, agent, model, key, roster, store, week=week, cache=llm_cache, llm=lineup_llm))
+
+    async def add_drop(position):
+        evaluation = await fa_evaluation[position]
+        return await asyncio.to_thread(optimize_roster, agent, model, key, roster, await roster_evaluation, evaluation, cache=llm_cache)
+
+    async def trade(candidate):
+        other_agent = candidate['partner']
+        trade_proposal = await asyncio.to_thread(generate_trade_proposal, agent, model, key, roster, other_agent, agent_rosters[other_agent], store, cache=llm_cache, candidate=candidate)
+        trade_evaluation = await asyncio.to_thread(evaluate_trade_proposal, other_agent, AGENTS_MODELS[other_agent], key, agent_rosters[other_agent], agent, roster, trade_proposal, store, cache=llm_cache)
+        return {'candidate': candidate, 'proposal': trade_proposal, 'evaluation': trade_evaluation}
+
+    other_agents = [candidate['partner'] for candidate in trade_candidates]
+    recommendations, trades = await asyncio.gather(
+        asyncio.gather(*[add_drop(position) for position in POSITIONS]),
+        asyncio.gather(*[trade(candidate) for candidate in trade_candidates]),
+    )
+    return {
+        'roster_evaluation': await roster_evaluation,
+        'lineup_recommendation': await lineup_recommendation,
+        'fa_evaluation': {position: await task for position, task in fa_evaluation.items()},
+        'recommendations': dict(zip(POSITIONS, recommendations)),
+        'trades': dict(zip(other_agents, trades)),
+    }
+
+def run_weekly_pipeline(agent_rosters, fa_pos_stats, fa_pos_proj, store, week=2, llm_cache=None, max_workers=MAX_CONCURRENT_REQUESTS, trades_per_agent=TRADES_PER_AGENT, lineup_llm=LINEUP_LLM):
+    """
+    Run every agent's roster actions concurrently and return {agent: results}.
+
+    The blocking LLM helpers run on a thread pool and share the pooled
+    LLM client, so a weekly run takes roughly as long as the longest chain
+    (FA evaluation -> add/drop, or trade proposal -> trade evaluation).
+    Free agent sourcing does not depend on the agent, so it is done once
+    (FreeAgentIndex), and so is each model's evaluation of every position's
+    free agents.
+    Trade partners are not asked for every pair of agents: every one-for-one
+    swap in the league is scored locally and only the best trades_per_agent
+    per agent go to the LLM.
+    Lineups come from the exact solver; lineup_llm says when the LLM is also asked (see recommend_lineup).
+    Pass an LLMCache as llm_cache to replay identical prompts from it.
+    """
+    with span('frame.free_agent_index'):
+        sourced_fas = FreeAgentIndex(fa_pos_stats, fa_pos_proj).candidates
+    with span('trade.find_trades') as attrs:
+        trade_candidates = find_trades(agent_rosters, store, per_agent=trades_per_agent)
+        attrs['candidates'] = len(trade_candidates)
+
+    async def run():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max_workers))
+        fa_evaluations = {
+            (model, position): asyncio.create_task(asyncio.to_thread(evaluate_free_agents, None, model, key, sourced_fas[position], position, store, cache=llm_cache))
+            for model in set(AGENTS_MODELS.values())
+            for position in POSITIONS
+        }
+        results = await asyncio.gather(*[
+            run_agent_pipeline(agent, model, agent_rosters, {position: fa_evaluations[(model, position)] for position in POSITIONS}, store, week=week, llm_cache=llm_cache, lineup_llm=lineup_llm,
+                               trade_candidates=[c for c in trade_candidates if c['proposer'] == agent])
+            for agent, model in AGENTS_MODELS.items()
+        ])
+        return dict(zip(AGENTS_MODELS.keys(), results))
+
+    return asyncio.run(run())
+
+def run_roster_actions(llm_cache=None, lineup_llm=LINEUP_LLM, snapshots=None):
+    """
+    Load the league and this week's Sleeper data, then run every agent's roster actions.
+
+    League, players, projections and stats come from a SnapshotStore, so a
+    run only hits the network for snapshots older than its staleness policy.
+    """
+    snapshots = snapshots or SnapshotStore()
+    league_detail = snapshots.league(league_id, lambda: get_league_detail(league_id, HEADERS))
+    rosters, rosters_rid = get_rosters(league_detail)
+
+    agent_rosters = {agents[i]: rosters_rid[i+1] for i in range(len(agents))}
+
+    players = snapshots.players()
+    valid_pos = ['WR', 'RB', 'TE', 'K', 'DEF', 'QB', 'QB,TE']
+    active_ids = players.loc[players['active'] & players['fantasy_positions'].isin(valid_pos), 'player_id'].to_numpy()
+
+    projs = snapshots.projections(2024, 2)
+    stats = snapshots.stats(2024, 1)
+
+    all_rostered_ids = [key.strip('"').strip("'") for roster in agent_rosters for key in agent_rosters[roster]]
+
+    store = PlayerStore(projs, stats)
+    fa_stats, fa_proj = get_free_agents(all_rostered_ids, stats, projs, active_ids)
+    fa_pos_proj, fa_pos_stats = get_position_data(fa_stats, fa_proj)
+
+    get_client(key, max_concurrency=MAX_CONCURRENT_REQUESTS)
+    return run_weekly_pipeline(agent_rosters, fa_pos_stats, fa_pos_proj, store, week=2, llm_cache=llm_cache, lineup_llm=lineup_llm)
+
+def main():
+    parser = argparse.ArgumentParser(description='Have every agent evaluate its roster, lineup, free agents and trades.')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None, help='reuse LLM responses from an on-disk cache')
+    parser.add_argument('--lineup-llm', choices=['never', 'ties', 'always'], default=LINEUP_LLM, help='when to ask the LLM about the solved lineup')
+    parser.add_argument('--snapshot-dir', default=DEFAULT_SNAPSHOT_DIR, help='where Sleeper league/player/projection/stats snapshots are kept')
+    parser.add_argument('--offline', action='store_true', help='only use existing snapshots, never fetch')
+    args = parser.parse_args()
+    llm_cache = LLMCache(args.cache) if args.cache else None
+    snapshots = SnapshotStore(args.snapshot_dir, offline=args.offline)
+
+    timestamp = dt.datetime.now().strftime('%Y%m%d_%H%M%S')
+    tracer = Tracer()
+    with use_tracer(tracer):
+        results = run_roster_actions(llm_cache, lineup_llm=args.lineup_llm, snapshots=snapshots)
+
+    for agent, agent_results in results.items():
+        print(f"Agent {agent}'s turn")
+        print(agent_results['roster_evaluation'])
+        print(agent_results['lineup_recommendation'])
+        for position in POSITIONS:
+            print(agent_results['fa_evaluation'][position])
+        for position in POSITIONS:
+            print(agent_results['recommendations'][position])
+            # if recommendation['faab_bid'] > 0:
+                # Attempt to execute the transaction
+                # result = execute_transaction(recommendation['add_player'], recommendation['drop_player'], recommendation['faab_bid'])
+                # if result['status'] == 'success':
+                #     update_roster(rosters[agent], recommendation['add_player'], recommendation['drop_player'])
+        for other_agent, trade in agent_results['trades'].items():
+            print(trade['proposal'])
+            print(trade['evaluation'])
             # if trade_evaluation['decision'] == 'accept':
-            #     execute_trade(agent, other_agent, trade_proposal)
\ No newline at end of file
+            #     execute_trade(agent, other_agent, trade_proposal)
+
+    if llm_cache is not None:
+        print(f"LLM cache: {llm_cache.stats()}")
+    print(f"Time by span: {json.dumps(tracer.summary(), indent=2)}")
+
+    os.makedirs('out', exist_ok=True)
+    with open(os.path.join('out', f'roster_actions_{timestamp}.json'), 'w') as f:
+        json.dump(results, f, indent=2)
+    tracer.export('out', prefix=f'roster_actions_{timestamp}.trace')
+
+if __name__ == '__main__':
+    main()
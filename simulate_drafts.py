@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from dotenv import load_dotenv
+
+from draft_script_aci import DraftSession, default_table_path, load_config
+from draft_table import load_player_table
+from llm_cache import LLMCache, DEFAULT_CACHE_PATH
+
+load_dotenv()
+
+# each worker process loads the player table once and reuses it for every draft it runs
+_worker_df = None
+_worker_outlooks = None
+_worker_cache = None
+
+
+def _init_worker(table_path, cache_path=None):
+    global _worker_df, _worker_outlooks, _worker_cache
+    # each worker loads the table itself (memory-mapped when binary, see draft_table.read_table)
+    _worker_df, _worker_outlooks = load_player_table(table_path)
+    # workers share the on-disk layer of the cache; each keeps its own memory LRU
+    _worker_cache = LLMCache(cache_path) if cache_path else None
+
+
+def run_draft(spec):
+    """
+    Run one independent draft inside a worker process and return its summary.
+    """
+    session = DraftSession(
+        _worker_df,
+        agents_models=spec['models'],
+        key=os.getenv('OPENROUTER_API_KEY'),
+        draft_id=spec['draft_id'],
+        output_root=spec['output_root'],
+        seed=spec['seed'],
+        llm_cache=_worker_cache,
+        outlooks=_worker_outlooks,
+        speculative=spec.get('speculative', 0),
+        debug_level=-1,
+    )
+    try:
+        summary = session.run(resume=spec.get('resume', False))
+    except Exception as e:
+        summary = session.summary()
+        summary['error'] = repr(e)
+    summary['config'] = spec['config']
+    return summary
+
+
+def build_specs(configs, n_drafts, run_id, base_seed=0, output_root='out', speculative=0, resume=False):
+    """
+    Spread n_drafts over the given configs round-robin, one seed per draft.
+
+    :param configs: list of (config_path, config_dict) pairs
+    """
+    specs = []
+    for i in range(n_drafts):
+        config_path, config = configs[i % len(configs)]
+        specs.append({
+            'draft_id': f'{run_id}_{i:04d}',
+            'config': config_path,
+            'models': config['models'],
+            'seed': base_seed + i,
+            'output_root': output_root,
+            'speculative': speculative,
+            'resume': resume,
+        })
+    return specs
+
+
+def aggregate(summaries):
+    by_model = defaultdict(list)
+    by_config = defaultdict(list)
+    for summary in summaries:
+        if 'error' in summary:
+            continue
+        by_config[summary['config']].append(summary['duration'])
+        for team in summary['teams'].values():
+            by_model[team['model']].append(team['total_proj'])
+
+    return {
+        'drafts': len(summaries),
+        'failed': [s['draft_id'] for s in summaries if 'error' in s],
+        'models': {
+            model: {'teams': len(totals), 'mean_total_proj': float(np.mean(totals)), 'std_total_proj': float(np.std(totals))}
+            for model, totals in by_model.items()
+        },
+        'configs': {
+            config: {'drafts': len(durations), 'mean_duration': float(np.mean(durations))}
+            for config, durations in by_config.items()
+        },
+    }
+
+
+def run_drafts(specs, table_path='initialdraftdf.csv', max_workers=None, cache_path=None):
+    summaries = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(table_path, cache_path)) as pool:
+        futures = {pool.submit(run_draft, spec): spec['draft_id'] for spec in specs}
+        for future in as_completed(futures):
+            summary = future.result()
+            status = f"failed: {summary['error']}" if 'error' in summary else f"{summary['picks_made']} picks in {summary['duration']:.1f}s"
+            print(f"Draft {futures[future]} {status}")
+            summaries.append(summary)
+    return sorted(summaries, key=lambda s: s['draft_id'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run many independent simulated drafts across a process pool.')
+    parser.add_argument('-n', '--n-drafts', type=int, default=10)
+    parser.add_argument('-w', '--workers', type=int, default=None)
+    parser.add_argument('-c', '--config', action='append', help='config file(s); drafts alternate between them for A/B tests')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--table', default=default_table_path(), help='binary draft table directory or CSV')
+    parser.add_argument('--output-root', default='out')
+    parser.add_argument('--speculative', type=int, nargs='?', const=3, default=0, metavar='LOOKAHEAD', help='pipeline picks with the next LOOKAHEAD agents (see DraftSession.run_speculative)')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None, help='share an on-disk LLM response cache between drafts')
+    parser.add_argument('--resume', default=None, metavar='RUN_ID', help='finish the drafts of an interrupted run from their event logs')
+    args = parser.parse_args()
+
+    config_paths = args.config or ['config.json']
+    configs = [(path, load_config(path)) for path in config_paths]
+    run_id = args.resume or f'sim_{int(time.time())}'
+
+    specs = build_specs(configs, args.n_drafts, run_id, base_seed=args.seed, output_root=args.output_root, speculative=args.speculative, resume=bool(args.resume))
+    summaries = run_drafts(specs, table_path=args.table, max_workers=args.workers, cache_path=args.cache)
+
+    summary_path = os.path.join(args.output_root, f'{run_id}_summary.json')
+    with open(summary_path, 'w') as f:
+        json.dump({'run_id': run_id, 'aggregate': aggregate(summaries), 'drafts': summaries}, f, indent=2)
+    print(f"Wrote aggregate summary to {summary_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+POSITIONS = ['QB', 'RB', 'WR', 'TE', 'K', 'DEF']
+ID_COLUMNS = ['player_id', 'fantasy_position', 'first_name', 'last_name', 'full_name', 'team']
+
+
+def flatten_stats_payload(payload):
+    """
+    Flatten a Sleeper stats/projections payload into one typed columnar table.
+
+    The payload is a list of {"player_id", "player": {...}, "stats": {...}}
+    records. A single pass pulls the identity fields out of the nested player
+    dict and gathers every stat as (row, value) pairs, which are then
+    scattered into float32 columns (NaN where a player has no value), so
+    nothing downstream needs .apply or json_normalize.
+    """
+    n = len(payload)
+    player_ids = [None] * n
+    positions = [None] * n
+    first_names = [None] * n
+    last_names = [None] * n
+    teams = [None] * n
+    stat_rows = {}
+    stat_values = {}
+
+    for i, record in enumerate(payload):
+        player = record.get('player') or {}
+        player_ids[i] = str(record.get('player_id'))
+        fantasy_positions = player.get('fantasy_positions')
+        positions[i] = fantasy_positions[0] if fantasy_positions else None
+        first_names[i] = player.get('first_name')
+        last_names[i] = player.get('last_name')
+        teams[i] = record.get('team') or player.get('team')
+        for stat, value in (record.get('stats') or {}).items():
+            if isinstance(value, (int, float)):
+                rows = stat_rows.get(stat)
+                if rows is None:
+                    rows = stat_rows[stat] = []
+                    stat_values[stat] = []
+                rows.append(i)
+                stat_values[stat].append(value)
+
+    stat_columns = {}
+    for stat, rows in stat_rows.items():
+        column = stat_columns[stat] = np.full(n, np.nan, dtype=np.float32)
+        column[rows] = stat_values[stat]
+
+    table = pd.DataFrame({
+        'player_id': pd.array(player_ids, dtype='string'),
+        'fantasy_position': pd.Categorical(positions, categories=POSITIONS),
+        'first_name': pd.array(first_names, dtype='string'),
+        'last_name': pd.array(last_names, dtype='string'),
+        'team': pd.Categorical(teams),
+    })
+    table['full_name'] = table['first_name'] + ' ' + table['last_name']
+    stats = pd.DataFrame(stat_columns, index=table.index)
+    return pd.concat([table[ID_COLUMNS], stats], axis=1)
+
+
+def stat_columns(table):
+    return [column for column in table.columns if column not in ID_COLUMNS]
+
+
+PLAYER_COLUMNS = ['player_id', 'first_name', 'last_name', 'full_name', 'position', 'fantasy_positions', 'team', 'active', 'injury_status']
+
+
+def flatten_players_payload(payload):
+    """
+    Flatten the Sleeper players dump ({player_id: {...}}) into a typed table
+    of the fields the scripts use.
+
+    fantasy_positions is kept as one comma-joined string (e.g. 'QB,TE') so
+    the table stays columnar; active is a plain bool column.
+    """
+    n = len(payload)
+    player_ids = [None] * n
+    first_names = [None] * n
+    last_names = [None] * n
+    positions = [None] * n
+    fantasy_positions = [None] * n
+    teams = [None] * n
+    active = np.zeros(n, dtype=bool)
+    injury_statuses = [None] * n
+
+    for i, (pid, player) in enumerate(payload.items()):
+        player_ids[i] = str(player.get('player_id') or pid)
+        first_names[i] = player.get('first_name')
+        last_names[i] = player.get('last_name')
+        positions[i] = player.get('position')
+        fantasy_positions[i] = ','.join(player.get('fantasy_positions') or []) or None
+        teams[i] = player.get('team')
+        active[i] = bool(player.get('active'))
+        injury_statuses[i] = player.get('injury_status')
+
+    table = pd.DataFrame({
+        'player_id': pd.array(player_ids, dtype='string'),
+        'first_name': pd.array(first_names, dtype='string'),
+        'last_name': pd.array(last_names, dtype='string'),
+        'position': pd.Categorical(positions),
+        'fantasy_positions': pd.array(fantasy_positions, dtype='string'),
+        'team': pd.Categorical(teams),
+        'active': active,
+        'injury_status': pd.array(injury_statuses, dtype='string'),
+    })
+    table['full_name'] = table['first_name'] + ' ' + table['last_name']
+    return table[PLAYER_COLUMNS]
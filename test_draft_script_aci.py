@@ -0,0 +1,37 @@
+import pytest
+
+import draft_script_aci
+from draft_script_aci import DraftSession, get_availability, load_config
+from draft_table import load_player_table
+
+
+@pytest.fixture(scope='module')
+def session(tmp_path_factory):
+    df, outlooks = load_player_table('initialdraftdf.csv')
+    return DraftSession(df, load_config('config.json')['models'], None, 'test', outlooks=outlooks,
+                        output_root=str(tmp_path_factory.mktemp('out')), seed=1, debug_level=-1)
+
+
+@pytest.mark.parametrize('agent, pick_number, expected', [
+    # a picks 1, 24, 25: nobody else picks between 24 and 25
+    ('a', 1, {24: 22, 25: 22}),
+    # b picks 2, 23, 26: a's 24 and 25 are the only picks between 23 and 26
+    ('b', 2, {23: 20, 26: 22}),
+])
+def test_availability_counts_only_opponent_picks(session, monkeypatch, agent, pick_number, expected):
+    calls = []
+    availability = draft_script_aci.AvailabilitySimulator.availability
+
+    def spy(simulator, picks_before):
+        calls.append(list(picks_before))
+        return availability(simulator, picks_before)
+
+    monkeypatch.setattr(draft_script_aci.AvailabilitySimulator, 'availability', spy)
+    players = get_availability(session.state, agent, pick_number, n=5)
+    assert calls == [list(expected.values())]
+    first, second = expected.values()
+    for player in players:
+        assert list(player['chance_available']) == [f'pick {pick}' for pick in expected]
+        chances = list(player['chance_available'].values())
+        # back to back picks: a player there for the first is still there for the second
+        assert chances[0] == chances[1] if first == second else chances[0] >= chances[1]
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import llm_client
+from draft_log import read_events
+from draft_script_aci import ROSTER_SIZE, DraftSession, load_config
+from draft_sync import DraftSync
+from draft_table import load_player_table
+
+DRAFT_ID = 'live'
+
+
+class MockDraft:
+    """
+    Local stand-in for Sleeper's /draft/<id>/picks endpoint.
+
+    Answers with an ETag and a 304 when the client already has the current
+    picks. Whenever a human (any agent not in ours) is on the clock, the
+    next request first has them take the best available player by ADP.
+    """
+
+    def __init__(self, agents, ours, adp_order):
+        self.snake = agents + agents[::-1]
+        self.agents = agents
+        self.ours = set(ours)
+        self.adp_order = adp_order
+        self.picks = []
+        self.requests = []
+        self.lock = threading.Lock()
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with mock.lock:
+                    mock.fill_human_picks()
+                    mock.requests.append(self.headers.get('If-None-Match'))
+                    etag = f'"{len(mock.picks)}"'
+                    body = json.dumps(mock.picks).encode()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def agent_for_pick(self, pick_number):
+        return self.snake[(pick_number - 1) % len(self.snake)]
+
+    def add_pick(self, player_id):
+        pick_number = len(self.picks) + 1
+        slot = self.agents.index(self.agent_for_pick(pick_number)) + 1
+        self.picks.append({'pick_no': pick_number, 'player_id': player_id, 'draft_slot': slot,
+                           'round': (pick_number - 1) // len(self.agents) + 1})
+
+    def fill_human_picks(self, total=None):
+        total = len(self.agents) * ROSTER_SIZE if total is None else total
+        taken = {pick['player_id'] for pick in self.picks}
+        while len(self.picks) < total and self.agent_for_pick(len(self.picks) + 1) not in self.ours:
+            player_id = next(pid for pid in self.adp_order if pid not in taken)
+            taken.add(player_id)
+            self.add_pick(player_id)
+
+    def submit(self, player_id, pick_number, agent, thoughts):
+        with self.lock:
+            assert self.agent_for_pick(pick_number) == agent and len(self.picks) == pick_number - 1
+            self.add_pick(player_id)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture(scope='module')
+def table():
+    return load_player_table('initialdraftdf.csv')
+
+
+@pytest.fixture
+def stub_llm():
+    llm_client.set_backend('stub')
+    yield
+    llm_client.set_backend(os.getenv('LLM_BACKEND', 'openrouter'))
+
+
+def make_session(table, tmp_path):
+    df, outlooks = table
+    return DraftSession(df, load_config('config.json')['models'], None, DRAFT_ID, output_root=str(tmp_path),
+                        outlooks=outlooks, seed=1, debug_level=-1)
+
+
+def make_mock(session, ours=()):
+    adp_order = session.board.df.sort_values('adp', kind='stable')['player_id'].astype(str).tolist()
+    return MockDraft(session.agents, ours, adp_order)
+
+
+def test_poll_uses_conditional_requests(table, tmp_path):
+    session = make_session(table, tmp_path)
+    mock = make_mock(session)
+    try:
+        sync = DraftSync(session, [], mock.submit, base_url=mock.base_url)
+        picks = sync.poll()
+        # nothing changed since the first poll
+        assert sync.poll() is None
+    finally:
+        mock.close()
+    assert len(picks) == session.total_picks
+    assert mock.requests == [None, f'"{len(picks)}"']
+    assert sync.stats['not_modified'] == 1
+
+
+def test_apply_records_only_new_picks(table, tmp_path):
+    session = make_session(table, tmp_path)
+    session.open_log()
+    mock = make_mock(session)
+    mock.fill_human_picks(total=5)
+    sync = DraftSync(session, [], mock.submit, base_url=mock.base_url)
+    try:
+        assert sync.apply(mock.picks[:3], 1) == 4
+        # the feed always holds the whole draft; picks already applied are skipped
+        assert sync.apply(mock.picks, 4) == 6
+        assert sync.apply(mock.picks, 6) == 6
+    finally:
+        session.log.close()
+        mock.close()
+    assert session.drafted_pids == [pick['player_id'] for pick in mock.picks]
+    events = read_events(os.path.join(session.output_dir, 'events.jsonl'))
+    assert [e['pick'] for e in events if e['event'] == 'pick'] == [1, 2, 3, 4, 5]
+    assert all(e['external'] for e in events if e['event'] == 'pick')
+
+
+def test_rejects_draft_slot_mismatch(table, tmp_path):
+    session = make_session(table, tmp_path)
+    mock = make_mock(session)
+    mock.fill_human_picks(total=2)
+    mock.picks[1]['draft_slot'] = 1
+    sync = DraftSync(session, [], mock.submit, base_url=mock.base_url)
+    try:
+        with pytest.raises(ValueError, match='draft slot'):
+            sync.apply(mock.picks, 1)
+    finally:
+        mock.close()
+    assert session.drafted_pids == [mock.picks[0]['player_id']]
+
+
+def test_follow_live_draft(table, tmp_path, stub_llm):
+    session = make_session(table, tmp_path)
+    mock = make_mock(session, ours=['a'])
+    sync = DraftSync(session, ['a'], mock.submit, base_url=mock.base_url, poll_interval=0.01)
+    try:
+        session.run(sync=sync)
+    finally:
+        mock.close()
+    assert session.drafted_pids == [pick['player_id'] for pick in mock.picks]
+    assert len(session.agent_rosters['a']) == ROSTER_SIZE
+    events = [e for e in read_events(os.path.join(session.output_dir, 'events.jsonl')) if e['event'] == 'pick']
+    # only our agent's picks carry its own decisions
+    assert {e['agent'] for e in events if not e['external']} == {'a'}
+    assert sum(not e['external'] for e in events) == ROSTER_SIZE
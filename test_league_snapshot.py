@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from draft_table import load_draft_table, load_text_column, read_table, write_draft_table, write_table
+from league_snapshot import SnapshotFetchError, SnapshotStore
+
+
+def test_table_round_trip(tmp_path):
+    df = pd.DataFrame({
+        'player_id': pd.array(['1', '2', None], dtype='string'),
+        'fantasy_position': pd.Categorical(['QB', None, 'WR'], categories=['QB', 'WR']),
+        'active': [True, False, True],
+        'pts_ppr': np.array([1.5, np.nan, 3.0], dtype=np.float32),
+        'rec/td': pd.array([1, None, 2], dtype='Int64'),
+    })
+    write_table(df, tmp_path / 'table')
+    table = read_table(tmp_path / 'table')
+    assert list(table.columns) == list(df.columns)
+    assert table['player_id'].isna().tolist() == [False, False, True]
+    assert table['fantasy_position'].tolist()[::2] == ['QB', 'WR'] and pd.isna(table['fantasy_position'][1])
+    assert table['active'].dtype == bool
+    assert table['pts_ppr'].dtype == np.float32
+    assert table['rec/td'].isna().tolist() == [False, True, False]
+
+
+def test_draft_table_uses_the_same_layout(tmp_path):
+    df = pd.DataFrame({
+        'fullName': ['A B', 'C D'],
+        'seasonOutlook': ['Good.', None],
+        'injury_status': pd.array([pd.NA, 'Out'], dtype='string'),
+        'adp': [1, 2],
+    })
+    write_draft_table(df, tmp_path / 'draft')
+    table = load_draft_table(tmp_path / 'draft')
+    assert list(table.columns) == ['fullName', 'injury_status', 'adp']
+    assert table['adp'].dtype == np.float64
+    outlooks = load_text_column(tmp_path / 'draft')
+    assert [outlooks[0], outlooks[1]] == ['Good.', None]
+    # a snapshot reader reads it too
+    assert read_table(tmp_path / 'draft')['injury_status'].tolist()[1] == 'Out'
+
+
+def test_graphql_errors_are_not_stored(tmp_path):
+    store = SnapshotStore(str(tmp_path), max_age={'league': 0})
+    league = {'data': {'league_rosters': [{'roster_id': 1}]}}
+    assert store.league('1', lambda: league) == league
+
+    errors = {'data': None, 'errors': [{'message': 'rate limited'}]}
+    # the last good revision is served instead
+    assert store.league('1', lambda: errors) == league
+    assert store.meta('league', '1')['revision'] == 1
+
+    with pytest.raises(SnapshotFetchError):
+        store.league('2', lambda: errors)
+    assert store.meta('league', '2') is None
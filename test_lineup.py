@@ -0,0 +1,38 @@
+import numpy as np
+
+from lineup import POSITION_INDEX, SLOTS, solve_lineup, solve_lineups
+
+
+class Store:
+    """
+    The PlayerStore interface solve_lineup uses, over a plain dict of records.
+    """
+
+    def __init__(self, players):
+        self.players = {pid: {'player_id': pid, 'full_name': name, 'position': pos, 'proj': {'pts_ppr': pts}}
+                        for pid, (name, pos, pts) in players.items()}
+
+    def get(self, player_id, default=-1):
+        return self.players.get(str(player_id), default)
+
+    def __contains__(self, player_id):
+        return str(player_id) in self.players
+
+
+def test_short_rosters_leave_slots_empty():
+    positions = np.full((2, 1), POSITION_INDEX['RB'])
+    values = np.array([[10.0], [4.0]])
+    points, starters = solve_lineups(positions, values)
+    assert points.tolist() == [10.0, 4.0]
+    assert (starters >= 0).sum(axis=1).tolist() == [1, 1]
+    assert starters.shape == (2, len(SLOTS))
+
+
+def test_unknown_players_are_reported():
+    store = Store({'1': ('Starter RB', 'RB', 12.0), '2': ('Backup RB', 'RB', 3.0), '3': ('Third RB', 'RB', 1.0)})
+    lineup = solve_lineup(['1', '2', '99', '3', "'98'"], store)
+    assert lineup['starters']['RB'] == ['Starter RB', 'Backup RB']
+    assert lineup['starters']['FLEX'] == ['Third RB']
+    assert lineup['bench'] == []
+    assert lineup['unscored'] == ['99', '98']
+    assert lineup['projected_points'] == 16.0
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm_cache import LLMCache
+from llm_client import AsyncLLMClient, LLMRequestError
+
+MODEL = 'test/model'
+MESSAGES = [{'role': 'user', 'content': 'Who should I draft?'}]
+
+
+class StubChat:
+    """
+    Local stand-in for the chat completions endpoint.
+
+    Answers every POST with a completion echoing the request number, except
+    that the first len(failures) requests get the (status, Retry-After)
+    responses listed in failures.
+    """
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.times = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with stub.lock:
+                    stub.times.append(time.monotonic())
+                    failure = stub.failures.pop(0) if stub.failures else None
+                    number = len(stub.times)
+                if failure is not None:
+                    status, retry_after = failure
+                    self.send_response(status)
+                    if retry_after is not None:
+                        self.send_header('Retry-After', retry_after)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = json.dumps({'choices': [{'message': {'role': 'assistant', 'content': f'reply {number}'}}]}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/chat/completions'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubChat()
+    yield server
+    server.close()
+
+
+def run_chats(url, n, cache=None, **options):
+    """
+    Send n identical requests concurrently from one client and return the responses and their traces.
+    """
+    async def main():
+        client = AsyncLLMClient('key', base_url=url, backoff=0.01, **options)
+        traces = [{} for _ in range(n)]
+        try:
+            responses = await asyncio.gather(*(client.chat(MODEL, MESSAGES, cache=cache, trace=t) for t in traces))
+        finally:
+            await client.close()
+        return responses, traces
+    return asyncio.run(main())
+
+
+def test_retries_honour_retry_after():
+    stub = StubChat(failures=[(429, '0.3'), (503, None)])
+    try:
+        start = time.monotonic()
+        (response,), (trace,) = run_chats(stub.url, 1)
+        elapsed = time.monotonic() - start
+    finally:
+        stub.close()
+    assert response['choices'][0]['message']['content'] == 'reply 3'
+    assert trace['attempts'] == 3
+    assert trace['status'] == 200
+    # the 429 asked for 0.3s before the next attempt
+    assert stub.times[1] - stub.times[0] >= 0.25
+    assert elapsed < 5
+
+
+def test_gives_up_after_max_retries():
+    stub = StubChat(failures=[(503, None)] * 5)
+    try:
+        with pytest.raises(LLMRequestError):
+            run_chats(stub.url, 1, max_retries=3)
+    finally:
+        stub.close()
+    assert len(stub.times) == 3
+
+
+def test_client_errors_are_not_retried():
+    stub = StubChat(failures=[(400, None)])
+    try:
+        with pytest.raises(LLMRequestError):
+            run_chats(stub.url, 1)
+    finally:
+        stub.close()
+    assert len(stub.times) == 1
+
+
+def test_rate_limit_paces_requests(stub):
+    # 300 requests per minute: a burst of 5, then one request every 0.2s
+    run_chats(stub.url, 8, rate_limits={MODEL: 300})
+    assert len(stub.times) == 8
+    assert stub.times[4] - stub.times[0] < 0.15
+    assert stub.times[-1] - stub.times[0] >= 0.5
+
+
+def test_cache_serves_copies(stub, tmp_path):
+    cache = LLMCache(str(tmp_path / 'responses.sqlite'))
+    (first,), (first_trace,) = run_chats(stub.url, 1, cache=cache)
+    first['choices'][0]['message']['content'] = 'changed by the caller'
+
+    (second,), (second_trace,) = run_chats(stub.url, 1, cache=cache)
+    assert first_trace['cache'] == 'miss'
+    assert second_trace['cache'] == 'hit'
+    assert len(stub.times) == 1
+    assert second['choices'][0]['message']['content'] == 'reply 1'
+
+    # a hit from the memory layer is a copy too
+    second['choices'][0]['message']['content'] = 'changed again'
+    (third,), _ = run_chats(stub.url, 1, cache=cache)
+    assert third['choices'][0]['message']['content'] == 'reply 1'
+    assert cache.stats()['memory_hits'] == 2
+    cache.close()
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from create_initial_draft import merge_players
+from name_resolver import NAME_MARGIN, NameIndex
+
+NAMES = ['Mike Williams', 'Mike Williams', 'Josh Allen', 'Josh Allan', 'DJ Moore', 'Travis Kelce']
+
+
+def test_margin_leaves_ambiguous_names_unresolved():
+    index = NameIndex(NAMES)
+    queries = ['mike williams', 'Josh Alln', 'D.J. Moore', 'Travis Kelcee']
+    # the same name twice, and a typo equally close to two players
+    expected = [None, None, 'DJ Moore', 'Travis Kelce']
+    assert [index.match(q, margin=NAME_MARGIN) for q in queries] == expected
+    assert index.match_many(queries, margin=NAME_MARGIN) == expected
+    # without a margin the first candidate wins, as before
+    assert index.match_many(queries)[:2] == ['Mike Williams', 'Josh Allen']
+
+
+def test_merge_players_skips_ambiguous_names():
+    ddf = pd.DataFrame({'fullName': NAMES, 'player_id': [str(i) for i in range(len(NAMES))]})
+    epdf = pd.DataFrame({'fullName': ['Mike Williams', 'D.J. Moore', 'Someone Else'], 'seasonOutlook': ['a', 'b', 'c']})
+    merged = merge_players(epdf, ddf)
+    # one row per ESPN player, and a namesake is not joined by name
+    assert merged['fullName'].tolist() == ['Mike Williams', 'DJ Moore', 'Someone Else']
+    assert merged['player_id'].isna().tolist() == [True, False, True]
+    assert merged['player_id'][1] == '4'
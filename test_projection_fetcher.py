@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from projection_fetcher import ProjectionFetcher
+
+
+class StubSleeper:
+    """
+    Local stand-in for the Sleeper projections endpoint.
+
+    Serves /projections/nfl/player/<pid> with a small weekly payload, counts
+    requests per player and answers the first failures[pid] requests for a
+    player with a 503.
+    """
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.requests = Counter()
+        self.times = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                pid = self.path.split('?')[0].rstrip('/').split('/')[-1]
+                stub.requests[pid] += 1
+                stub.times.append(time.monotonic())
+                if stub.failures.get(pid, 0) > 0:
+                    stub.failures[pid] -= 1
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = json.dumps({'1': {'stats': {'pts_ppr': float(pid), 'adp_dd_ppr': 1.0}}}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubSleeper()
+    yield server
+    server.close()
+
+
+def make_fetcher(base_url, tmp_path, **options):
+    options = {'workers': 4, 'backoff': 0.01, 'checkpoint_path': str(tmp_path / 'checkpoint.jsonl'), **options}
+    return ProjectionFetcher(base_url=base_url, **options)
+
+
+def test_fetch_all(stub, tmp_path):
+    pids = ['101', '102', '103', '101']
+    done, failed, changed = make_fetcher(stub.base_url, tmp_path).fetch_all(pids)
+    assert failed == {}
+    assert set(done) == {'101', '102', '103'}
+    assert done['102']['1']['stats']['pts_ppr'] == 102.0
+    # duplicate ids are fetched once
+    assert stub.requests['101'] == 1
+    assert changed == {'101', '102', '103'}
+
+
+def test_rate_limit_paces_requests(stub, tmp_path):
+    # 600 requests per minute with a burst of one: at most one request per 0.1s
+    fetcher = make_fetcher(stub.base_url, tmp_path, requests_per_minute=600, workers=8)
+    fetcher.fetch_all([str(pid) for pid in range(200, 206)])
+    gaps = [b - a for a, b in zip(stub.times, stub.times[1:])]
+    assert len(stub.times) == 6
+    assert stub.times[-1] - stub.times[0] >= 0.45
+    assert min(gaps) >= 0.05
+
+
+def test_retries_transient_errors(tmp_path):
+    stub = StubSleeper(failures={'301': 2})
+    try:
+        done, failed, _ = make_fetcher(stub.base_url, tmp_path, max_retries=3).fetch_all(['301'])
+    finally:
+        stub.close()
+    assert failed == {}
+    assert done['301']['1']['stats']['pts_ppr'] == 301.0
+    assert stub.requests['301'] == 3
+
+
+def test_gives_up_after_max_retries(tmp_path):
+    stub = StubSleeper(failures={'302': 10})
+    try:
+        done, failed, _ = make_fetcher(stub.base_url, tmp_path, max_retries=3).fetch_all(['302', '303'])
+    finally:
+        stub.close()
+    assert set(done) == {'303'}
+    assert set(failed) == {'302'}
+    assert stub.requests['302'] == 3
+
+
+def test_resumes_from_checkpoint(tmp_path):
+    stub = StubSleeper(failures={'403': 3})
+    try:
+        # 403 fails every attempt of the first run, so the checkpoint is kept
+        _, failed, _ = make_fetcher(stub.base_url, tmp_path, max_retries=3).fetch_all(['401', '402', '403'])
+        assert set(failed) == {'403'}
+        # a crash mid-write leaves a partial last line behind
+        with open(tmp_path / 'checkpoint.jsonl', 'a') as f:
+            f.write('{"player_id": "403", "proj')
+
+        done, failed, _ = make_fetcher(stub.base_url, tmp_path).fetch_all(['401', '402', '403'])
+    finally:
+        stub.close()
+    assert failed == {}
+    assert set(done) == {'401', '402', '403'}
+    # only the player missing from the checkpoint is requested again
+    assert stub.requests == Counter({'401': 1, '402': 1, '403': 4})
+    # a finished run leaves no checkpoint behind
+    assert not (tmp_path / 'checkpoint.jsonl').exists()
+
+
+def test_fresh_fetch_after_completed_run(stub, tmp_path):
+    make_fetcher(stub.base_url, tmp_path).fetch_all(['501', '502'])
+    done, failed, _ = make_fetcher(stub.base_url, tmp_path).fetch_all(['501', '502'])
+    assert failed == {}
+    assert set(done) == {'501', '502'}
+    assert stub.requests == Counter({'501': 2, '502': 2})
@@ -0,0 +1,143 @@
+import contextlib
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+
+class Tracer:
+    """
+    Collects timed spans (LLM calls, tool commands, Sleeper requests, DataFrame helpers).
+
+    Spans nest per thread: a span opened while another is open on the same
+    thread records it as its parent. Each span carries free-form attributes
+    (model, tokens, retries, payload sizes, ...) that the traced code fills in.
+    Spans are exported as JSONL (one span per line) and in the Chrome trace
+    event format, which chrome://tracing and Perfetto open directly.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.origin = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        stack = self._local.__dict__.setdefault('stack', [])
+        record = {
+            'id': next(self._ids),
+            'parent': stack[-1]['id'] if stack else None,
+            'name': name,
+            'thread': threading.get_ident(),
+            'attrs': attrs,
+        }
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs['error'] = repr(e)
+            raise
+        finally:
+            record['start_ms'] = (start - self.origin) * 1000
+            record['duration_ms'] = (time.perf_counter() - start) * 1000
+            stack.pop()
+            with self._lock:
+                self.spans.append(record)
+
+    def summary(self):
+        """
+        Per span name: count, total seconds and latency percentiles.
+        """
+        by_name = {}
+        for span in self.spans:
+            by_name.setdefault(span['name'], []).append(span['duration_ms'])
+        return {
+            name: {
+                'count': len(durations),
+                'total_s': round(sum(durations) / 1000, 4),
+                'p50_ms': round(float(np.percentile(durations, 50)), 3),
+                'p99_ms': round(float(np.percentile(durations, 99)), 3),
+            }
+            for name, durations in sorted(by_name.items(), key=lambda item: -sum(item[1]))
+        }
+
+    def export_jsonl(self, path):
+        with open(path, 'w') as f:
+            for span in sorted(self.spans, key=lambda s: s['start_ms']):
+                f.write(json.dumps(span, default=str) + '\n')
+
+    def export_chrome(self, path):
+        events = [
+            {
+                'name': span['name'],
+                'ph': 'X',
+                'ts': round(span['start_ms'] * 1000, 1),
+                'dur': round(span['duration_ms'] * 1000, 1),
+                'pid': os.getpid(),
+                'tid': span['thread'],
+                'args': span['attrs'],
+            }
+            for span in self.spans
+        ]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+
+    def export(self, directory, prefix='trace'):
+        os.makedirs(directory, exist_ok=True)
+        self.export_jsonl(os.path.join(directory, f'{prefix}.jsonl'))
+        self.export_chrome(os.path.join(directory, f'{prefix}.chrome.json'))
+
+
+class NullTracer:
+    # used when no run is being traced; spans cost one dict and a generator
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        yield attrs
+
+
+_tracer = NullTracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+@contextlib.contextmanager
+def use_tracer(tracer):
+    """
+    Make tracer the process-wide tracer for the duration of the block (threads included).
+    """
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = previous
+
+
+def span(name, **attrs):
+    return _tracer.span(name, **attrs)
+
+
+def traced(name):
+    """
+    Decorator recording a span per call, with the result's length when it has one.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _tracer.span(name) as attrs:
+                result = fn(*args, **kwargs)
+                if hasattr(result, '__len__') and not isinstance(result, str):
+                    attrs['result_len'] = len(result)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,102 @@
+import numpy as np
+
+from lineup import POSITION_INDEX, lineup_points
+
+
+def roster_matrix(agent_rosters, store, metric='pts_ppr'):
+    """
+    Rosters as padded (teams, players) arrays of player ids, position indexes and projections.
+
+    Players missing from the store, or at a position without a lineup slot,
+    get position -1 and never start.
+    """
+    width = max((len(roster) for roster in agent_rosters.values()), default=0)
+    pids = np.full((len(agent_rosters), width), None, dtype=object)
+    positions = np.full((len(agent_rosters), width), -1, dtype=int)
+    values = np.zeros((len(agent_rosters), width))
+    for t, roster in enumerate(agent_rosters.values()):
+        for r, pid in enumerate(roster):
+            pid = str(pid).strip('"').strip("'")
+            player = store.get(pid)
+            pids[t, r] = pid
+            if player != -1:
+                positions[t, r] = POSITION_INDEX.get(player['position'], -1)
+                values[t, r] = player['proj'].get(metric, 0)
+    return pids, positions, values
+
+
+def swap_gains(positions, values):
+    """
+    Lineup gain of every one-for-one swap in the league, scored in one batch per team.
+
+    :return: array gains[a, i, b, j], the change in team a's best lineup when
+             it gives up its player i and receives team b's player j
+    """
+    teams, width = positions.shape
+    base = lineup_points(positions, values)
+    gains = np.empty((teams, width, teams, width))
+    slot = np.arange(width)
+    # one team at a time keeps the batch (slot given up, player received, roster) small
+    for a in range(teams):
+        batch_positions = np.repeat(positions[a][None, None, :], width * teams * width, axis=0).reshape(width, teams * width, width)
+        batch_values = np.repeat(values[a][None, None, :], width * teams * width, axis=0).reshape(width, teams * width, width)
+        batch_positions[slot, :, slot] = positions.reshape(1, -1)
+        batch_values[slot, :, slot] = values.reshape(1, -1)
+        points = lineup_points(batch_positions.reshape(-1, width), batch_values.reshape(-1, width))
+        gains[a] = points.reshape(width, teams, width) - base[a]
+    return gains
+
+
+def find_trades(agent_rosters, store, per_agent=1, min_gain=0.0, metric='pts_ppr'):
+    """
+    The most mutually beneficial one-for-one trades in the league.
+
+    Every swap between two teams is scored by the smaller of the two teams'
+    lineup gains, so a trade only ranks well if it fills a need on both
+    sides. Each agent proposes its best trades with up to per_agent
+    different partners, and no pair of teams appears twice.
+
+    :param agent_rosters: {agent: [player_id, ...]}
+    :param store: PlayerStore with projections
+    :param min_gain: minimum projected weekly gain both teams need
+    :return: list of {proposer, partner, give, get, proposer_gain, partner_gain}, best first
+    """
+    agents = list(agent_rosters)
+    pids, positions, values = roster_matrix(agent_rosters, store, metric)
+    if not pids.size:
+        return []
+    gains = swap_gains(positions, values)
+    # gains[b, j, a, i] is the partner's side of the same swap
+    mutual = np.minimum(gains, gains.transpose(2, 3, 0, 1))
+    teams = np.arange(len(agents))
+    mutual[teams, :, teams, :] = -np.inf
+    empty = positions < 0
+    mutual[empty] = -np.inf
+    mutual.transpose(2, 3, 0, 1)[empty] = -np.inf
+
+    # best swap for every ordered pair, then each agent's best partners
+    width = positions.shape[1]
+    flat = mutual.transpose(0, 2, 1, 3).reshape(len(agents), len(agents), width * width)
+    best = flat.argmax(axis=2)
+    best_score = np.take_along_axis(flat, best[..., None], axis=2)[..., 0]
+    trades = []
+    paired = set()
+    for a in np.argsort(-best_score.max(axis=1), kind='stable'):
+        proposed = 0
+        for b in np.argsort(-best_score[a], kind='stable'):
+            if proposed >= per_agent or not best_score[a, b] > min_gain:
+                break
+            if frozenset((a, b)) in paired:
+                continue
+            i, j = divmod(int(best[a, b]), width)
+            paired.add(frozenset((a, b)))
+            proposed += 1
+            trades.append({
+                'proposer': agents[a],
+                'partner': agents[b],
+                'give': pids[a, i],
+                'get': pids[b, j],
+                'proposer_gain': round(float(gains[a, i, b, j]), 2),
+                'partner_gain': round(float(gains[b, j, a, i]), 2),
+            })
+    return sorted(trades, key=lambda t: -min(t['proposer_gain'], t['partner_gain']))
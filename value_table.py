@@ -0,0 +1,123 @@
+import numpy as np
+
+from draft_board import POSITIONS
+
+# a tier ends where the drop to the next player is this many times the position's typical gap
+TIER_GAP_FACTOR = 2.0
+
+
+class ValueTable:
+    """
+    Value over replacement (VORP), tiers and positional scarcity on total_proj.
+
+    Tiers are computed once per position when the table is built: players
+    are sorted by total_proj, and a new tier starts at every drop larger than
+    TIER_GAP_FACTOR times the mean drop among the position's startable
+    players. Replacement levels follow the draft. A position's replacement
+    player is the best one left once every still-open starter slot in the
+    league is filled from the available pool, with open flex slots going to
+    the best remaining RB/WR/TE. Open slots are tracked by DraftState and
+    players are read off the board's precomputed orderings, so nothing is
+    re-sorted as the draft goes on.
+
+    :param board: DraftBoard over the player table
+    :param starter_slots: {position: starters per team}
+    :param flex_positions: positions eligible for the flex slots
+    :param teams: teams in the league
+    """
+
+    def __init__(self, board, starter_slots, flex_positions, teams=12):
+        self.starter_slots = starter_slots
+        self.flex_positions = flex_positions
+        self.proj = np.nan_to_num(board.values['total_proj'], nan=0.0)
+        self.tiers = np.zeros(len(self.proj), dtype=int)
+        for pos in POSITIONS:
+            order = board.orders[('total_proj', pos)]
+            order = order[~np.isnan(board.values['total_proj'][order])]
+            if len(order) < 2:
+                continue
+            drops = -np.diff(self.proj[order])
+            startable = max(1, min(len(drops), teams * (starter_slots.get(pos, 0) + 1)))
+            breaks = drops > TIER_GAP_FACTOR * max(drops[:startable].mean(), 1e-9)
+            self.tiers[order] = 1 + np.concatenate([[0], np.cumsum(breaks)])
+
+    def replacement_levels(self, board, open_slots):
+        """
+        total_proj of each position's replacement player on the current board.
+
+        :param board: the board (or a fork of it) to read availability from
+        :param open_slots: unfilled starter slots league-wide, per position plus 'FLEX'
+        """
+        demand = {pos: open_slots.get(pos, 0) for pos in POSITIONS}
+        flex = open_slots.get('FLEX', 0)
+        if flex:
+            # the flex slots take the best RB/WR/TE left after their own starters
+            candidates = []
+            for pos in self.flex_positions:
+                rows = board.top_rows(demand[pos] + flex, 'total_proj', pos)[demand[pos]:]
+                candidates.extend((self.proj[row], pos) for row in rows)
+            for _, pos in sorted(candidates, key=lambda c: -c[0])[:flex]:
+                demand[pos] += 1
+
+        levels = {}
+        for pos in POSITIONS:
+            # with no more players left than open slots, the last one drafted is the replacement
+            rows = board.top_rows(demand[pos] + 1, 'total_proj', pos)
+            levels[pos] = float(self.proj[rows[-1]]) if rows else 0.0
+        return levels
+
+    def top(self, board, open_slots, n=5, position=None):
+        """
+        Available players with the highest VORP.
+        """
+        levels = self.replacement_levels(board, open_slots)
+        players = []
+        for pos in [position] if position else POSITIONS:
+            for row in board.top_rows(n, 'total_proj', pos):
+                players.append({
+                    'player_id': board.player_ids[row],
+                    'fullName': board.names[row],
+                    'position': pos,
+                    'total_proj': round(float(self.proj[row]), 1),
+                    'vorp': round(float(self.proj[row]) - levels[pos], 1),
+                    'tier': int(self.tiers[row]),
+                })
+        return sorted(players, key=lambda p: -p['vorp'])[:n]
+
+    def scarcity(self, board, open_slots):
+        """
+        Per position: replacement level, the best available player's tier, how
+        many players are left in that tier, and the drop in total_proj from the
+        best available to the best player of the next tier.
+        """
+        levels = self.replacement_levels(board, open_slots)
+        table = {}
+        for pos in POSITIONS:
+            order = board.orders[('total_proj', pos)]
+            rows = board.top_rows(1, 'total_proj', pos)
+            if not rows:
+                continue
+            best = rows[0]
+            tier = self.tiers[best]
+            remaining = order[board.heads[('total_proj', pos)]:]
+            remaining = remaining[~board.drafted[remaining]]
+            left = int((self.tiers[remaining] == tier).sum())
+            next_rows = remaining[self.tiers[remaining] > tier]
+            table[pos] = {
+                'replacement': round(levels[pos], 1),
+                'best_vorp': round(float(self.proj[best]) - levels[pos], 1),
+                'tier': int(tier),
+                'left_in_tier': left,
+                'next_tier_drop': round(float(self.proj[best] - self.proj[next_rows[0]]), 1) if len(next_rows) else None,
+            }
+        return table
+
+    def summary(self, board, open_slots):
+        """
+        One short line per position for the prompt context.
+        """
+        return {
+            pos: f"tier {s['tier']}: {s['left_in_tier']} left, VORP {s['best_vorp']:.0f}"
+                 + (f", next tier -{s['next_tier_drop']:.0f}" if s['next_tier_drop'] is not None else '')
+            for pos, s in self.scarcity(board, open_slots).items()
+        }